@@ -0,0 +1,362 @@
+"""
+In-process stand-in for the Vertex AI RAG Engine used by the benchmarks.
+
+``FakeRagBackend`` implements ``RagBackend`` without any network access. Each
+method counts as one RPC, sleeps for the latency of its operation in the chosen
+profile, and fails with the profile's error rate. Listings count one RPC per
+page, as the Vertex pager does. Retrieval returns synthetic contexts drawn
+from a corpus of ``corpus_size`` chunks, so result handling cost scales the way
+it would against a real corpus.
+
+``FakeLlm`` scripts the root agent's tool-calling turns, so ``root_agent`` can
+be driven end to end without a model.
+"""
+
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, Dict, Iterator, List, Optional, Sequence
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.api_core import exceptions as api_exceptions
+from google.genai import types
+
+from data_science_rag_agent.backends.base import (
+    CorpusRecord,
+    FilePage,
+    ImportResult,
+    RagBackend,
+    RagFileRecord,
+    RetrievedContext,
+)
+
+_DRIVE_ID_PATTERN = re.compile(r"drive\.google\.com/file/d/([a-zA-Z0-9_-]+)")
+
+_WORDS = (
+    "model feature pandas dataframe regression gradient loss metric sample "
+    "variance bias cluster vector embedding pipeline scaling validation"
+).split()
+
+
+@dataclass
+class FakeProfile:
+    """
+    Latency, error and size characteristics of the fake backend.
+
+    Latencies are per RPC in milliseconds; each call is drawn uniformly from
+    ``latency * (1 ± jitter)``. A ``slow_rate`` share of RPCs takes ``slow_ms``
+    instead, modelling a hung connection.
+    """
+
+    name: str
+    latency_ms: Dict[str, float] = field(default_factory=dict)
+    jitter: float = 0.2
+    error_rate: float = 0.0
+    slow_rate: float = 0.0
+    slow_ms: float = 0.0
+    corpus_size: int = 1000
+    corpora: int = 1
+    page_size: int = 100
+    llm_latency_ms: float = 0.0
+
+
+PROFILES: Dict[str, FakeProfile] = {
+    # No latency: measures the tools' own overhead
+    "instant": FakeProfile(name="instant", jitter=0.0),
+    # Rough Vertex AI RAG Engine latencies from a same-region client
+    "vertex": FakeProfile(
+        name="vertex",
+        latency_ms={
+            "list_corpora": 60,
+            "create_corpus": 400,
+            "delete_corpus": 300,
+            "import_files": 900,
+            "list_files": 70,
+            "delete_file": 150,
+            "retrieval_query": 180,
+        },
+        corpus_size=20000,
+        corpora=20,
+        llm_latency_ms=400,
+    ),
+    # Vertex latencies with 5% of RPCs failing
+    "flaky": FakeProfile(
+        name="flaky",
+        latency_ms={
+            "list_corpora": 60,
+            "create_corpus": 400,
+            "delete_corpus": 300,
+            "import_files": 900,
+            "list_files": 70,
+            "delete_file": 150,
+            "retrieval_query": 180,
+        },
+        error_rate=0.05,
+        corpus_size=20000,
+        corpora=20,
+        llm_latency_ms=400,
+    ),
+    # Vertex incident: a third of RPCs fail and some hang far past any deadline
+    "incident": FakeProfile(
+        name="incident",
+        latency_ms={"list_corpora": 60, "list_files": 70, "retrieval_query": 180},
+        error_rate=0.3,
+        slow_rate=0.05,
+        slow_ms=15000,
+        corpus_size=20000,
+        corpora=20,
+        llm_latency_ms=400,
+    ),
+    # Many corpora and files: exposes listing-heavy code paths
+    "large": FakeProfile(
+        name="large",
+        latency_ms={"list_corpora": 60, "list_files": 70, "retrieval_query": 250},
+        corpus_size=500000,
+        corpora=2000,
+        llm_latency_ms=400,
+    ),
+}
+
+
+class FakeRpcError(api_exceptions.ServiceUnavailable):
+    """Injected RPC failure, reported as HTTP 503 like a real transient error."""
+
+
+class FakeRagBackend(RagBackend):
+    """
+    ``RagBackend`` with simulated latency, failures and RPC counting.
+
+    Args:
+        profile (FakeProfile): The latency, error and size profile
+        seed (int): Seed for latency jitter, failures and synthetic text
+    """
+
+    def __init__(self, profile: FakeProfile, seed: int = 0):
+        self.profile = profile
+        self.rpcs: Counter = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._corpora: Dict[str, CorpusRecord] = {}
+        self._files: Dict[str, Dict[str, RagFileRecord]] = {}
+        for i in range(profile.corpora):
+            self._add_corpus(f"seed_corpus_{i}")
+
+    # --- RPC accounting ---
+
+    def rpc_counts(self) -> Dict[str, int]:
+        """
+        Get the number of RPCs made so far, by method.
+
+        Returns:
+            Dict[str, int]: RPC count per backend method
+        """
+        with self._lock:
+            return dict(self.rpcs)
+
+    def reset_rpc_counts(self) -> None:
+        with self._lock:
+            self.rpcs.clear()
+
+    def _rpc(self, method: str) -> None:
+        with self._lock:
+            self.rpcs[method] += 1
+            base = self.profile.latency_ms.get(method, 0.0)
+            latency = base * (1 + self._random.uniform(-1, 1) * self.profile.jitter)
+            failed = self._random.random() < self.profile.error_rate
+            if self._random.random() < self.profile.slow_rate:
+                latency = self.profile.slow_ms
+        if latency > 0:
+            time.sleep(latency / 1000)
+        if failed:
+            raise FakeRpcError(f"Injected failure in {method}")
+
+    # --- RagBackend ---
+
+    def list_corpora(self, page_size: Optional[int] = None) -> Iterator[CorpusRecord]:
+        with self._lock:
+            corpora = list(self._corpora.values())
+        yield from self._pages("list_corpora", corpora, page_size)
+
+    def create_corpus(self, display_name: str, embedding_model: str) -> CorpusRecord:
+        self._rpc("create_corpus")
+        return self._add_corpus(display_name)
+
+    def delete_corpus(self, corpus_name: str) -> None:
+        self._rpc("delete_corpus")
+        with self._lock:
+            self._corpora.pop(corpus_name, None)
+            self._files.pop(corpus_name, None)
+
+    def import_files(
+        self,
+        corpus_name: str,
+        paths: Sequence[str],
+        chunk_size: int,
+        chunk_overlap: int,
+        max_embedding_requests_per_min: int,
+    ) -> ImportResult:
+        self._rpc("import_files")
+        result = ImportResult(imported_rag_files_count=len(paths))
+        with self._lock:
+            files = self._files.setdefault(corpus_name, {})
+            for path in paths:
+                file_id = uuid.uuid4().hex[:16]
+                drive_id = _DRIVE_ID_PATTERN.search(path)
+                files[file_id] = RagFileRecord(
+                    name=f"{corpus_name}/ragFiles/{file_id}",
+                    display_name=path.rstrip("/").rsplit("/", 1)[-1],
+                    source_uri=path,
+                    resource_id=drive_id.group(1) if drive_id else "",
+                )
+                result.rag_files.append(files[file_id])
+        return result
+
+    def list_files(
+        self, corpus_name: str, page_size: Optional[int] = None
+    ) -> Iterator[RagFileRecord]:
+        with self._lock:
+            files = list(self._files.get(corpus_name, {}).values())
+        yield from self._pages("list_files", files, page_size)
+
+    def list_files_page(
+        self, corpus_name: str, page_size: int, page_token: str = ""
+    ) -> FilePage:
+        self._rpc("list_files")
+        offset = int(page_token or 0)
+        with self._lock:
+            files = list(self._files.get(corpus_name, {}).values())
+        end = offset + page_size
+        return FilePage(
+            files=files[offset:end], next_page_token=str(end) if end < len(files) else ""
+        )
+
+    def delete_file(self, file_name: str) -> None:
+        self._rpc("delete_file")
+        corpus_name, _, file_id = file_name.partition("/ragFiles/")
+        with self._lock:
+            self._files.get(corpus_name, {}).pop(file_id, None)
+
+    def retrieval_query(
+        self,
+        corpus_names: Sequence[str],
+        text: str,
+        top_k: int,
+        distance_threshold: float,
+    ) -> List[RetrievedContext]:
+        self._rpc("retrieval_query")
+        # Deterministic per query, so caches see identical results for repeats
+        rng = random.Random(f"{sorted(corpus_names)}:{text}")
+        rows = rng.sample(range(self.profile.corpus_size), min(top_k, self.profile.corpus_size))
+        distances = sorted(rng.uniform(0, distance_threshold) for _ in rows)
+        return [
+            RetrievedContext(
+                source_uri=f"gs://bench/doc_{row // 50}.txt",
+                source_name=f"doc_{row // 50}.txt",
+                text=" ".join(rng.choice(_WORDS) for _ in range(120)),
+                score=distance,
+            )
+            for row, distance in zip(rows, distances)
+        ]
+
+    # --- Helpers ---
+
+    def _add_corpus(self, display_name: str) -> CorpusRecord:
+        corpus = CorpusRecord(
+            name=f"projects/bench/locations/local/ragCorpora/{uuid.uuid4().hex[:16]}",
+            display_name=display_name,
+        )
+        with self._lock:
+            self._corpora[corpus.name] = corpus
+            self._files[corpus.name] = {}
+        return corpus
+
+    def _pages(self, method: str, items: List, page_size: Optional[int]) -> Iterator:
+        page_size = page_size or self.profile.page_size
+        for start in range(0, max(len(items), 1), page_size):
+            self._rpc(method)
+            yield from items[start : start + page_size]
+
+
+class FakeLlm(BaseLlm):
+    """
+    Scripted model for ``root_agent``.
+
+    The root agent calls ``default_rag_config``, then ``rag_query`` with the
+    user's message, then answers in Markdown and transfers to the
+    output agent. Requests carrying a response schema (the output agent) get
+    the schema JSON directly, which only happens when the local formatter did
+    not produce it.
+    """
+
+    model: str = "fake-llm"
+    latency_ms: float = 0.0
+    calls: int = 0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.calls += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        yield LlmResponse(content=self._respond(llm_request))
+
+    def _respond(self, llm_request: LlmRequest) -> types.Content:
+        if llm_request.config and llm_request.config.response_schema:
+            return _model_text(json.dumps({"title": "Answer", "sections": []}))
+
+        last = llm_request.contents[-1].parts or []
+        response = next((part.function_response for part in last if part.function_response), None)
+        if response is None:
+            return _function_call("default_rag_config", {})
+        if response.name == "default_rag_config":
+            return _function_call(
+                "rag_query",
+                {
+                    "corpus_name": response.response.get("corpus_name", ""),
+                    "query": _user_query(llm_request),
+                },
+            )
+        if response.name == "rag_query":
+            results = response.response.get("results") or []
+            answer = "\n".join(
+                ["# Answer", "", "## Retrieved context"]
+                + [f"- {result.get('text', '')[:80]}" for result in results]
+                + ["", "Note: synthetic answer from the benchmark model."]
+            )
+            return types.Content(
+                role="model",
+                parts=[
+                    types.Part(text=answer),
+                    types.Part(
+                        function_call=types.FunctionCall(
+                            name="transfer_to_agent", args={"agent_name": "output_agent"}
+                        )
+                    ),
+                ],
+            )
+        return _model_text("Done.")
+
+
+def _function_call(name: str, args: Dict) -> types.Content:
+    return types.Content(
+        role="model", parts=[types.Part(function_call=types.FunctionCall(name=name, args=args))]
+    )
+
+
+def _model_text(text: str) -> types.Content:
+    return types.Content(role="model", parts=[types.Part(text=text)])
+
+
+def _user_query(llm_request: LlmRequest) -> str:
+    for content in llm_request.contents:
+        if content.role == "user":
+            for part in content.parts or []:
+                if part.text:
+                    return part.text
+    return ""
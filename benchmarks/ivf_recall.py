@@ -0,0 +1,99 @@
+"""
+Recall@k vs. latency of the local IVF index against exact search.
+
+Generates clustered synthetic unit vectors, answers the same queries with the
+brute-force scan used by the local backend and with ``IVFIndex`` at several
+``nprobe`` settings, and reports recall@k and mean query latency.
+
+Usage:
+    python -m benchmarks.ivf_recall --rows 200000 --dim 256 --k 10
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from data_science_rag_agent.backends.ivf import IVFIndex
+
+
+def _synthetic(rows: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(clusters, size=rows)]
+    vectors += 0.5 * rng.standard_normal((rows, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _exact(matrix: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    distances = 1.0 - matrix @ query
+    return np.argpartition(distances, k - 1)[:k]
+
+
+def _approximate(
+    index: IVFIndex, matrix: np.ndarray, query: np.ndarray, k: int, nprobe: int
+) -> np.ndarray:
+    rows, distances = index.search(matrix, query, nprobe)
+    if len(rows) <= k:
+        return rows
+    return rows[np.argpartition(distances, k - 1)[:k]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--clusters", type=int, default=512)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=0)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    matrix = _synthetic(args.rows, args.dim, args.clusters, args.seed)
+    queries = _synthetic(args.queries, args.dim, args.clusters, args.seed + 1)
+
+    start = time.perf_counter()
+    index = IVFIndex.train(matrix, nlist=args.nlist, seed=args.seed)
+    index.add(matrix, 0)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    truth = [set(_exact(matrix, query, args.k).tolist()) for query in queries]
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    results = {
+        "rows": args.rows,
+        "dim": args.dim,
+        "k": args.k,
+        "nlist": index.nlist,
+        "build_seconds": round(build_seconds, 3),
+        "exact_ms_per_query": round(exact_ms, 4),
+        "ivf": [],
+    }
+    print(f"rows={args.rows} dim={args.dim} nlist={index.nlist} build={build_seconds:.2f}s")
+    print(f"exact: {exact_ms:.3f} ms/query")
+    print(f"{'nprobe':>7} {'recall@k':>9} {'ms/query':>9} {'speedup':>8}")
+
+    for nprobe in args.nprobe:
+        start = time.perf_counter()
+        found = [_approximate(index, matrix, query, args.k, nprobe) for query in queries]
+        ivf_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        recall = float(
+            np.mean([len(truth[i] & set(rows.tolist())) / args.k for i, rows in enumerate(found)])
+        )
+        print(f"{nprobe:>7} {recall:>9.3f} {ivf_ms:>9.3f} {exact_ms / ivf_ms:>7.1f}x")
+        results["ivf"].append(
+            {"nprobe": nprobe, "recall_at_k": round(recall, 4), "ms_per_query": round(ivf_ms, 4)}
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Validate+dump throughput of AgentResponseSchema payloads.
+
+Builds realistic multi-section responses (prose, code blocks, examples, key
+points), then times the per-request work the output path does: validating the
+model's JSON, serializing the response, and producing the JSON schema sent with
+the model request. The usual ``json`` round trip through pydantic dicts is
+compared with the fast path in ``sub_agent.output_agent.serialization``.
+
+Usage:
+    python -m benchmarks.response_serialization --sections 6 --iterations 5000
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Callable, Dict, List
+
+from data_science_rag_agent.sub_agent.output_agent import serialization
+from data_science_rag_agent.sub_agent.output_agent.schema import AgentResponseSchema
+
+_WORDS = (
+    "model feature pandas dataframe regression gradient loss metric sample "
+    "variance bias cluster vector embedding pipeline scaling validation"
+).split()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _payload(sections: int, seed: int) -> bytes:
+    rng = random.Random(seed)
+    return json.dumps(
+        {
+            "title": _sentence(rng, 6),
+            "sections": [
+                {
+                    "heading": _sentence(rng, 4),
+                    "sub_heading": _sentence(rng, 6),
+                    "content": " ".join(_sentence(rng, 18) for _ in range(8)),
+                    "code_blocks": [
+                        "\n".join(
+                            f"x_{line} = df['{rng.choice(_WORDS)}'].mean()"
+                            for line in range(12)
+                        )
+                        for _ in range(2)
+                    ],
+                    "examples": [_sentence(rng, 12) for _ in range(3)],
+                    "key_points": [_sentence(rng, 10) for _ in range(5)],
+                    "notes": _sentence(rng, 20),
+                }
+                for _ in range(sections)
+            ],
+        }
+    ).encode()
+
+
+def _time(fn: Callable[[], object], iterations: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) * 1e6 / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sections", type=int, default=6)
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    payload = _payload(args.sections, args.seed)
+    response = AgentResponseSchema.model_validate_json(payload)
+
+    cases: Dict[str, Dict[str, Callable[[], object]]] = {
+        "validate": {
+            "baseline": lambda: AgentResponseSchema.model_validate(json.loads(payload)),
+            "fast": lambda: serialization.validate_response(payload),
+        },
+        "dump": {
+            "baseline": lambda: json.dumps(response.model_dump()).encode(),
+            "fast": lambda: serialization.dump_response(response),
+        },
+        "validate+dump": {
+            "baseline": lambda: json.dumps(
+                AgentResponseSchema.model_validate(json.loads(payload)).model_dump()
+            ).encode(),
+            "fast": lambda: serialization.dump_response(
+                serialization.validate_response(payload)
+            ),
+        },
+        "request_schema": {
+            "baseline": AgentResponseSchema.model_json_schema,
+            "fast": serialization.response_json_schema,
+        },
+    }
+
+    print(f"payload={len(payload)} bytes sections={args.sections}")
+    print(f"{'case':>15} {'baseline us':>12} {'fast us':>9} {'speedup':>8} {'fast/s':>9}")
+
+    results: Dict[str, object] = {
+        "payload_bytes": len(payload),
+        "sections": args.sections,
+        "cases": [],
+    }
+    rows: List[Dict[str, object]] = results["cases"]
+    for name, variants in cases.items():
+        slow = _time(variants["baseline"], args.iterations)
+        fast = _time(variants["fast"], args.iterations)
+        print(f"{name:>15} {slow:>12.2f} {fast:>9.2f} {slow / fast:>7.1f}x {1e6 / fast:>9.0f}")
+        rows.append(
+            {"case": name, "baseline_us": round(slow, 3), "fast_us": round(fast, 3)}
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Latency, throughput and RPC counts of the RAG tools against a fake backend.
+
+Runs each scenario at each concurrency level against ``FakeRagBackend``:
+
+- ``rag_query``: one query per request against a prepared corpus
+- ``add_data``: one new Drive document per request
+- ``default_rag_config``: the bootstrap every session starts with
+- ``agent``: a full ``root_agent`` turn with a scripted model, covering tool
+  calls, the hand-off to the output agent and response formatting, run
+  through ``stream_agent_response`` as a streaming client would
+
+and reports p50/p95/p99 latency, throughput, error rate and backend RPCs per
+request. RPC counts catch regressions such as an extra ``list_corpora`` per
+query even when latency is noisy. Write the results with ``--json`` and compare
+files between commits.
+
+Usage:
+    python -m benchmarks.run_load --profile vertex --concurrency 1 8 32 --requests 200
+"""
+
+import os
+import tempfile
+
+# Keep the benchmark's on-disk state away from the user's caches; must happen
+# before the package reads its configuration
+_STATE_DIR = tempfile.mkdtemp(prefix="rag_bench_")
+os.environ.setdefault("DEDUP_INDEX_DIR", os.path.join(_STATE_DIR, "dedup_index"))
+os.environ.setdefault("BULK_INGEST_JOURNAL_DIR", os.path.join(_STATE_DIR, "journal"))
+os.environ.setdefault("EMBEDDING_CACHE_PATH", "")
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import json  # noqa: E402
+import math  # noqa: E402
+import subprocess  # noqa: E402
+import time  # noqa: E402
+from concurrent.futures import ThreadPoolExecutor  # noqa: E402
+from types import SimpleNamespace  # noqa: E402
+from typing import Any, Callable, Dict, List  # noqa: E402
+
+from data_science_rag_agent.backends import set_backend  # noqa: E402
+from data_science_rag_agent.backends.resilient import ResilientBackend  # noqa: E402
+from data_science_rag_agent.config import RAG_BACKEND_DEADLINE_SECONDS  # noqa: E402
+from data_science_rag_agent.tools import (  # noqa: E402
+    add_data,
+    corpus_registry,
+    create_corpus,
+    rag_query,
+    retrieval_cache,
+    semantic_cache,
+)
+from data_science_rag_agent.tools.default_rag_config import (  # noqa: E402
+    default_rag_config,
+    reset_default_rag_config,
+)
+
+from .fake_backend import PROFILES, FakeLlm, FakeRagBackend  # noqa: E402
+
+SCENARIOS = ("rag_query", "add_data", "default_rag_config", "agent")
+_CORPUS = "bench_corpus"
+
+
+def _reset(profile_name: str, seed: int, deadline: float, resilient: bool) -> FakeRagBackend:
+    backend = FakeRagBackend(PROFILES[profile_name], seed=seed)
+    # Wrapped the same way get_backend wraps the Vertex backend
+    set_backend(ResilientBackend(backend, deadline_seconds=deadline) if resilient else backend)
+    corpus_registry.invalidate()
+    retrieval_cache.clear()
+    semantic_cache.clear()
+    reset_default_rag_config()
+    return backend
+
+
+def _failed(result: Any) -> bool:
+    return isinstance(result, dict) and (
+        result.get("status") == "error" or result.get("success") is False
+    )
+
+
+def _tool_call(scenario: str, corpus_name: str) -> Callable[[int], Any]:
+    if scenario == "rag_query":
+        return lambda i: rag_query(
+            corpus_name, f"how does feature {i} affect the model", SimpleNamespace(state={})
+        )
+    if scenario == "add_data":
+        return lambda i: add_data(
+            corpus_name,
+            [f"https://drive.google.com/file/d/bench{i:08d}/view"],
+            SimpleNamespace(state={}),
+        )
+    if scenario == "default_rag_config":
+        return lambda i: default_rag_config(SimpleNamespace(state={}))
+    raise ValueError(f"Unknown scenario '{scenario}'")
+
+
+def _run_tools(scenario: str, corpus_name: str, requests: int, concurrency: int):
+    call = _tool_call(scenario, corpus_name)
+
+    def timed(i: int):
+        start = time.perf_counter()
+        try:
+            failed = _failed(call(i))
+        except Exception:
+            failed = True
+        return (time.perf_counter() - start) * 1000, failed
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(timed, range(requests)))
+
+
+def _run_agent(requests: int, concurrency: int, llm: FakeLlm):
+    from google.adk.runners import InMemoryRunner
+
+    from data_science_rag_agent.agent import root_agent
+    from data_science_rag_agent.sub_agent.output_agent.streaming import stream_agent_response
+
+    root_agent.model = llm
+    runner = InMemoryRunner(agent=root_agent, app_name="bench")
+
+    async def one(i: int, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            session = runner.session_service.create_session(
+                app_name="bench", user_id=f"user{i}"
+            )
+            start = time.perf_counter()
+            failed = True
+            try:
+                async for item in stream_agent_response(
+                    runner, f"user{i}", session.id, f"explain feature {i} of the model"
+                ):
+                    failed = item["type"] == "error"
+            except Exception:
+                failed = True
+            return (time.perf_counter() - start) * 1000, failed
+
+    async def run_all():
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(one(i, semaphore) for i in range(requests)))
+
+    return asyncio.run(run_all())
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    rank = math.ceil(percentile / 100 * len(values)) - 1
+    return values[max(0, min(len(values) - 1, rank))]
+
+
+def _run(
+    scenario: str,
+    profile_name: str,
+    requests: int,
+    concurrency: int,
+    seed: int,
+    deadline: float = RAG_BACKEND_DEADLINE_SECONDS,
+    resilient: bool = True,
+) -> Dict[str, Any]:
+    backend = _reset(profile_name, seed, deadline, resilient)
+    corpus_name = _CORPUS
+    if scenario in ("rag_query", "add_data"):
+        corpus_name = create_corpus(_CORPUS, SimpleNamespace(state={}))["corpus_name"]
+    backend.reset_rpc_counts()
+
+    llm = FakeLlm(latency_ms=PROFILES[profile_name].llm_latency_ms)
+    start = time.perf_counter()
+    if scenario == "agent":
+        samples = _run_agent(requests, concurrency, llm)
+    else:
+        samples = _run_tools(scenario, corpus_name, requests, concurrency)
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in samples)
+    errors = sum(1 for _, failed in samples if failed)
+    rpcs = backend.rpc_counts()
+    if scenario == "agent":
+        rpcs["llm_generate_content"] = llm.calls
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "error_rate": round(errors / requests, 4),
+        "throughput_rps": round(requests / elapsed, 2),
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 3),
+            "p50": round(_percentile(latencies, 50), 3),
+            "p95": round(_percentile(latencies, 95), 3),
+            "p99": round(_percentile(latencies, 99), 3),
+        },
+        "rpcs_per_request": {
+            method: round(count / requests, 3) for method, count in sorted(rpcs.items())
+        },
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="vertex")
+    parser.add_argument("--scenario", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--deadline", type=float, default=RAG_BACKEND_DEADLINE_SECONDS,
+        help="Per-call backend deadline in seconds",
+    )
+    parser.add_argument(
+        "--no-resilience", action="store_true",
+        help="Call the fake backend directly, without deadlines, retries or the breaker",
+    )
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {
+        "commit": _git_commit(),
+        "profile": args.profile,
+        "resilient": not args.no_resilience,
+        "deadline_seconds": args.deadline,
+        "runs": [],
+    }
+    print(f"profile={args.profile} requests={args.requests} commit={results['commit'] or '?'}")
+    print(
+        f"{'scenario':>18} {'conc':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+        f"{'rps':>8} {'errors':>7}  rpcs/request"
+    )
+    for scenario in args.scenario:
+        for concurrency in args.concurrency:
+            run = _run(
+                scenario,
+                args.profile,
+                args.requests,
+                concurrency,
+                args.seed,
+                args.deadline,
+                not args.no_resilience,
+            )
+            latency = run["latency_ms"]
+            rpcs = " ".join(f"{k}={v:g}" for k, v in run["rpcs_per_request"].items())
+            print(
+                f"{scenario:>18} {concurrency:>5} {latency['p50']:>9.2f} {latency['p95']:>9.2f} "
+                f"{latency['p99']:>9.2f} {run['throughput_rps']:>8.1f} {run['errors']:>7}  {rpcs}"
+            )
+            results["runs"].append(run)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
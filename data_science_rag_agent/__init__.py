@@ -1,32 +1,22 @@
-import os
+"""
+Data Science RAG agent package.
 
-import vertexai
-from dotenv import load_dotenv
+Importing the package has no side effects. Environment variables are loaded
+once by ``config``, Vertex AI is initialized on first use (see ``vertex_init``),
+and the ``agent`` and ``tools`` submodules are imported when first accessed,
+e.g. by ``adk`` resolving ``data_science_rag_agent.agent.root_agent``.
+"""
 
-# Load environment variables
-load_dotenv()
+import importlib
 
-# Get Vertex AI configuration from environment
-PROJECT_ID = os.environ.get("GOOGLE_CLOUD_PROJECT")
-LOCATION = os.environ.get("GOOGLE_CLOUD_LOCATION")
+_LAZY_SUBMODULES = ("agent", "tools")
 
 
-# Initialize Vertex AI at package load time
+def __getattr__(name):
+    if name in _LAZY_SUBMODULES:
+        # import_module binds the submodule on the package, so this runs once
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Initialize Vertex AI at package load time
-try:
-    if PROJECT_ID and LOCATION:
-        print(f"Initializing Vertex AI with project={PROJECT_ID}, location={LOCATION}")
-        vertexai.init(project=PROJECT_ID, location=LOCATION)
-        print("Vertex AI initialization successful")
-    else:
-        print(
-            f"Missing Vertex AI configuration. PROJECT_ID={PROJECT_ID}, LOCATION={LOCATION}. "
-            f"Tools requiring Vertex AI may not work properly."
-        )
-except Exception as e:
-    print(f"Failed to initialize Vertex AI: {str(e)}")
-    print("Please check your Google Cloud credentials and project settings.")
 
-# Import agent after initialization is complete
-from . import agent
+__all__ = ["agent", "tools"]
@@ -1,6 +1,5 @@
 from google.adk.agents import Agent
-from .tools.default_rag_config import default_rag_config
-from .tools.rag_query import rag_query
+from .tools.async_tools import default_rag_config_async, rag_query_async
 from .sub_agent.output_agent.agent import output_agent
 
 root_agent = Agent(
@@ -42,7 +41,7 @@ You are a **helpful and smart Data Science Aadgent** with the ability to use too
 Always follow this sequence for every user query:
 1. Call `default_rag_config` to initialize resources and obtain `corpus_name`.
 2. Extract the user’s query and pass it with `corpus_name` to `rag_query`.
-3. If `rag_query` returns `status: "success"`, pass the `"results"` to `output_agent` to convert into valid JSON.
+3. If `rag_query` returns `status: "success"`, write your answer from the `"results"` in Markdown (`##` section headings, fenced code blocks, bullet lists, and `Note:` paragraphs), then pass it to `output_agent` to convert into valid JSON.
 4. If `rag_query` returns `status: "error"` or `"warning"`, include the `"message"` in the JSON response.
 5. Return the JSON response generated by `output_agent` (or error/warning message) to the user.
 
@@ -132,6 +131,6 @@ Always return a valid JSON response, either from `output_agent` (for successful
 
 
 """,
-    tools=[default_rag_config, rag_query],
+    tools=[default_rag_config_async, rag_query_async],
     sub_agents=[output_agent]
 )
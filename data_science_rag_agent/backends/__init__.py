@@ -0,0 +1,77 @@
+"""
+Pluggable storage and retrieval backends for the RAG tools.
+
+The backend is chosen by the ``RAG_BACKEND`` setting (``vertex`` or ``local``)
+and shared by every tool in the process.
+"""
+
+import threading
+from typing import Optional
+
+from ..config import RAG_BACKEND
+from .base import (
+    CorpusRecord,
+    FilePage,
+    ImportResult,
+    RagBackend,
+    RagFileRecord,
+    RetrievedContext,
+)
+
+_backend: Optional[RagBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> RagBackend:
+    """
+    Get the process-wide RAG backend, creating it on first use.
+
+    Returns:
+        RagBackend: The configured backend
+    """
+    global _backend
+
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _create_backend(RAG_BACKEND)
+    return _backend
+
+
+def set_backend(backend: RagBackend) -> None:
+    """
+    Replace the process-wide RAG backend, e.g. with a local or fake implementation.
+
+    Args:
+        backend (RagBackend): The backend every tool should use from now on
+    """
+    global _backend
+
+    with _backend_lock:
+        _backend = backend
+
+
+def _create_backend(name: str) -> RagBackend:
+    if name == "local":
+        from .local import LocalRagBackend
+
+        return LocalRagBackend()
+    if name == "vertex":
+        from .resilient import ResilientBackend
+        from .vertex import VertexRagBackend
+
+        # Remote calls get deadlines, read retries and a circuit breaker
+        return ResilientBackend(VertexRagBackend())
+    raise ValueError(f"Unknown RAG backend '{name}'. Expected 'vertex' or 'local'.")
+
+
+__all__ = [
+    "CorpusRecord",
+    "FilePage",
+    "ImportResult",
+    "RagBackend",
+    "RagFileRecord",
+    "RetrievedContext",
+    "get_backend",
+    "set_backend",
+]
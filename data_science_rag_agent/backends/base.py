@@ -0,0 +1,161 @@
+"""
+Backend interface for RAG corpus storage and retrieval.
+
+Tools talk to a ``RagBackend`` instead of calling ``vertexai.rag`` directly, so
+the same tools can run against Vertex AI or an in-process index.
+"""
+
+import abc
+import itertools
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Sequence
+
+
+@dataclass
+class CorpusRecord:
+    """A RAG corpus as seen by the tools."""
+
+    name: str
+    display_name: str
+    create_time: str = ""
+    update_time: str = ""
+
+
+@dataclass
+class RagFileRecord:
+    """A file imported into a RAG corpus."""
+
+    name: str
+    display_name: str = ""
+    source_uri: str = ""
+    resource_id: str = ""
+    create_time: str = ""
+    update_time: str = ""
+
+
+@dataclass
+class FilePage:
+    """One page of a corpus file listing; an empty token means it was the last."""
+
+    files: List[RagFileRecord] = field(default_factory=list)
+    next_page_token: str = ""
+
+
+@dataclass
+class ImportResult:
+    """
+    Outcome of importing files into a corpus.
+
+    ``rag_files`` lists the files the import created when the backend reports
+    them; Vertex AI only returns counts, so it is empty there.
+    """
+
+    imported_rag_files_count: int = 0
+    skipped_rag_files_count: int = 0
+    failed_rag_files_count: int = 0
+    rag_files: List[RagFileRecord] = field(default_factory=list)
+
+
+@dataclass
+class RetrievedContext:
+    """A chunk returned by a retrieval query; ``score`` is a vector distance."""
+
+    source_uri: str
+    source_name: str
+    text: str
+    score: float
+
+
+class RagBackend(abc.ABC):
+    """
+    Operations the RAG tools need from a corpus store.
+    """
+
+    #: Whether ``import_files`` accepts paths on the local filesystem
+    supports_local_paths = False
+
+    #: Whether ``lexical_query`` is available
+    supports_lexical = False
+
+    @abc.abstractmethod
+    def list_corpora(self, page_size: Optional[int] = None) -> Iterator[CorpusRecord]:
+        """Iterate over every corpus, fetching ``page_size`` corpora per request."""
+
+    @abc.abstractmethod
+    def create_corpus(self, display_name: str, embedding_model: str) -> CorpusRecord:
+        """Create an empty corpus."""
+
+    @abc.abstractmethod
+    def delete_corpus(self, corpus_name: str) -> None:
+        """Delete a corpus and every file in it."""
+
+    @abc.abstractmethod
+    def import_files(
+        self,
+        corpus_name: str,
+        paths: Sequence[str],
+        chunk_size: int,
+        chunk_overlap: int,
+        max_embedding_requests_per_min: int,
+    ) -> ImportResult:
+        """Chunk, embed and add the given sources to a corpus."""
+
+    @abc.abstractmethod
+    def list_files(
+        self, corpus_name: str, page_size: Optional[int] = None
+    ) -> Iterator[RagFileRecord]:
+        """Iterate over every file in a corpus."""
+
+    def list_files_page(
+        self, corpus_name: str, page_size: int, page_token: str = ""
+    ) -> FilePage:
+        """
+        Fetch one page of a corpus's files.
+
+        The default skips ``page_token`` files of ``list_files``, so the token
+        is an offset; backends with server-side paging return their own tokens.
+
+        Raises:
+            ValueError: If ``page_token`` was not issued by this backend
+        """
+        try:
+            offset = int(page_token or 0)
+        except ValueError:
+            raise ValueError(f"Invalid page token '{page_token}'") from None
+        if offset < 0:
+            raise ValueError(f"Invalid page token '{page_token}'")
+
+        files = list(
+            itertools.islice(self.list_files(corpus_name), offset, offset + page_size + 1)
+        )
+        if len(files) > page_size:
+            return FilePage(files=files[:page_size], next_page_token=str(offset + page_size))
+        return FilePage(files=files)
+
+    @abc.abstractmethod
+    def delete_file(self, file_name: str) -> None:
+        """Delete a file given its full ``.../ragFiles/{id}`` resource name."""
+
+    @abc.abstractmethod
+    def retrieval_query(
+        self,
+        corpus_names: Sequence[str],
+        text: str,
+        top_k: int,
+        distance_threshold: float,
+    ) -> List[RetrievedContext]:
+        """Return up to ``top_k`` chunks closer than ``distance_threshold``."""
+
+    def lexical_query(
+        self,
+        corpus_names: Sequence[str],
+        text: str,
+        top_k: int,
+    ) -> List[RetrievedContext]:
+        """
+        Return up to ``top_k`` chunks in BM25 order.
+
+        ``score`` still holds the vector distance, so lexical and vector
+        results can be merged.
+        """
+        raise NotImplementedError(f"{type(self).__name__} has no lexical index")
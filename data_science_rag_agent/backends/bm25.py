@@ -0,0 +1,251 @@
+"""
+BM25 inverted index for lexical search in the local backend.
+
+Postings are stored in segments of flat ``terms`` / ``rows`` / ``tfs`` arrays
+sorted by term id, so a term's postings in a segment are found by binary
+search. Appending chunks adds a small segment instead of rewriting every
+posting list; like a log-structured merge tree, a segment is merged into its
+predecessor once that is no more than twice its size, which keeps O(log n)
+segments and rewrites each posting O(log n) times. Deleting chunks remaps rows
+the same way the IVF index does, and ``save`` merges everything into one
+compressed-sparse-row ``.npz`` file that loads without unpickling anything.
+"""
+
+import os
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..lexical import BM25_B, BM25_K1, idf, tokenize
+
+# A segment is merged into the one before it while that is at most this many
+# times its size
+_MERGE_RATIO = 2
+
+
+class _Segment(NamedTuple):
+    """Postings of a range of appends, sorted by term id and then row."""
+
+    terms: np.ndarray
+    rows: np.ndarray
+    tfs: np.ndarray
+
+
+class LexicalIndex:
+    """
+    Array-backed BM25 index over the chunks of one corpus.
+
+    As with ``IVFIndex``, writers update a ``copy`` and publish it: segments
+    are never modified in place, so a published index can be searched without
+    a lock. The vocabulary is shared by copies and only ever grows; terms an
+    older copy has no postings for simply match nothing.
+    """
+
+    def __init__(
+        self,
+        terms: Optional[List[str]] = None,
+        offsets: Optional[np.ndarray] = None,
+        rows: Optional[np.ndarray] = None,
+        tfs: Optional[np.ndarray] = None,
+        lengths: Optional[np.ndarray] = None,
+    ):
+        self.terms: List[str] = list(terms or [])
+        self.vocabulary: Dict[str, int] = {term: i for i, term in enumerate(self.terms)}
+        self.lengths = lengths if lengths is not None else np.zeros(0, dtype=np.float32)
+        self.segments: List[_Segment] = []
+        if rows is not None and len(rows):
+            term_ids = np.repeat(np.arange(len(offsets) - 1, dtype=np.int64), np.diff(offsets))
+            self.segments.append(_Segment(term_ids, rows.astype(np.int64), tfs))
+
+    @property
+    def size(self) -> int:
+        return len(self.lengths)
+
+    def copy(self) -> "LexicalIndex":
+        """
+        Copy the index so it can be updated while searches use the original.
+
+        Returns:
+            LexicalIndex: An index sharing the original's vocabulary and segments
+        """
+        clone = LexicalIndex()
+        clone.terms = self.terms
+        clone.vocabulary = self.vocabulary
+        clone.lengths = self.lengths
+        clone.segments = list(self.segments)
+        return clone
+
+    # --- Updates ---
+
+    def add(self, texts: Sequence[str], first_row: int) -> None:
+        """
+        Index chunks appended at ``first_row`` onwards.
+
+        Args:
+            texts (Sequence[str]): The chunk texts, in row order
+            first_row (int): Matrix row of the first text
+        """
+        lengths = np.zeros(first_row + len(texts), dtype=np.float32)
+        lengths[:first_row] = self.lengths[:first_row]
+
+        new_terms: List[int] = []
+        new_rows: List[int] = []
+        new_tfs: List[float] = []
+        for row, text in enumerate(texts, start=first_row):
+            counts = Counter(tokenize(text))
+            lengths[row] = sum(counts.values())
+            for term, tf in counts.items():
+                term_id = self.vocabulary.get(term)
+                if term_id is None:
+                    term_id = self.vocabulary[term] = len(self.terms)
+                    self.terms.append(term)
+                new_terms.append(term_id)
+                new_rows.append(row)
+                new_tfs.append(tf)
+        self.lengths = lengths
+        if not new_terms:
+            return
+
+        segments = self.segments + [
+            _sorted_segment(
+                np.array(new_terms, dtype=np.int64),
+                np.array(new_rows, dtype=np.int64),
+                np.array(new_tfs, dtype=np.float32),
+            )
+        ]
+        while len(segments) > 1 and len(segments[-2].rows) <= _MERGE_RATIO * len(
+            segments[-1].rows
+        ):
+            segments[-2:] = [_merge(segments[-2:])]
+        self.segments = segments
+
+    def remap(self, keep: np.ndarray) -> None:
+        """
+        Drop the postings of deleted rows and renumber the rest.
+
+        Args:
+            keep (np.ndarray): Boolean mask over the old rows, True for rows that remain
+        """
+        new_ids = np.cumsum(keep) - 1
+        segments = []
+        for segment in self.segments:
+            mask = keep[segment.rows]
+            if mask.any():
+                segments.append(
+                    _Segment(segment.terms[mask], new_ids[segment.rows[mask]], segment.tfs[mask])
+                )
+        self.segments = segments
+        self.lengths = self.lengths[keep[: len(self.lengths)]]
+
+    # --- Search ---
+
+    def search(self, query: str, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the rows with the highest BM25 scores for a query.
+
+        Args:
+            query (str): The query text
+            top_k (int): Number of rows to return
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Row ids and their scores, best first
+        """
+        # Read the state once; a concurrent writer publishes a different object
+        segments, lengths = self.segments, self.lengths
+        size = len(lengths)
+        term_ids = {
+            self.vocabulary[term] for term in tokenize(query) if term in self.vocabulary
+        }
+        if not term_ids or size == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        average_length = float(lengths.mean()) or 1.0
+        norms = BM25_K1 * (1.0 - BM25_B + BM25_B * lengths / average_length)
+        scores = np.zeros(size, dtype=np.float32)
+        for term_id in term_ids:
+            postings = []
+            for segment in segments:
+                start, end = np.searchsorted(segment.terms, [term_id, term_id + 1])
+                if start < end:
+                    postings.append((segment.rows[start:end], segment.tfs[start:end]))
+            document_frequency = sum(len(rows) for rows, _ in postings)
+            for rows, tfs in postings:
+                # Rows are unique within a posting list, so fancy-index += is safe
+                scores[rows] += idf(document_frequency, size) * tfs * (BM25_K1 + 1.0) / (
+                    tfs + norms[rows]
+                )
+
+        matches = np.flatnonzero(scores > 0)
+        if len(matches) > top_k:
+            matches = matches[np.argpartition(-scores[matches], top_k - 1)[:top_k]]
+        matches = matches[np.argsort(-scores[matches], kind="stable")]
+        return matches, scores[matches]
+
+    # --- Persistence ---
+
+    def save(self, path: str) -> None:
+        """
+        Merge the segments and write the index arrays.
+
+        Args:
+            path (str): Destination ``.npz`` file
+        """
+        if len(self.segments) > 1:
+            self.segments = [_merge(self.segments)]
+        if self.segments:
+            segment = self.segments[0]
+        else:
+            segment = _Segment(
+                np.zeros(0, dtype=np.int64),
+                np.zeros(0, dtype=np.int64),
+                np.zeros(0, dtype=np.float32),
+            )
+        terms = list(self.terms)
+        offsets = np.searchsorted(segment.terms, np.arange(len(terms) + 1)).astype(np.int64)
+
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            terms=np.array(terms, dtype=str),
+            offsets=offsets,
+            rows=segment.rows,
+            tfs=segment.tfs,
+            lengths=self.lengths,
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "LexicalIndex":
+        """
+        Read an index written by ``save``.
+
+        Args:
+            path (str): The ``.npz`` file
+
+        Returns:
+            LexicalIndex: The loaded index
+        """
+        with np.load(path) as data:
+            return cls(
+                data["terms"].tolist(),
+                data["offsets"],
+                data["rows"],
+                data["tfs"],
+                data["lengths"],
+            )
+
+
+def _sorted_segment(terms: np.ndarray, rows: np.ndarray, tfs: np.ndarray) -> _Segment:
+    # Rows arrive in ascending order, so a stable sort keeps them sorted per term
+    order = np.argsort(terms, kind="stable")
+    return _Segment(terms[order], rows[order], tfs[order])
+
+
+def _merge(segments: List[_Segment]) -> _Segment:
+    # Later segments hold later rows, so concatenating keeps rows ascending
+    return _sorted_segment(
+        np.concatenate([segment.terms for segment in segments]),
+        np.concatenate([segment.rows for segment in segments]),
+        np.concatenate([segment.tfs for segment in segments]),
+    )
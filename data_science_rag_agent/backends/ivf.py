@@ -0,0 +1,198 @@
+"""
+Inverted-file (IVF) approximate nearest-neighbour index for the local backend.
+
+Chunk embeddings are partitioned by spherical k-means into ``nlist`` cells. A
+query only scores the rows in its ``nprobe`` closest cells, trading a little
+recall for a search cost that grows with ``nprobe / nlist`` instead of the full
+corpus size. The index stores centroids and row ids only; the vectors are read
+from the corpus' embedding matrix.
+"""
+
+import math
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Rows scored per block while assigning vectors to centroids, to bound memory
+_ASSIGN_BLOCK_ROWS = 65536
+
+
+class IVFIndex:
+    """
+    IVF index over unit-length vectors using cosine distance.
+    """
+
+    def __init__(self, centroids: np.ndarray, lists: Optional[List[np.ndarray]] = None):
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.lists: List[np.ndarray] = lists or [
+            np.zeros(0, dtype=np.int64) for _ in range(len(self.centroids))
+        ]
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @property
+    def size(self) -> int:
+        return sum(len(cell) for cell in self.lists)
+
+    # --- Construction ---
+
+    @classmethod
+    def train(
+        cls,
+        vectors: np.ndarray,
+        nlist: int = 0,
+        iterations: int = 20,
+        max_training_rows: int = 256,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        """
+        Learn cell centroids with spherical k-means on a sample of the vectors.
+
+        Args:
+            vectors (np.ndarray): Unit-length vectors, one per row
+            nlist (int): Number of cells; 0 picks ``4 * sqrt(n)``
+            iterations (int): Number of k-means iterations
+            max_training_rows (int): Training sample size per cell
+            seed (int): Random seed for sampling and initialisation
+
+        Returns:
+            IVFIndex: An empty index with trained centroids
+        """
+        rows = len(vectors)
+        if nlist <= 0:
+            nlist = max(1, int(4 * math.sqrt(rows)))
+        nlist = min(nlist, rows)
+
+        rng = np.random.default_rng(seed)
+        sample_size = min(rows, nlist * max_training_rows)
+        sample = np.asarray(
+            vectors[np.sort(rng.choice(rows, size=sample_size, replace=False))],
+            dtype=np.float32,
+        )
+        centroids = sample[rng.choice(sample_size, size=nlist, replace=False)].copy()
+
+        for _ in range(iterations):
+            assignment = _nearest(sample, centroids)
+            order = np.argsort(assignment, kind="stable")
+            cells, starts = np.unique(assignment[order], return_index=True)
+            sums = np.zeros_like(centroids)
+            sums[cells] = np.add.reduceat(sample[order], starts, axis=0)
+
+            # Re-seed cells that lost every member with random sample points
+            empty = np.setdiff1d(np.arange(nlist), cells)
+            sums[empty] = sample[rng.choice(sample_size, size=len(empty))]
+
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0.0] = 1.0
+            centroids = sums / norms
+
+        return cls(centroids)
+
+    def add(self, vectors: np.ndarray, first_row: int) -> None:
+        """
+        Insert vectors stored at rows ``first_row ..`` of the embedding matrix.
+
+        Args:
+            vectors (np.ndarray): The new unit-length vectors
+            first_row (int): Matrix row of the first new vector
+        """
+        if len(vectors) == 0:
+            return
+        assignment = _nearest(vectors, self.centroids)
+        rows = np.arange(first_row, first_row + len(vectors), dtype=np.int64)
+
+        order = np.argsort(assignment, kind="stable")
+        cells, starts = np.unique(assignment[order], return_index=True)
+        for cell, members in zip(cells, np.split(rows[order], starts[1:])):
+            self.lists[cell] = np.concatenate([self.lists[cell], members])
+
+    def copy(self) -> "IVFIndex":
+        """
+        Copy the index so it can be updated while searches use the original.
+
+        Returns:
+            IVFIndex: An index sharing the original's immutable arrays
+        """
+        return IVFIndex(self.centroids, list(self.lists))
+
+    def remap(self, keep: np.ndarray) -> None:
+        """
+        Drop removed rows and renumber the rest after the matrix was compacted.
+
+        Args:
+            keep (np.ndarray): Boolean mask over the old matrix rows that survived
+        """
+        new_row = np.cumsum(keep) - 1
+        self.lists = [new_row[cell[keep[cell]]] for cell in self.lists]
+
+    # --- Search ---
+
+    def search(
+        self, matrix: np.ndarray, query: np.ndarray, nprobe: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score the rows in the ``nprobe`` cells closest to the query.
+
+        Args:
+            matrix (np.ndarray): The embedding matrix the row ids refer to
+            query (np.ndarray): The unit-length query vector
+            nprobe (int): Number of cells to visit
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Candidate row ids and their cosine distances
+        """
+        nprobe = max(1, min(nprobe, self.nlist))
+        cell_scores = self.centroids @ query
+        probes = np.argpartition(-cell_scores, nprobe - 1)[:nprobe]
+
+        rows = np.concatenate([self.lists[cell] for cell in probes])
+        if len(rows) == 0:
+            return rows, np.zeros(0, dtype=np.float32)
+        rows.sort()
+        return rows, 1.0 - matrix[rows] @ query
+
+    # --- Persistence ---
+
+    def save(self, path: str) -> None:
+        """
+        Write the index as compressed-sparse-row arrays.
+
+        Args:
+            path (str): Destination ``.npz`` file
+        """
+        offsets = np.zeros(self.nlist + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(cell) for cell in self.lists])
+        ids = (
+            np.concatenate(self.lists) if self.size else np.zeros(0, dtype=np.int64)
+        )
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, centroids=self.centroids, offsets=offsets, ids=ids)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        """
+        Read an index written by ``save``.
+
+        Args:
+            path (str): The ``.npz`` file
+
+        Returns:
+            IVFIndex: The loaded index
+        """
+        with np.load(path) as data:
+            offsets = data["offsets"]
+            ids = data["ids"]
+            lists = [ids[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+            return cls(data["centroids"], lists)
+
+
+def _nearest(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    assignment = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), _ASSIGN_BLOCK_ROWS):
+        block = np.asarray(vectors[start : start + _ASSIGN_BLOCK_ROWS], dtype=np.float32)
+        assignment[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assignment
@@ -0,0 +1,651 @@
+"""
+In-process RAG backend backed by a memory-mapped embedding matrix.
+
+Every corpus lives in its own directory holding ``corpus.json`` (corpus and
+file metadata), ``chunks.jsonl`` (chunk texts, one per matrix row) and
+``embeddings.f32`` (a row-major float32 matrix of unit-length chunk
+embeddings). Retrieval is a brute-force matrix-vector product followed by
+``numpy.argpartition``, which answers small corpora in well under a millisecond
+without a network round trip. With ``LOCAL_RAG_INDEX=ivf`` corpora that grow
+past ``LOCAL_RAG_IVF_MIN_ROWS`` chunks also get an ``ivf.npz`` approximate
+nearest-neighbour index, so only a few cells of the matrix are scanned.
+A BM25 inverted index over the same chunks (``lexical.npz``) serves keyword
+search for hybrid retrieval.
+
+Documents are chunked with the streaming chunker (``LOCAL_RAG_CHUNK_STRATEGY``)
+and embedded in fixed-size batches, so large files are ingested in bounded
+memory.
+"""
+
+import functools
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..chunking import ChunkRecord, chunk_stream, read_blocks
+from ..config import (
+    LOCAL_RAG_CHUNK_STRATEGY,
+    LOCAL_RAG_DIR,
+    LOCAL_RAG_EMBEDDING_DIM,
+    LOCAL_RAG_INDEX,
+    LOCAL_RAG_IVF_MIN_ROWS,
+    LOCAL_RAG_IVF_NLIST,
+    LOCAL_RAG_IVF_NPROBE,
+    LOCATION,
+    PROJECT_ID,
+)
+from ..embeddings import get_embedding_service
+from .base import (
+    CorpusRecord,
+    FilePage,
+    ImportResult,
+    RagBackend,
+    RagFileRecord,
+    RetrievedContext,
+)
+from .bm25 import LexicalIndex
+from .ivf import IVFIndex
+
+logger = logging.getLogger(__name__)
+
+EmbedFn = Callable[[str], np.ndarray]
+
+# Chunks embedded and appended at a time, so ingestion memory stays bounded
+_INGEST_BATCH_CHUNKS = 256
+
+
+class _Snapshot(NamedTuple):
+    """Files, chunks, embedding matrix and indexes of one consistent corpus state."""
+
+    files: Dict[str, Dict[str, str]]
+    chunks: List[Dict[str, str]]
+    matrix: np.ndarray
+    index: Optional[IVFIndex]
+    lexical: LexicalIndex
+
+
+class _CorpusStore:
+    """
+    On-disk state of a single local corpus.
+
+    Writers hold the backend lock and publish a new ``snapshot`` when they are
+    done; readers take ``snapshot`` once and never see a half-applied change.
+    Published matrices and indexes are never modified in place, and rows past
+    a snapshot's matrix are ignored. A file's chunks are appended in batches
+    but only published, together with its metadata, by ``commit_file`` once
+    the whole file is in; readers skip rows of files not in the snapshot,
+    which another file's commit can publish early.
+
+    Appends only write ``embeddings.f32`` and ``chunks.jsonl``; the metadata
+    and the lexical and IVF indexes are saved by ``flush`` once per import.
+    Loading repairs whatever an interrupted import left unsaved.
+    """
+
+    def __init__(self, directory: str, dim: int, index_kind: str = "flat"):
+        self.directory = directory
+        self.dim = dim
+        self.index_kind = index_kind
+        with open(self._path("corpus.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.chunks: List[Dict[str, str]] = []
+        if os.path.exists(self._path("chunks.jsonl")):
+            with open(self._path("chunks.jsonl"), encoding="utf-8") as f:
+                self.chunks = [json.loads(line) for line in f if line.strip()]
+        self._dirty = False
+        self._truncate_matrix()
+        self.matrix = self._open_matrix()
+        self.index: Optional[IVFIndex] = None
+        if os.path.exists(self._path("ivf.npz")):
+            self.index = IVFIndex.load(self._path("ivf.npz"))
+            if self.index.size < len(self.chunks):
+                # Rows appended after the index was last saved
+                self.index.add(self.matrix[self.index.size :], self.index.size)
+                self._dirty = True
+        self.lexical = LexicalIndex()
+        if os.path.exists(self._path("lexical.npz")):
+            self.lexical = LexicalIndex.load(self._path("lexical.npz"))
+        if self.lexical.size != len(self.chunks):
+            # Corpora created before the lexical index, or appended to after
+            # it was last saved, get it rebuilt on load
+            self.lexical = LexicalIndex()
+            if self.chunks:
+                self.lexical.add([chunk["text"] for chunk in self.chunks], 0)
+            self._dirty = True
+
+        # Chunks of a file whose import never reached flush have no metadata
+        orphaned = np.array(
+            [chunk["file_id"] not in self.meta["files"] for chunk in self.chunks],
+            dtype=bool,
+        )
+        if orphaned.any():
+            self._remove_rows(~orphaned)
+        else:
+            self.flush()
+        self._publish()
+
+    @classmethod
+    def create(
+        cls, directory: str, meta: Dict, dim: int, index_kind: str = "flat"
+    ) -> "_CorpusStore":
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "corpus.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        return cls(directory, dim, index_kind)
+
+    def append(
+        self, file_meta: Dict[str, str], records: List[ChunkRecord], vectors: np.ndarray
+    ) -> None:
+        first_row = len(self.chunks)
+        with open(self._path("embeddings.f32"), "ab") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        with open(self._path("chunks.jsonl"), "a", encoding="utf-8") as f:
+            for record in records:
+                chunk = {
+                    "file_id": file_meta["file_id"],
+                    "text": record.text,
+                    "source_uri": file_meta["source_uri"],
+                    "source_name": file_meta["display_name"],
+                    "start": record.start,
+                    "end": record.end,
+                    "sha256": record.sha256,
+                    "heading": record.heading,
+                }
+                f.write(json.dumps(chunk) + "\n")
+                self.chunks.append(chunk)
+        self.matrix = self._open_matrix()
+        lexical = self.lexical.copy()
+        lexical.add([record.text for record in records], first_row)
+        self.lexical = lexical
+        self._dirty = True
+
+        # New rows join their nearest cells; large enough corpora get an index
+        if self.index is not None:
+            index = self.index.copy()
+            index.add(vectors, first_row)
+            self.index = index
+        elif self.index_kind == "ivf" and len(self.chunks) >= LOCAL_RAG_IVF_MIN_ROWS:
+            self.build_index()
+
+    def commit_file(self, file_meta: Dict[str, str]) -> None:
+        """Publish a file whose chunks have all been appended."""
+        self.meta["files"][file_meta["file_id"]] = file_meta
+        self.meta["update_time"] = _now()
+        self._dirty = True
+        self._publish()
+
+    def build_index(self, nlist: int = LOCAL_RAG_IVF_NLIST) -> None:
+        """Train an IVF index over the current matrix and persist it."""
+        index = IVFIndex.train(self.matrix, nlist=nlist)
+        index.add(self.matrix, 0)
+        index.save(self._path("ivf.npz"))
+        self.index = index
+        self._publish()
+
+    def flush(self) -> None:
+        """Save the metadata and indexes changed by appends since the last flush."""
+        if not self._dirty:
+            return
+        self._save_meta()
+        self.lexical.save(self._path("lexical.npz"))
+        if self.index is not None:
+            self.index.save(self._path("ivf.npz"))
+        self._dirty = False
+
+    def remove_file(self, file_id: str) -> None:
+        self.meta["files"].pop(file_id, None)
+        keep = np.array([chunk["file_id"] != file_id for chunk in self.chunks], dtype=bool)
+        if keep.all():
+            self._publish()
+        else:
+            self._remove_rows(keep)
+
+    def _remove_rows(self, keep: np.ndarray) -> None:
+        """Compact the corpus to the rows in ``keep`` and save everything."""
+        matrix = np.array(self.matrix[keep]) if len(self.chunks) else self.matrix
+        self.chunks = [chunk for chunk, kept in zip(self.chunks, keep) if kept]
+
+        # Release the current mapping before the file underneath is replaced
+        self.matrix = matrix
+        tmp_path = self._path("embeddings.f32.tmp")
+        matrix.astype(np.float32).tofile(tmp_path)
+        os.replace(tmp_path, self._path("embeddings.f32"))
+        with open(self._path("chunks.jsonl"), "w", encoding="utf-8") as f:
+            for chunk in self.chunks:
+                f.write(json.dumps(chunk) + "\n")
+
+        self.meta["update_time"] = _now()
+        self.matrix = self._open_matrix()
+
+        lexical = self.lexical.copy()
+        lexical.remap(keep)
+        self.lexical = lexical
+        if self.index is not None:
+            index = self.index.copy()
+            index.remap(keep)
+            self.index = index
+        self._dirty = True
+        self.flush()
+        self._publish()
+
+    def _publish(self) -> None:
+        # One reference assignment, so readers see the old state or the new one
+        self.snapshot = _Snapshot(
+            dict(self.meta["files"]), self.chunks, self.matrix, self.index, self.lexical
+        )
+
+    def _truncate_matrix(self) -> None:
+        # An interrupted append may have written vectors without their chunks
+        path = self._path("embeddings.f32")
+        size = len(self.chunks) * self.dim * np.dtype(np.float32).itemsize
+        if os.path.exists(path) and os.path.getsize(path) > size:
+            os.truncate(path, size)
+
+    def _open_matrix(self) -> np.ndarray:
+        rows = len(self.chunks)
+        if rows == 0:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.memmap(
+            self._path("embeddings.f32"), dtype=np.float32, mode="r", shape=(rows, self.dim)
+        )
+
+    def _save_meta(self) -> None:
+        tmp_path = self._path("corpus.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_path, self._path("corpus.json"))
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+
+class LocalRagBackend(RagBackend):
+    """
+    ``RagBackend`` that keeps corpora on the local filesystem.
+
+    Sources can be local files or directories (optionally ``file://`` URIs) and
+    ``gs://`` objects. Google Drive sources are not supported and are reported
+    as failed imports.
+    """
+
+    supports_local_paths = True
+    supports_lexical = True
+
+    def __init__(
+        self,
+        root_dir: str = LOCAL_RAG_DIR,
+        embed_fn: Optional[EmbedFn] = None,
+        dim: int = LOCAL_RAG_EMBEDDING_DIM,
+        index_kind: str = LOCAL_RAG_INDEX,
+        nprobe: int = LOCAL_RAG_IVF_NPROBE,
+        chunk_strategy: str = LOCAL_RAG_CHUNK_STRATEGY,
+    ):
+        self.root_dir = root_dir
+        self.dim = dim
+        self.index_kind = index_kind
+        self.nprobe = nprobe
+        self.chunk_strategy = chunk_strategy
+        self.embed_fn: EmbedFn = embed_fn or get_embedding_service()
+        self._lock = threading.RLock()
+        self._stores: Dict[str, _CorpusStore] = {}
+        os.makedirs(root_dir, exist_ok=True)
+
+    # --- Corpora ---
+
+    def list_corpora(self, page_size: Optional[int] = None) -> Iterator[CorpusRecord]:
+        # Only the metadata is read; chunks and indexes load on first use
+        for corpus_id in sorted(os.listdir(self.root_dir)):
+            store = self._stores.get(self._corpus_name(corpus_id))
+            if store is not None:
+                yield _corpus_record(store.meta)
+                continue
+            try:
+                with open(
+                    os.path.join(self.root_dir, corpus_id, "corpus.json"), encoding="utf-8"
+                ) as f:
+                    yield _corpus_record(json.load(f))
+            except FileNotFoundError:
+                continue
+
+    def create_corpus(self, display_name: str, embedding_model: str) -> CorpusRecord:
+        corpus_id = uuid.uuid4().hex[:16]
+        name = self._corpus_name(corpus_id)
+        now = _now()
+        meta = {
+            "name": name,
+            "display_name": display_name,
+            "embedding_model": embedding_model,
+            "create_time": now,
+            "update_time": now,
+            "files": {},
+        }
+        with self._lock:
+            self._stores[name] = _CorpusStore.create(
+                os.path.join(self.root_dir, corpus_id), meta, self.dim, self.index_kind
+            )
+        return _corpus_record(meta)
+
+    def delete_corpus(self, corpus_name: str) -> None:
+        with self._lock:
+            store = self._store(corpus_name)
+            self._stores.pop(corpus_name, None)
+            for name in os.listdir(store.directory):
+                os.remove(os.path.join(store.directory, name))
+            os.rmdir(store.directory)
+
+    # --- Files ---
+
+    def import_files(
+        self,
+        corpus_name: str,
+        paths: Sequence[str],
+        chunk_size: int,
+        chunk_overlap: int,
+        max_embedding_requests_per_min: int,
+    ) -> ImportResult:
+        store = self._store(corpus_name)
+        result = ImportResult()
+        try:
+            self._import_paths(corpus_name, store, paths, chunk_size, chunk_overlap, result)
+        finally:
+            # Metadata and indexes are written once for the whole import
+            with self._lock:
+                store.flush()
+        return result
+
+    def _import_paths(
+        self,
+        corpus_name: str,
+        store: _CorpusStore,
+        paths: Sequence[str],
+        chunk_size: int,
+        chunk_overlap: int,
+        result: ImportResult,
+    ) -> None:
+        for path in paths:
+            try:
+                sources = list(self._sources(path))
+            except Exception as e:
+                logger.warning("Failed to import '%s' into local corpus: %s", path, e)
+                result.failed_rag_files_count += 1
+                continue
+
+            for source_uri, display_name, open_blocks in sources:
+                file_meta = {
+                    "file_id": uuid.uuid4().hex[:16],
+                    "display_name": display_name,
+                    "source_uri": source_uri,
+                    "create_time": _now(),
+                    "update_time": _now(),
+                }
+                try:
+                    chunk_count = self._ingest(
+                        store, file_meta, open_blocks(), chunk_size, chunk_overlap
+                    )
+                except Exception as e:
+                    logger.warning(
+                        "Failed to import '%s' into local corpus: %s", source_uri, e
+                    )
+                    with self._lock:
+                        store.remove_file(file_meta["file_id"])
+                    result.failed_rag_files_count += 1
+                    continue
+
+                if chunk_count:
+                    with self._lock:
+                        store.commit_file(file_meta)
+                    result.imported_rag_files_count += 1
+                    result.rag_files.append(_file_record(corpus_name, file_meta))
+                else:
+                    result.skipped_rag_files_count += 1
+
+    def list_files(
+        self, corpus_name: str, page_size: Optional[int] = None
+    ) -> Iterator[RagFileRecord]:
+        for file_meta in self._store(corpus_name).snapshot.files.values():
+            yield _file_record(corpus_name, file_meta)
+
+    def list_files_page(
+        self, corpus_name: str, page_size: int, page_token: str = ""
+    ) -> FilePage:
+        # Slice the in-memory file table instead of re-walking it for every page
+        try:
+            offset = int(page_token or 0)
+        except ValueError:
+            raise ValueError(f"Invalid page token '{page_token}'") from None
+        if offset < 0:
+            raise ValueError(f"Invalid page token '{page_token}'")
+
+        file_metas = list(self._store(corpus_name).snapshot.files.values())
+        end = offset + page_size
+        return FilePage(
+            files=[_file_record(corpus_name, file_meta) for file_meta in file_metas[offset:end]],
+            next_page_token=str(end) if end < len(file_metas) else "",
+        )
+
+    def delete_file(self, file_name: str) -> None:
+        corpus_name, _, file_id = file_name.partition("/ragFiles/")
+        with self._lock:
+            store = self._store(corpus_name)
+            if file_id not in store.meta["files"]:
+                raise KeyError(f"RAG file '{file_name}' does not exist")
+            store.remove_file(file_id)
+
+    # --- Retrieval ---
+
+    def retrieval_query(
+        self,
+        corpus_names: Sequence[str],
+        text: str,
+        top_k: int,
+        distance_threshold: float,
+    ) -> List[RetrievedContext]:
+        query = self._embed_all([text])[0]
+
+        candidates: List[Tuple[float, Dict[str, str]]] = []
+        for corpus_name in corpus_names:
+            files, chunks, matrix, index, _ = self._store(corpus_name).snapshot
+            if len(matrix) == 0:
+                continue
+
+            if index is not None:
+                # Only score the rows in the cells nearest to the query
+                rows, distances = index.search(matrix, query, self.nprobe)
+            else:
+                # Cosine distance of every chunk in one matrix-vector product
+                rows = np.arange(len(matrix))
+                distances = 1.0 - matrix @ query
+
+            matches = np.flatnonzero(distances < distance_threshold)
+            if len(matches) > top_k:
+                matches = matches[np.argpartition(distances[matches], top_k - 1)[:top_k]]
+            candidates.extend(
+                (float(distances[match]), chunks[rows[match]])
+                for match in matches
+                if chunks[rows[match]]["file_id"] in files
+            )
+
+        candidates.sort(key=lambda candidate: candidate[0])
+        return [
+            RetrievedContext(
+                source_uri=chunk["source_uri"],
+                source_name=chunk["source_name"],
+                text=chunk["text"],
+                score=distance,
+            )
+            for distance, chunk in candidates[:top_k]
+        ]
+
+    def lexical_query(
+        self,
+        corpus_names: Sequence[str],
+        text: str,
+        top_k: int,
+    ) -> List[RetrievedContext]:
+        query = self._embed_all([text])[0]
+
+        candidates: List[Tuple[float, float, Dict[str, str]]] = []
+        for corpus_name in corpus_names:
+            files, chunks, matrix, _, lexical = self._store(corpus_name).snapshot
+            rows, scores = lexical.search(text, top_k)
+            if len(rows) == 0:
+                continue
+            # Report vector distances so results merge with retrieval_query's
+            distances = 1.0 - np.asarray(matrix[rows]) @ query
+            candidates.extend(
+                (float(score), float(distance), chunks[row])
+                for row, score, distance in zip(rows, scores, distances)
+                if chunks[row]["file_id"] in files
+            )
+
+        candidates.sort(key=lambda candidate: -candidate[0])
+        return [
+            RetrievedContext(
+                source_uri=chunk["source_uri"],
+                source_name=chunk["source_name"],
+                text=chunk["text"],
+                score=distance,
+            )
+            for _, distance, chunk in candidates[:top_k]
+        ]
+
+    # --- Helpers ---
+
+    def _corpus_name(self, corpus_id: str) -> str:
+        return (
+            f"projects/{PROJECT_ID or 'local'}/locations/{LOCATION or 'local'}"
+            f"/ragCorpora/{corpus_id}"
+        )
+
+    def _store(self, corpus_name: str) -> _CorpusStore:
+        store = self._stores.get(corpus_name)
+        if store is not None:
+            return store
+        with self._lock:
+            if corpus_name not in self._stores:
+                directory = os.path.join(self.root_dir, corpus_name.split("/")[-1])
+                if not os.path.exists(os.path.join(directory, "corpus.json")):
+                    raise KeyError(f"Corpus '{corpus_name}' does not exist")
+                self._stores[corpus_name] = _CorpusStore(
+                    directory, self.dim, self.index_kind
+                )
+            return self._stores[corpus_name]
+
+    def _embed_all(self, texts: List[str]) -> np.ndarray:
+        embed_many = getattr(self.embed_fn, "embed_many", None)
+        if embed_many is not None:
+            # Batched and cached by the embedding service
+            vectors = np.asarray(embed_many(texts), dtype=np.float32)
+        else:
+            vectors = np.stack(
+                [np.asarray(self.embed_fn(text), dtype=np.float32).ravel() for text in texts]
+            )
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0.0] = 1.0
+        return vectors / norms
+
+    def _ingest(
+        self,
+        store: _CorpusStore,
+        file_meta: Dict[str, str],
+        blocks: Iterator[str],
+        chunk_size: int,
+        chunk_overlap: int,
+    ) -> int:
+        """Chunk, embed and append one document in bounded batches."""
+        chunk_count = 0
+        batch: List[ChunkRecord] = []
+        records = chunk_stream(blocks, self.chunk_strategy, chunk_size, chunk_overlap)
+        for record in records:
+            batch.append(record)
+            if len(batch) == _INGEST_BATCH_CHUNKS:
+                self._append(store, file_meta, batch)
+                chunk_count += len(batch)
+                batch = []
+        if batch:
+            self._append(store, file_meta, batch)
+            chunk_count += len(batch)
+        return chunk_count
+
+    def _append(
+        self, store: _CorpusStore, file_meta: Dict[str, str], batch: List[ChunkRecord]
+    ) -> None:
+        vectors = self._embed_all([record.text for record in batch])
+        with self._lock:
+            store.append(file_meta, batch, vectors)
+
+    def _sources(
+        self, path: str
+    ) -> Iterator[Tuple[str, str, Callable[[], Iterator[str]]]]:
+        """Yield (source URI, display name, block reader) for every document under a path."""
+        if path.startswith("gs://"):
+            yield from _gcs_sources(path)
+            return
+
+        local_path = path[len("file://"):] if path.startswith("file://") else path
+        if os.path.isdir(local_path):
+            for directory, _, names in os.walk(local_path):
+                for name in sorted(names):
+                    file_path = os.path.join(directory, name)
+                    yield file_path, name, functools.partial(_local_blocks, file_path)
+        elif os.path.isfile(local_path):
+            yield (
+                local_path,
+                os.path.basename(local_path),
+                functools.partial(_local_blocks, local_path),
+            )
+        else:
+            raise FileNotFoundError(f"Unsupported or missing source: {path}")
+
+
+def _file_record(corpus_name: str, file_meta: Dict) -> RagFileRecord:
+    return RagFileRecord(
+        name=f"{corpus_name}/ragFiles/{file_meta['file_id']}",
+        display_name=file_meta["display_name"],
+        source_uri=file_meta["source_uri"],
+        create_time=file_meta["create_time"],
+        update_time=file_meta["update_time"],
+    )
+
+
+def _local_blocks(path: str) -> Iterator[str]:
+    with open(path, encoding="utf-8", errors="replace") as f:
+        yield from read_blocks(f)
+
+
+def _gcs_blocks(blob) -> Iterator[str]:
+    with blob.open("r", encoding="utf-8", errors="replace") as f:
+        yield from read_blocks(f)
+
+
+def _gcs_sources(uri: str) -> Iterator[Tuple[str, str, Callable[[], Iterator[str]]]]:
+    from google.cloud import storage
+
+    bucket_name, _, prefix = uri[len("gs://"):].partition("/")
+    client = storage.Client()
+    for blob in client.list_blobs(bucket_name, prefix=prefix):
+        if blob.name.endswith("/"):
+            continue
+        yield (
+            f"gs://{bucket_name}/{blob.name}",
+            blob.name.split("/")[-1],
+            functools.partial(_gcs_blocks, blob),
+        )
+
+
+def _corpus_record(meta: Dict) -> CorpusRecord:
+    return CorpusRecord(
+        name=meta["name"],
+        display_name=meta["display_name"],
+        create_time=meta["create_time"],
+        update_time=meta["update_time"],
+    )
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
@@ -0,0 +1,390 @@
+"""
+Deadlines, retries, a circuit breaker and bounded concurrency around a backend.
+
+Every call to the wrapped backend runs on a bounded worker pool and is abandoned
+once its deadline passes, so a hung RPC cannot hold a tool call forever. Reads
+(listings, ``retrieval_query``, ``lexical_query``) are
+idempotent and are retried with jittered exponential backoff on transient
+errors. Writes are never retried, because a timed-out import may still have
+happened.
+
+A caller can bound every backend call it makes, retries included, with
+``request_deadline``. Calls run on this wrapper's own pool, so a caller whose
+deadline passes gets ``BackendDeadlineExceeded`` and its thread back instead
+of waiting for a hung RPC.
+
+Consecutive transient failures open the circuit breaker. While it is open,
+calls fail immediately with ``CircuitOpenError`` instead of piling onto a
+degraded backend. After a cooldown one probe call is let through; if it
+succeeds, the breaker closes again.
+"""
+
+import contextvars
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple, Type, TypeVar
+
+from google.api_core import exceptions as api_exceptions
+
+from ..config import (
+    LIST_FILES_PAGE_SIZE,
+    RAG_BACKEND_BREAKER_FAILURES,
+    RAG_BACKEND_BREAKER_RESET_SECONDS,
+    RAG_BACKEND_DEADLINE_SECONDS,
+    RAG_BACKEND_IMPORT_DEADLINE_SECONDS,
+    RAG_BACKEND_MAX_CONCURRENCY,
+    RAG_BACKEND_MAX_RETRIES,
+    RAG_BACKEND_RETRY_BASE_SECONDS,
+    RAG_BACKEND_RETRY_MAX_SECONDS,
+)
+from .base import (
+    CorpusRecord,
+    FilePage,
+    ImportResult,
+    RagBackend,
+    RagFileRecord,
+    RetrievedContext,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Errors that say nothing about the request itself and may pass on retry
+TRANSIENT_ERRORS: Tuple[Type[BaseException], ...] = (
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.InternalServerError,
+    api_exceptions.DeadlineExceeded,
+    api_exceptions.TooManyRequests,
+    api_exceptions.Aborted,
+    api_exceptions.GatewayTimeout,
+    TimeoutError,
+    ConnectionError,
+)
+
+
+# time.monotonic() by which the current request needs its backend calls done
+_request_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "request_deadline", default=None
+)
+
+
+@contextmanager
+def request_deadline(seconds: float) -> Iterator[None]:
+    """
+    Bound the backend calls made in this context, and in copies of it, by ``seconds``.
+
+    A nested deadline can shorten an enclosing one but never extend it.
+
+    Args:
+        seconds (float): Time from now after which calls give up
+    """
+    deadline = time.monotonic() + seconds
+    outer = _request_deadline.get()
+    token = _request_deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _request_deadline.reset(token)
+
+
+class BackendDeadlineExceeded(TimeoutError):
+    """A backend call did not finish within its deadline."""
+
+
+class CircuitOpenError(RuntimeError):
+    """The backend is failing; calls are rejected until the cooldown ends."""
+
+
+class BackendOverloaded(RuntimeError):
+    """No concurrency slot became free before the call's deadline."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with a single half-open probe.
+
+    Args:
+        failure_threshold (int): Consecutive failures that open the circuit
+        reset_seconds (float): How long the circuit stays open before a probe
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                return "half_open"
+            return "open"
+
+    def before_call(self) -> None:
+        """
+        Admit or reject a call.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a probe in flight
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self.reset_seconds - (time.monotonic() - self._opened_at)
+            if remaining > 0 or self._probing:
+                raise CircuitOpenError(
+                    f"RAG backend unavailable after {self._failures} consecutive "
+                    f"failures; retry in {max(remaining, 0):.1f}s"
+                )
+            self._probing = True
+
+    def on_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("RAG backend recovered; closing circuit breaker")
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def on_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or (
+                self._opened_at is None and self._failures >= self.failure_threshold
+            ):
+                logger.warning(
+                    "Opening RAG backend circuit breaker after %d consecutive failures",
+                    self._failures,
+                )
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def on_neutral(self) -> None:
+        # A non-transient error (e.g. NotFound) proves the backend is answering
+        self.on_success()
+
+    def on_skipped(self) -> None:
+        # The call never reached the backend; let another call probe instead
+        with self._lock:
+            self._probing = False
+
+
+class ResilientBackend(RagBackend):
+    """
+    ``RagBackend`` wrapper adding deadlines, read retries, a circuit breaker and a concurrency limit.
+
+    Args:
+        backend (RagBackend): The backend to protect
+        deadline_seconds (float): Deadline of each attempt of a regular call
+        import_deadline_seconds (float): Deadline of ``import_files``
+        max_retries (int): Extra attempts for reads after a transient error
+        retry_base_seconds (float): Backoff before the first retry; doubles each time
+        retry_max_seconds (float): Upper bound of a single backoff
+        max_concurrency (int): Calls allowed in flight at once
+        breaker (Optional[CircuitBreaker]): Breaker to use instead of a new one
+        transient_errors (Tuple[Type[BaseException], ...]): Errors that are retried
+            and counted by the breaker
+    """
+
+    def __init__(
+        self,
+        backend: RagBackend,
+        deadline_seconds: float = RAG_BACKEND_DEADLINE_SECONDS,
+        import_deadline_seconds: float = RAG_BACKEND_IMPORT_DEADLINE_SECONDS,
+        max_retries: int = RAG_BACKEND_MAX_RETRIES,
+        retry_base_seconds: float = RAG_BACKEND_RETRY_BASE_SECONDS,
+        retry_max_seconds: float = RAG_BACKEND_RETRY_MAX_SECONDS,
+        max_concurrency: int = RAG_BACKEND_MAX_CONCURRENCY,
+        breaker: Optional[CircuitBreaker] = None,
+        transient_errors: Tuple[Type[BaseException], ...] = TRANSIENT_ERRORS,
+    ):
+        self.backend = backend
+        self.deadline_seconds = deadline_seconds
+        self.import_deadline_seconds = import_deadline_seconds
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.breaker = breaker or CircuitBreaker(
+            RAG_BACKEND_BREAKER_FAILURES, RAG_BACKEND_BREAKER_RESET_SECONDS
+        )
+        self.transient_errors = transient_errors
+        self.supports_local_paths = backend.supports_local_paths
+        self.supports_lexical = backend.supports_lexical
+
+        # The semaphore is released by the worker when the backend call really
+        # ends, so calls abandoned at their deadline still count against the limit
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="rag-backend"
+        )
+
+    # --- Reads: retried ---
+
+    def list_corpora(self, page_size: Optional[int] = None) -> Iterator[CorpusRecord]:
+        # Materialized inside the deadline so a stalled page cannot block the caller
+        yield from self._read(lambda: list(self.backend.list_corpora(page_size)))
+
+    def list_files(
+        self, corpus_name: str, page_size: Optional[int] = None
+    ) -> Iterator[RagFileRecord]:
+        # Page by page, so each page gets its own deadline and memory stays
+        # bounded by the page size however large the corpus is
+        page_token = ""
+        while True:
+            page = self.list_files_page(corpus_name, page_size or LIST_FILES_PAGE_SIZE, page_token)
+            yield from page.files
+            page_token = page.next_page_token
+            if not page_token:
+                return
+
+    def list_files_page(
+        self, corpus_name: str, page_size: int, page_token: str = ""
+    ) -> FilePage:
+        return self._read(
+            lambda: self.backend.list_files_page(corpus_name, page_size, page_token)
+        )
+
+    def retrieval_query(
+        self,
+        corpus_names: Sequence[str],
+        text: str,
+        top_k: int,
+        distance_threshold: float,
+    ) -> List[RetrievedContext]:
+        return self._read(
+            lambda: self.backend.retrieval_query(corpus_names, text, top_k, distance_threshold)
+        )
+
+    def lexical_query(
+        self,
+        corpus_names: Sequence[str],
+        text: str,
+        top_k: int,
+    ) -> List[RetrievedContext]:
+        return self._read(lambda: self.backend.lexical_query(corpus_names, text, top_k))
+
+    # --- Writes: single attempt ---
+
+    def create_corpus(self, display_name: str, embedding_model: str) -> CorpusRecord:
+        return self._call(
+            lambda: self.backend.create_corpus(display_name, embedding_model),
+            self.deadline_seconds,
+        )
+
+    def delete_corpus(self, corpus_name: str) -> None:
+        self._call(lambda: self.backend.delete_corpus(corpus_name), self.deadline_seconds)
+
+    def import_files(
+        self,
+        corpus_name: str,
+        paths: Sequence[str],
+        chunk_size: int,
+        chunk_overlap: int,
+        max_embedding_requests_per_min: int,
+    ) -> ImportResult:
+        return self._call(
+            lambda: self.backend.import_files(
+                corpus_name, paths, chunk_size, chunk_overlap, max_embedding_requests_per_min
+            ),
+            self.import_deadline_seconds,
+        )
+
+    def delete_file(self, file_name: str) -> None:
+        self._call(lambda: self.backend.delete_file(file_name), self.deadline_seconds)
+
+    # --- Helpers ---
+
+    def _read(self, fn: Callable[[], T]) -> T:
+        attempt = 0
+        while True:
+            try:
+                return self._call(fn, self.deadline_seconds)
+            except self.transient_errors as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                request_deadline_at = _request_deadline.get()
+                if (
+                    request_deadline_at is not None
+                    and time.monotonic() + delay >= request_deadline_at
+                ):
+                    raise
+                logger.debug(
+                    "Transient RAG backend error (%s); retry %d in %.2fs",
+                    e,
+                    attempt + 1,
+                    delay,
+                )
+                time.sleep(delay)
+                attempt += 1
+
+    def _call(self, fn: Callable[[], T], deadline_seconds: float) -> T:
+        started = time.monotonic()
+        # The caller's request deadline overrides a longer per-call deadline
+        request_deadline_at = _request_deadline.get()
+        cut_by_request = (
+            request_deadline_at is not None
+            and request_deadline_at - started < deadline_seconds
+        )
+        if cut_by_request:
+            deadline_seconds = request_deadline_at - started
+            if deadline_seconds <= 0:
+                raise BackendDeadlineExceeded("The request's deadline has passed")
+        self.breaker.before_call()
+        if not self._slots.acquire(timeout=deadline_seconds):
+            # Saturation is the caller's problem, not a sign of backend failure
+            self.breaker.on_skipped()
+            raise BackendOverloaded(
+                f"No RAG backend slot free within {deadline_seconds:.1f}s"
+            )
+
+        try:
+            future = self._executor.submit(self._run_in_slot, fn)
+        except BaseException:
+            self._slots.release()
+            self.breaker.on_skipped()
+            raise
+
+        try:
+            remaining = deadline_seconds - (time.monotonic() - started)
+            result = future.result(timeout=max(0.0, remaining))
+        except FutureTimeoutError:
+            if cut_by_request:
+                # The caller ran out of time; the backend may be healthy
+                self.breaker.on_skipped()
+                raise BackendDeadlineExceeded(
+                    f"RAG backend call exceeded the request's {deadline_seconds:.1f}s left"
+                ) from None
+            self.breaker.on_failure()
+            raise BackendDeadlineExceeded(
+                f"RAG backend call exceeded its {deadline_seconds:.1f}s deadline"
+            ) from None
+        except self.transient_errors:
+            self.breaker.on_failure()
+            raise
+        except Exception:
+            self.breaker.on_neutral()
+            raise
+        self.breaker.on_success()
+        return result
+
+    def _run_in_slot(self, fn: Callable[[], T]) -> T:
+        try:
+            return fn()
+        finally:
+            self._slots.release()
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: spreads retries from concurrent callers over the whole window
+        return random.uniform(0, min(self.retry_max_seconds, self.retry_base_seconds * 2**attempt))
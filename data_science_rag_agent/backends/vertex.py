@@ -0,0 +1,153 @@
+"""
+RAG backend that delegates to the Vertex AI RAG Engine.
+"""
+
+from typing import Iterator, List, Optional, Sequence
+
+from vertexai import rag
+
+from ..vertex_init import init_vertexai
+from .base import (
+    CorpusRecord,
+    FilePage,
+    ImportResult,
+    RagBackend,
+    RagFileRecord,
+    RetrievedContext,
+)
+
+
+class VertexRagBackend(RagBackend):
+    """
+    Thin adapter from the ``RagBackend`` interface to ``vertexai.rag``.
+    """
+
+    def __init__(self):
+        init_vertexai()
+
+    def list_corpora(self, page_size: Optional[int] = None) -> Iterator[CorpusRecord]:
+        # Iterating the pager walks every page of the listing
+        for corpus in rag.list_corpora(page_size=page_size):
+            yield _corpus_record(corpus)
+
+    def create_corpus(self, display_name: str, embedding_model: str) -> CorpusRecord:
+        embedding_model_config = rag.RagEmbeddingModelConfig(
+            vertex_prediction_endpoint=rag.VertexPredictionEndpoint(
+                publisher_model=embedding_model
+            )
+        )
+        rag_corpus = rag.create_corpus(
+            display_name=display_name,
+            backend_config=rag.RagVectorDbConfig(
+                rag_embedding_model_config=embedding_model_config
+            ),
+        )
+        return _corpus_record(rag_corpus)
+
+    def delete_corpus(self, corpus_name: str) -> None:
+        rag.delete_corpus(corpus_name)
+
+    def import_files(
+        self,
+        corpus_name: str,
+        paths: Sequence[str],
+        chunk_size: int,
+        chunk_overlap: int,
+        max_embedding_requests_per_min: int,
+    ) -> ImportResult:
+        transformation_config = rag.TransformationConfig(
+            chunking_config=rag.ChunkingConfig(
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+            ),
+        )
+        response = rag.import_files(
+            corpus_name,
+            list(paths),
+            transformation_config=transformation_config,
+            max_embedding_requests_per_min=max_embedding_requests_per_min,
+        )
+        return ImportResult(
+            imported_rag_files_count=response.imported_rag_files_count,
+            skipped_rag_files_count=getattr(response, "skipped_rag_files_count", 0),
+            failed_rag_files_count=getattr(response, "failed_rag_files_count", 0),
+        )
+
+    def list_files(
+        self, corpus_name: str, page_size: Optional[int] = None
+    ) -> Iterator[RagFileRecord]:
+        for rag_file in rag.list_files(corpus_name, page_size=page_size):
+            yield _file_record(rag_file)
+
+    def list_files_page(
+        self, corpus_name: str, page_size: int, page_token: str = ""
+    ) -> FilePage:
+        # Only the pager's first response is read, so this is a single RPC
+        pager = rag.list_files(corpus_name, page_size=page_size, page_token=page_token or None)
+        return FilePage(
+            files=[_file_record(rag_file) for rag_file in pager.rag_files],
+            next_page_token=pager.next_page_token,
+        )
+
+    def delete_file(self, file_name: str) -> None:
+        rag.delete_file(file_name)
+
+    def retrieval_query(
+        self,
+        corpus_names: Sequence[str],
+        text: str,
+        top_k: int,
+        distance_threshold: float,
+    ) -> List[RetrievedContext]:
+        rag_retrieval_config = rag.RagRetrievalConfig(
+            top_k=top_k,
+            filter=rag.Filter(vector_distance_threshold=distance_threshold),
+        )
+        response = rag.retrieval_query(
+            rag_resources=[rag.RagResource(rag_corpus=name) for name in corpus_names],
+            text=text,
+            rag_retrieval_config=rag_retrieval_config,
+        )
+
+        contexts = []
+        if hasattr(response, "contexts") and response.contexts:
+            for context in response.contexts.contexts:
+                contexts.append(
+                    RetrievedContext(
+                        source_uri=getattr(context, "source_uri", ""),
+                        source_name=getattr(context, "source_display_name", ""),
+                        text=getattr(context, "text", ""),
+                        score=getattr(context, "score", 0.0),
+                    )
+                )
+        return contexts
+
+
+def _corpus_record(corpus) -> CorpusRecord:
+    return CorpusRecord(
+        name=corpus.name,
+        display_name=getattr(corpus, "display_name", "") or "",
+        create_time=str(getattr(corpus, "create_time", "") or ""),
+        update_time=str(getattr(corpus, "update_time", "") or ""),
+    )
+
+
+def _file_record(rag_file) -> RagFileRecord:
+    resource_id = ""
+    source_uri = ""
+    drive_source = getattr(rag_file, "google_drive_source", None)
+    if drive_source and drive_source.resource_ids:
+        resource_id = drive_source.resource_ids[0].resource_id
+        source_uri = f"https://drive.google.com/file/d/{resource_id}/view"
+    gcs_source = getattr(rag_file, "gcs_source", None)
+    if gcs_source and gcs_source.uris:
+        source_uri = gcs_source.uris[0]
+
+    return RagFileRecord(
+        name=rag_file.name,
+        display_name=getattr(rag_file, "display_name", "") or "",
+        source_uri=source_uri,
+        resource_id=resource_id,
+        create_time=str(getattr(rag_file, "create_time", "") or ""),
+        update_time=str(getattr(rag_file, "update_time", "") or ""),
+    )
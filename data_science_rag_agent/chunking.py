@@ -0,0 +1,330 @@
+"""
+Streaming document chunker.
+
+Documents are read as a stream of text blocks and split into chunks without
+ever holding a whole file in memory, so multi-hundred-MB corpora are chunked
+in constant memory. Three strategies are available:
+
+- ``token``: fixed windows of whitespace tokens with overlap (the same
+  windows Vertex AI builds from ``DEFAULT_CHUNK_SIZE``/``DEFAULT_CHUNK_OVERLAP``)
+- ``sentence``: windows that only break between sentences
+- ``markdown``: one or more windows per markdown section, never crossing a
+  heading, with the heading path recorded on every chunk
+
+Every chunk carries its character offsets in the source and a SHA-256 of its
+text, so chunks can be deduplicated and traced back to the document.
+"""
+
+import hashlib
+import re
+import time
+from dataclasses import dataclass
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+
+_TOKEN_PATTERN = re.compile(r"\S+")
+_HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_FENCE_PATTERN = re.compile(r"^\s*(```|~~~)")
+_SENTENCE_END_PATTERN = re.compile(r"[.!?][\"'”’)\]]*$")
+
+CHUNK_STRATEGIES = ("token", "sentence", "markdown")
+
+# (text, start offset, end offset)
+Token = Tuple[str, int, int]
+
+
+@dataclass
+class ChunkRecord:
+    """A chunk of a document with its position in the source."""
+
+    index: int
+    text: str
+    start: int
+    end: int
+    sha256: str
+    heading: str = ""
+
+
+@dataclass
+class ChunkingStats:
+    """Throughput counters for one or more chunking runs."""
+
+    chunks: int = 0
+    characters: int = 0
+    seconds: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "chunks": self.chunks,
+            "characters": self.characters,
+            "seconds": round(self.seconds, 3),
+            "chunks_per_second": round(self.chunks_per_second, 1),
+        }
+
+
+def read_blocks(stream: IO[str], block_size: int = 1 << 20) -> Iterator[str]:
+    """
+    Read a text stream in fixed-size blocks.
+
+    Args:
+        stream (IO[str]): An open text stream
+        block_size (int): Characters per block
+
+    Yields:
+        str: The next block of text
+    """
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            return
+        yield block
+
+
+def chunk_file(
+    path: str,
+    strategy: str = "token",
+    chunk_size: int = 512,
+    chunk_overlap: int = 100,
+    stats: Optional[ChunkingStats] = None,
+) -> Iterator[ChunkRecord]:
+    """
+    Stream the chunks of a local text file.
+
+    Args:
+        path (str): The file to chunk
+        strategy (str): One of ``CHUNK_STRATEGIES``
+        chunk_size (int): Maximum tokens per chunk
+        chunk_overlap (int): Tokens shared by consecutive chunks
+        stats (Optional[ChunkingStats]): Counters to update while chunking
+
+    Yields:
+        ChunkRecord: The next chunk
+    """
+    with open(path, encoding="utf-8", errors="replace") as f:
+        yield from chunk_stream(read_blocks(f), strategy, chunk_size, chunk_overlap, stats)
+
+
+def chunk_text(
+    text: str,
+    strategy: str = "token",
+    chunk_size: int = 512,
+    chunk_overlap: int = 100,
+) -> List[ChunkRecord]:
+    """
+    Chunk an in-memory string.
+
+    Args:
+        text (str): The document text
+        strategy (str): One of ``CHUNK_STRATEGIES``
+        chunk_size (int): Maximum tokens per chunk
+        chunk_overlap (int): Tokens shared by consecutive chunks
+
+    Returns:
+        List[ChunkRecord]: The chunks in document order
+    """
+    return list(chunk_stream([text], strategy, chunk_size, chunk_overlap))
+
+
+def chunk_stream(
+    blocks: Iterable[str],
+    strategy: str = "token",
+    chunk_size: int = 512,
+    chunk_overlap: int = 100,
+    stats: Optional[ChunkingStats] = None,
+) -> Iterator[ChunkRecord]:
+    """
+    Split a stream of text blocks into chunks.
+
+    Args:
+        blocks (Iterable[str]): Consecutive pieces of one document
+        strategy (str): One of ``CHUNK_STRATEGIES``
+        chunk_size (int): Maximum tokens per chunk
+        chunk_overlap (int): Tokens shared by consecutive chunks
+        stats (Optional[ChunkingStats]): Counters to update while chunking
+
+    Yields:
+        ChunkRecord: The next chunk
+    """
+    if strategy not in CHUNK_STRATEGIES:
+        raise ValueError(
+            f"Unknown chunking strategy '{strategy}'; expected one of {CHUNK_STRATEGIES}"
+        )
+    chunk_size = max(1, chunk_size)
+    chunk_overlap = min(max(0, chunk_overlap), chunk_size - 1)
+
+    lines = _iter_lines(blocks, stats)
+    if strategy == "token":
+        windows = (
+            (window, "")
+            for window in _token_windows(_iter_tokens(lines), chunk_size, chunk_overlap)
+        )
+    elif strategy == "sentence":
+        windows = (
+            (window, "")
+            for window in _sentence_windows(_iter_tokens(lines), chunk_size, chunk_overlap)
+        )
+    else:
+        windows = _markdown_windows(lines, chunk_size, chunk_overlap)
+
+    # Only time spent in here counts, not the consumer's work between chunks
+    started = time.perf_counter()
+    for index, (window, heading) in enumerate(windows):
+        text = " ".join(token for token, _, _ in window)
+        record = ChunkRecord(
+            index=index,
+            text=text,
+            start=window[0][1],
+            end=window[-1][2],
+            sha256=hashlib.sha256(text.encode("utf-8")).hexdigest(),
+            heading=heading,
+        )
+        if stats is not None:
+            stats.chunks += 1
+            stats.seconds += time.perf_counter() - started
+        yield record
+        started = time.perf_counter()
+    if stats is not None:
+        stats.seconds += time.perf_counter() - started
+
+
+def _iter_lines(
+    blocks: Iterable[str], stats: Optional[ChunkingStats], max_line: int = 1 << 20
+) -> Iterator[Tuple[int, str]]:
+    """Yield (offset, line) pairs; very long lines are cut at whitespace."""
+    offset = 0
+    pending = ""
+    for block in blocks:
+        if stats is not None:
+            stats.characters += len(block)
+        pending += block
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield offset, line
+            offset += len(line) + 1
+        while len(pending) > max_line:
+            cut = pending.rfind(" ", 0, max_line) + 1 or max_line
+            yield offset, pending[:cut]
+            offset += cut
+            pending = pending[cut:]
+    if pending:
+        yield offset, pending
+
+
+def _iter_tokens(lines: Iterable[Tuple[int, str]]) -> Iterator[Token]:
+    for offset, line in lines:
+        for match in _TOKEN_PATTERN.finditer(line):
+            yield match.group(), offset + match.start(), offset + match.end()
+
+
+def _token_windows(
+    tokens: Iterable[Token], chunk_size: int, chunk_overlap: int
+) -> Iterator[List[Token]]:
+    window: List[Token] = []
+    fresh = 0
+    for token in tokens:
+        window.append(token)
+        fresh += 1
+        if len(window) == chunk_size:
+            yield window
+            window = window[chunk_size - chunk_overlap :]
+            fresh = 0
+    if fresh:
+        yield window
+
+
+def _sentence_windows(
+    tokens: Iterable[Token], chunk_size: int, chunk_overlap: int
+) -> Iterator[List[Token]]:
+    window: List[List[Token]] = []
+    window_tokens = 0
+    fresh = False
+
+    def sentences() -> Iterator[List[Token]]:
+        sentence: List[Token] = []
+        for token in tokens:
+            sentence.append(token)
+            if _SENTENCE_END_PATTERN.search(token[0]):
+                yield sentence
+                sentence = []
+        if sentence:
+            yield sentence
+
+    for sentence in sentences():
+        if len(sentence) > chunk_size:
+            # A sentence that cannot fit in one chunk falls back to token windows
+            if fresh:
+                yield [token for part in window for token in part]
+            yield from _token_windows(sentence, chunk_size, chunk_overlap)
+            window, window_tokens, fresh = [], 0, False
+            continue
+
+        if window_tokens + len(sentence) > chunk_size and fresh:
+            yield [token for part in window for token in part]
+            # Carry whole trailing sentences that fit within the overlap
+            carried: List[List[Token]] = []
+            carried_tokens = 0
+            for part in reversed(window):
+                if carried_tokens + len(part) > chunk_overlap:
+                    break
+                carried.insert(0, part)
+                carried_tokens += len(part)
+            window, window_tokens = carried, carried_tokens
+            if window_tokens + len(sentence) > chunk_size:
+                window, window_tokens = [], 0
+
+        window.append(sentence)
+        window_tokens += len(sentence)
+        fresh = True
+
+    if fresh:
+        yield [token for part in window for token in part]
+
+
+def _markdown_windows(
+    lines: Iterable[Tuple[int, str]], chunk_size: int, chunk_overlap: int
+) -> Iterator[Tuple[List[Token], str]]:
+    headings: List[str] = []
+
+    def section_lines() -> Iterator[Tuple[int, str]]:
+        # Lines up to (not including) the next heading; "#" comments inside
+        # code fences are code, not headings
+        nonlocal next_heading
+        in_fence = False
+        for offset, line in line_iter:
+            if _FENCE_PATTERN.match(line):
+                in_fence = not in_fence
+            match = None if in_fence else _HEADING_PATTERN.match(line)
+            if match:
+                next_heading = (offset, line, match)
+                return
+            yield offset, line
+
+    line_iter = iter(lines)
+    next_heading = None
+    first = True
+    while first or next_heading is not None:
+        heading_line: List[Tuple[int, str]] = []
+        if next_heading is not None:
+            offset, line, match = next_heading
+            level = len(match.group(1))
+            del headings[level - 1 :]
+            headings.append(match.group(2))
+            heading_line = [(offset, line)]
+            next_heading = None
+        first = False
+
+        path = " > ".join(headings)
+        section = _iter_tokens(_chain(heading_line, section_lines()))
+        for window in _token_windows(section, chunk_size, chunk_overlap):
+            yield window, path
+
+
+def _chain(
+    first: List[Tuple[int, str]], rest: Iterator[Tuple[int, str]]
+) -> Iterator[Tuple[int, str]]:
+    yield from first
+    yield from rest
@@ -2,15 +2,15 @@
 Configuration settings for the RAG Agent.
 
 These settings are used by the various RAG tools.
-Vertex AI initialization is performed in the package's __init__.py
+This is the only module that loads the .env file; Vertex AI is initialized
+lazily by vertex_init.init_vertexai
 """
 
 import os
 
 from dotenv import load_dotenv
 
-# Load environment variables (this is redundant if __init__.py is imported first,
-# but included for safety when importing config directly)
+# Load environment variables
 load_dotenv()
 
 # Vertex AI settings
@@ -24,3 +24,128 @@ DEFAULT_TOP_K = 3
 DEFAULT_DISTANCE_THRESHOLD = 0.5
 DEFAULT_EMBEDDING_MODEL = "publishers/google/models/text-embedding-005"
 DEFAULT_EMBEDDING_REQUESTS_PER_MIN = 1000
+
+# Corpus registry settings
+CORPUS_REGISTRY_TTL_SECONDS = float(os.environ.get("CORPUS_REGISTRY_TTL_SECONDS", 300))
+CORPUS_REGISTRY_MISS_REFRESH_SECONDS = float(
+    os.environ.get("CORPUS_REGISTRY_MISS_REFRESH_SECONDS", 10)
+)
+CORPUS_REGISTRY_LIST_PAGE_SIZE = 100
+
+# Retrieval cache settings
+RETRIEVAL_CACHE_MAX_ENTRIES = int(os.environ.get("RETRIEVAL_CACHE_MAX_ENTRIES", 1024))
+RETRIEVAL_CACHE_TTL_SECONDS = float(os.environ.get("RETRIEVAL_CACHE_TTL_SECONDS", 600))
+# Optional SQLite file shared by all workers on a host, e.g. /tmp/rag_cache.sqlite
+RETRIEVAL_CACHE_PATH = os.environ.get("RETRIEVAL_CACHE_PATH")
+
+# Semantic (embedding-similarity) query cache settings
+SEMANTIC_CACHE_ENABLED = os.environ.get("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+SEMANTIC_CACHE_SIMILARITY_THRESHOLD = float(
+    os.environ.get("SEMANTIC_CACHE_SIMILARITY_THRESHOLD", 0.92)
+)
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.environ.get("SEMANTIC_CACHE_MAX_ENTRIES", 1024))
+SEMANTIC_CACHE_TTL_SECONDS = float(os.environ.get("SEMANTIC_CACHE_TTL_SECONDS", 600))
+
+# RAG backend settings: "vertex" uses Vertex AI RAG Engine, "local" an in-process index
+RAG_BACKEND = os.environ.get("RAG_BACKEND", "vertex").lower()
+LOCAL_RAG_DIR = os.environ.get(
+    "LOCAL_RAG_DIR", os.path.expanduser("~/.cache/data_science_rag_agent/local_rag")
+)
+# Must match the embedding model's output size (768 for EMBEDDING_BACKEND=vertex)
+LOCAL_RAG_EMBEDDING_DIM = int(os.environ.get("LOCAL_RAG_EMBEDDING_DIM", 256))
+# "token", "sentence" or "markdown"; see chunking.py
+LOCAL_RAG_CHUNK_STRATEGY = os.environ.get("LOCAL_RAG_CHUNK_STRATEGY", "token").lower()
+# "flat" scans every chunk; "ivf" adds an approximate index once a corpus is large
+LOCAL_RAG_INDEX = os.environ.get("LOCAL_RAG_INDEX", "flat").lower()
+LOCAL_RAG_IVF_MIN_ROWS = int(os.environ.get("LOCAL_RAG_IVF_MIN_ROWS", 50000))
+LOCAL_RAG_IVF_NLIST = int(os.environ.get("LOCAL_RAG_IVF_NLIST", 0))
+LOCAL_RAG_IVF_NPROBE = int(os.environ.get("LOCAL_RAG_IVF_NPROBE", 8))
+
+# Async tool settings: upper bound on blocking backend calls running at once
+RAG_TOOL_MAX_WORKERS = int(os.environ.get("RAG_TOOL_MAX_WORKERS", 32))
+
+# Multi-corpus fan-out settings
+RAG_FANOUT_MAX_WORKERS = int(os.environ.get("RAG_FANOUT_MAX_WORKERS", 16))
+RAG_FANOUT_DEADLINE_SECONDS = float(os.environ.get("RAG_FANOUT_DEADLINE_SECONDS", 10))
+# Word-trigram Jaccard similarity above which two merged chunks count as duplicates
+RAG_FANOUT_DUPLICATE_SIMILARITY = float(
+    os.environ.get("RAG_FANOUT_DUPLICATE_SIMILARITY", 0.9)
+)
+
+# Batch query settings
+RAG_BATCH_MAX_CONCURRENCY = int(os.environ.get("RAG_BATCH_MAX_CONCURRENCY", 8))
+RAG_BATCH_REQUESTS_PER_SECOND = float(os.environ.get("RAG_BATCH_REQUESTS_PER_SECOND", 10))
+
+# Bulk ingestion settings
+BULK_INGEST_BATCH_SIZE = int(os.environ.get("BULK_INGEST_BATCH_SIZE", 25))
+BULK_INGEST_MAX_CONCURRENCY = int(os.environ.get("BULK_INGEST_MAX_CONCURRENCY", 4))
+BULK_INGEST_MAX_RETRIES = int(os.environ.get("BULK_INGEST_MAX_RETRIES", 3))
+BULK_INGEST_JOURNAL_DIR = os.environ.get(
+    "BULK_INGEST_JOURNAL_DIR",
+    os.path.expanduser("~/.cache/data_science_rag_agent/ingest_journal"),
+)
+
+# Duplicate detection: per-corpus index of source URI / Drive id / content hash
+DEDUP_INDEX_DIR = os.environ.get(
+    "DEDUP_INDEX_DIR",
+    os.path.expanduser("~/.cache/data_science_rag_agent/dedup_index"),
+)
+
+# Embedding service settings
+# "local" uses the deterministic hashing embedder; "vertex" calls DEFAULT_EMBEDDING_MODEL
+EMBEDDING_BACKEND = os.environ.get("EMBEDDING_BACKEND", "local").lower()
+EMBEDDING_MAX_BATCH_SIZE = int(os.environ.get("EMBEDDING_MAX_BATCH_SIZE", 32))
+EMBEDDING_MAX_WAIT_MS = float(os.environ.get("EMBEDDING_MAX_WAIT_MS", 5))
+EMBEDDING_MAX_CONCURRENCY = int(os.environ.get("EMBEDDING_MAX_CONCURRENCY", 4))
+EMBEDDING_REQUESTS_PER_MIN = float(
+    os.environ.get("EMBEDDING_REQUESTS_PER_MIN", DEFAULT_EMBEDDING_REQUESTS_PER_MIN)
+)
+# Set to an empty string to keep embeddings in memory only
+EMBEDDING_CACHE_PATH = os.environ.get(
+    "EMBEDDING_CACHE_PATH",
+    os.path.expanduser("~/.cache/data_science_rag_agent/embeddings.sqlite"),
+)
+
+# Rerank stage: overfetch candidates, rescore them and fuse with the vector ranking
+RAG_RERANK_ENABLED = os.environ.get("RAG_RERANK_ENABLED", "false").lower() == "true"
+RAG_RERANK_CANDIDATES = int(os.environ.get("RAG_RERANK_CANDIDATES", 20))
+# "rrf" (reciprocal-rank fusion) or "weighted" (min-max normalized score blend)
+RAG_RERANK_FUSION = os.environ.get("RAG_RERANK_FUSION", "rrf").lower()
+RAG_RERANK_WEIGHT = float(os.environ.get("RAG_RERANK_WEIGHT", 0.5))
+RAG_RERANK_RRF_K = float(os.environ.get("RAG_RERANK_RRF_K", 60))
+
+# Retrieval mode: "vector", or "hybrid" to fuse BM25 keyword search with vector
+# search on backends that keep a lexical index (the local backend)
+RAG_RETRIEVAL_MODE = os.environ.get("RAG_RETRIEVAL_MODE", "vector").lower()
+RAG_HYBRID_CANDIDATES = int(os.environ.get("RAG_HYBRID_CANDIDATES", 20))
+
+# Format Markdown answers into the response schema locally instead of calling
+# the output agent's model; unparseable answers still go to the model
+OUTPUT_FORMATTER_ENABLED = (
+    os.environ.get("OUTPUT_FORMATTER_ENABLED", "true").lower() == "true"
+)
+
+# Tracing and metrics: "auto" (OpenTelemetry if installed), "otel", "memory" or "none"
+TELEMETRY_EXPORTER = os.environ.get("TELEMETRY_EXPORTER", "auto").lower()
+TELEMETRY_MEMORY_MAX_SPANS = int(os.environ.get("TELEMETRY_MEMORY_MAX_SPANS", 10000))
+TELEMETRY_MEMORY_MAX_SAMPLES = int(os.environ.get("TELEMETRY_MEMORY_MAX_SAMPLES", 10000))
+
+# Remote backend resilience: per-call deadlines, retries for reads, circuit breaker
+RAG_BACKEND_DEADLINE_SECONDS = float(os.environ.get("RAG_BACKEND_DEADLINE_SECONDS", 30))
+RAG_BACKEND_IMPORT_DEADLINE_SECONDS = float(
+    os.environ.get("RAG_BACKEND_IMPORT_DEADLINE_SECONDS", 600)
+)
+RAG_BACKEND_MAX_RETRIES = int(os.environ.get("RAG_BACKEND_MAX_RETRIES", 3))
+RAG_BACKEND_RETRY_BASE_SECONDS = float(os.environ.get("RAG_BACKEND_RETRY_BASE_SECONDS", 0.2))
+RAG_BACKEND_RETRY_MAX_SECONDS = float(os.environ.get("RAG_BACKEND_RETRY_MAX_SECONDS", 5))
+RAG_BACKEND_MAX_CONCURRENCY = int(os.environ.get("RAG_BACKEND_MAX_CONCURRENCY", 16))
+RAG_BACKEND_BREAKER_FAILURES = int(os.environ.get("RAG_BACKEND_BREAKER_FAILURES", 5))
+RAG_BACKEND_BREAKER_RESET_SECONDS = float(
+    os.environ.get("RAG_BACKEND_BREAKER_RESET_SECONDS", 30)
+)
+
+# Paginated listings: files fetched per backend request when walking a corpus,
+# and the default and largest page a listing tool returns to the model
+LIST_FILES_PAGE_SIZE = int(os.environ.get("LIST_FILES_PAGE_SIZE", 100))
+LIST_TOOL_PAGE_SIZE = int(os.environ.get("LIST_TOOL_PAGE_SIZE", 50))
+LIST_TOOL_MAX_PAGE_SIZE = int(os.environ.get("LIST_TOOL_MAX_PAGE_SIZE", 500))
@@ -0,0 +1,393 @@
+"""
+Embedding functions shared by the query caches and the local retrieval backend.
+
+``EmbeddingService`` sits in front of an embedding model: it batches texts from
+concurrent callers, caches vectors by content hash and keeps model calls within
+a rate limit. ``get_embedding_service`` returns the shared instance.
+"""
+
+import hashlib
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .config import (
+    DEFAULT_EMBEDDING_MODEL,
+    EMBEDDING_BACKEND,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_MAX_BATCH_SIZE,
+    EMBEDDING_MAX_CONCURRENCY,
+    EMBEDDING_MAX_WAIT_MS,
+    EMBEDDING_REQUESTS_PER_MIN,
+    LOCAL_RAG_EMBEDDING_DIM,
+)
+from .rate_limit import TokenBucket
+from .vertex_init import init_vertexai
+
+# Words that carry the phrasing of a question rather than its topic
+_STOPWORDS = frozenset(
+    "a an and are can could define describe do does explain for how i in is it "
+    "me of on please show tell the to what whats when where which why with you".split()
+)
+
+
+class HashingEmbedder:
+    """
+    Deterministic local embedder based on feature hashing.
+
+    Words and word bigrams are hashed into a fixed number of signed buckets.
+    It needs no model or network access, which makes it suitable for offline
+    tests and as a cheap default.
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def __call__(self, text: str) -> np.ndarray:
+        tokens = [t for t in re.findall(r"\w+", text.casefold()) if t not in _STOPWORDS]
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in features:
+            digest = int.from_bytes(
+                hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little"
+            )
+            vector[digest % self.dim] += 1.0 if (digest >> 63) & 1 else -1.0
+        return vector
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        return np.stack([self(text) for text in texts])
+
+
+class VertexEmbeddingModel:
+    """
+    Batch embedding through a Vertex AI text embedding model.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_EMBEDDING_MODEL):
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from vertexai.language_models import TextEmbeddingModel
+
+                    init_vertexai()
+
+                    self._model = TextEmbeddingModel.from_pretrained(
+                        self.model_name.split("/")[-1]
+                    )
+        embeddings = self._model.get_embeddings(list(texts))
+        return np.array([embedding.values for embedding in embeddings], dtype=np.float32)
+
+
+class EmbeddingStore:
+    """
+    On-disk embedding cache keyed by a hash of model and text, in a SQLite file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " key TEXT PRIMARY KEY,"
+                " vector BLOB NOT NULL)"
+            )
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        # Stay below SQLite's limit on bound parameters
+        for start in range(0, len(keys), 500):
+            batch = keys[start : start + 500]
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT key, vector FROM embeddings WHERE key IN"
+                    f" ({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?)",
+                [
+                    (key, np.asarray(vector, dtype=np.float32).tobytes())
+                    for key, vector in items.items()
+                ],
+            )
+
+
+class _Request:
+    __slots__ = ("text", "key", "future")
+
+    def __init__(self, text: str, key: str, future: Future):
+        self.text = text
+        self.key = key
+        self.future = future
+
+
+class EmbeddingService:
+    """
+    Shared embedding front end with micro-batching, caching and rate limiting.
+
+    Texts from concurrent callers are queued and sent to the model in batches
+    of up to ``max_batch_size``, waiting at most ``max_wait_ms`` for a batch to
+    fill. Vectors are cached in memory and, with a store, on disk, keyed by a
+    hash of the model and text; identical texts already being embedded share
+    one request. Every model call takes a token from a per-minute rate limit.
+
+    The service is callable with a single text, so it can be used anywhere an
+    ``embed_fn`` is expected.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        model_name: str,
+        max_batch_size: int = EMBEDDING_MAX_BATCH_SIZE,
+        max_wait_ms: float = EMBEDDING_MAX_WAIT_MS,
+        max_concurrency: int = EMBEDDING_MAX_CONCURRENCY,
+        requests_per_minute: float = 0,
+        store: Optional[EmbeddingStore] = None,
+        memory_entries: int = 4096,
+    ):
+        self.model = model
+        self.model_name = model_name
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.limiter = TokenBucket.per_minute(requests_per_minute)
+        self.store = store
+        self.memory_entries = memory_entries
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._slots = threading.Semaphore(max(1, max_concurrency))
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_concurrency), thread_name_prefix="embedding"
+        )
+        self._worker: Optional[threading.Thread] = None
+        self._counters = {
+            "texts": 0,
+            "memory_hits": 0,
+            "store_hits": 0,
+            "coalesced": 0,
+            "batches": 0,
+            "embedded": 0,
+            "model_seconds": 0.0,
+        }
+
+    def __call__(self, text: str) -> np.ndarray:
+        return self.embed(text)
+
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Embed one text.
+
+        Args:
+            text (str): The text to embed
+
+        Returns:
+            np.ndarray: The model's embedding
+        """
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed several texts, serving cached vectors and batching the rest.
+
+        Args:
+            texts (List[str]): The texts to embed
+
+        Returns:
+            np.ndarray: One row per input text, in input order
+        """
+        keys = [self._key(text) for text in texts]
+        vectors: Dict[str, np.ndarray] = {}
+
+        with self._lock:
+            self._counters["texts"] += len(texts)
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    vectors[key] = vector
+            self._counters["memory_hits"] += len(vectors)
+
+        missing = [key for key in dict.fromkeys(keys) if key not in vectors]
+        if missing and self.store is not None:
+            stored = self.store.get_many(missing)
+            if stored:
+                self._remember(stored)
+                vectors.update(stored)
+                with self._lock:
+                    self._counters["store_hits"] += len(stored)
+
+        texts_by_key = dict(zip(keys, texts))
+        futures = {
+            key: self._submit(texts_by_key[key], key)
+            for key in missing
+            if key not in vectors
+        }
+        for key, future in futures.items():
+            vectors[key] = future.result()
+
+        return np.stack([vectors[key] for key in keys])
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get batching and cache counters.
+
+        Returns:
+            Dict[str, Any]: Texts requested, cache hits, coalesced duplicates,
+                model batches, texts embedded and mean batch size
+        """
+        with self._lock:
+            counters = dict(self._counters)
+        counters["mean_batch_size"] = (
+            counters["embedded"] / counters["batches"] if counters["batches"] else 0.0
+        )
+        return counters
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def _remember(self, vectors: Dict[str, np.ndarray]) -> None:
+        with self._lock:
+            for key, vector in vectors.items():
+                self._memory[key] = vector
+                self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _submit(self, text: str, key: str) -> Future:
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._counters["coalesced"] += 1
+                return future
+            future = self._in_flight[key] = Future()
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._collect_batches, name="embedding-batcher", daemon=True
+                )
+                self._worker.start()
+        self._queue.put(_Request(text, key, future))
+        return future
+
+    def _collect_batches(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            # Wait for a free slot; requests arriving meanwhile join later batches
+            self._slots.acquire()
+            self._executor.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: List[_Request]) -> None:
+        try:
+            self.limiter.acquire()
+            started = time.perf_counter()
+            vectors = np.asarray(
+                self.model.embed_batch([request.text for request in batch]),
+                dtype=np.float32,
+            )
+            elapsed = time.perf_counter() - started
+
+            results = {request.key: vectors[i] for i, request in enumerate(batch)}
+            self._remember(results)
+            if self.store is not None:
+                self.store.put_many(results)
+            with self._lock:
+                self._counters["batches"] += 1
+                self._counters["embedded"] += len(batch)
+                self._counters["model_seconds"] += elapsed
+                for request in batch:
+                    self._in_flight.pop(request.key, None)
+            for request in batch:
+                request.future.set_result(results[request.key])
+        except Exception as e:
+            with self._lock:
+                for request in batch:
+                    self._in_flight.pop(request.key, None)
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+        finally:
+            self._slots.release()
+
+
+_service: Optional[EmbeddingService] = None
+_service_lock = threading.Lock()
+
+
+def get_embedding_service() -> EmbeddingService:
+    """
+    Get the process-wide embedding service configured by ``EMBEDDING_BACKEND``.
+
+    Returns:
+        EmbeddingService: The shared service
+    """
+    global _service
+
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                if EMBEDDING_BACKEND == "vertex":
+                    model, model_name = VertexEmbeddingModel(), DEFAULT_EMBEDDING_MODEL
+                    requests_per_minute = EMBEDDING_REQUESTS_PER_MIN
+                elif EMBEDDING_BACKEND == "local":
+                    model = HashingEmbedder(LOCAL_RAG_EMBEDDING_DIM)
+                    model_name = f"hashing-{LOCAL_RAG_EMBEDDING_DIM}"
+                    requests_per_minute = 0
+                else:
+                    raise ValueError(
+                        f"Unknown EMBEDDING_BACKEND '{EMBEDDING_BACKEND}'; expected 'vertex' or 'local'"
+                    )
+                _service = EmbeddingService(
+                    model,
+                    model_name,
+                    requests_per_minute=requests_per_minute,
+                    store=EmbeddingStore(EMBEDDING_CACHE_PATH) if EMBEDDING_CACHE_PATH else None,
+                )
+    return _service
+
+
+def set_embedding_service(service: Optional[EmbeddingService]) -> None:
+    """
+    Replace the process-wide embedding service, e.g. with one around a test model.
+
+    Args:
+        service (Optional[EmbeddingService]): The service to use; None rebuilds it from config
+    """
+    global _service
+
+    with _service_lock:
+        _service = service
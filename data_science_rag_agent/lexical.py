@@ -0,0 +1,89 @@
+"""
+Tokenization and BM25 scoring shared by the reranker and the lexical index.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import List, Sequence
+
+# Identifiers such as "sklearn.metrics.f1_score" or "how='outer'" stay searchable
+# as a whole as well as by their dotted parts
+_TOKEN_PATTERN = re.compile(r"\w+(?:[.\-]\w+)*")
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase lexical terms.
+
+    Dotted or hyphenated identifiers produce the whole identifier followed by
+    each of its parts.
+
+    Args:
+        text (str): The text to tokenize
+
+    Returns:
+        List[str]: The terms in text order
+    """
+    terms: List[str] = []
+    for match in _TOKEN_PATTERN.finditer(text.casefold()):
+        term = match.group()
+        terms.append(term)
+        if "." in term or "-" in term:
+            terms.extend(part for part in re.split(r"[.\-]", term) if part)
+    return terms
+
+
+def idf(document_frequency: int, document_count: int) -> float:
+    """
+    BM25 inverse document frequency, always positive.
+
+    Args:
+        document_frequency (int): Documents containing the term
+        document_count (int): Documents in the collection
+
+    Returns:
+        float: The term weight
+    """
+    return math.log(
+        1.0 + (document_count - document_frequency + 0.5) / (document_frequency + 0.5)
+    )
+
+
+def bm25_scores(query: str, documents: Sequence[str]) -> List[float]:
+    """
+    Score documents against a query with BM25, using the documents themselves as the collection.
+
+    Args:
+        query (str): The query text
+        documents (Sequence[str]): The candidate texts
+
+    Returns:
+        List[float]: One score per document; higher is more relevant
+    """
+    query_terms = set(tokenize(query))
+    document_terms = [Counter(tokenize(document)) for document in documents]
+    if not query_terms or not document_terms:
+        return [0.0] * len(documents)
+
+    lengths = [sum(terms.values()) for terms in document_terms]
+    average_length = (sum(lengths) / len(lengths)) or 1.0
+    weights = {
+        term: idf(sum(1 for terms in document_terms if term in terms), len(documents))
+        for term in query_terms
+    }
+
+    scores = []
+    for terms, length in zip(document_terms, lengths):
+        norm = BM25_K1 * (1.0 - BM25_B + BM25_B * length / average_length)
+        scores.append(
+            sum(
+                weights[term] * terms[term] * (BM25_K1 + 1.0) / (terms[term] + norm)
+                for term in query_terms
+                if term in terms
+            )
+        )
+    return scores
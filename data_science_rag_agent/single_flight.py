@@ -0,0 +1,126 @@
+"""
+Request coalescing for identical concurrent backend calls.
+
+When a popular question arrives in a burst, every session misses the caches at
+the same moment and sends its own retrieval. ``SingleFlight`` lets the first
+caller for a key run the call while every concurrent caller with the same key
+waits for, and shares, its result or exception. Nothing is kept once the call
+finishes, so this complements the caches rather than replacing them: it covers
+the cold burst before a cache entry exists.
+
+Threads and asyncio tasks can share one flight: a thread may wait on a call an
+event loop is running, and a task may await a call running on a thread. An
+async call runs as its own task, so cancelling the caller that started it does
+not cancel it for the others.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Hashable, Set, Tuple, TypeVar
+
+from .telemetry import record
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls that share a key.
+
+    Args:
+        name (str): Name used in the ``<name>.coalesced`` metric
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        # Keeps running async calls referenced until they finish
+        self._tasks: Set[asyncio.Task] = set()
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Run ``fn`` unless a call with the same key is in flight, then share its outcome.
+
+        Args:
+            key (Hashable): Identifies calls that would return the same result
+            fn (Callable[[], T]): The blocking call
+
+        Returns:
+            T: The result of the call that ran for this key
+
+        Raises:
+            Exception: Whatever the shared call raised
+        """
+        future, leader = self._join(key)
+        if leader:
+            try:
+                self._resolve(key, future, fn())
+            except BaseException as e:
+                self._fail(key, future, e)
+        return future.result()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await ``fn()`` unless a call with the same key is in flight, then share its outcome.
+
+        Args:
+            key (Hashable): Identifies calls that would return the same result
+            fn (Callable[[], Awaitable[T]]): Coroutine function making the call
+
+        Returns:
+            T: The result of the call that ran for this key
+
+        Raises:
+            Exception: Whatever the shared call raised
+        """
+        future, leader = self._join(key)
+        if leader:
+            task = asyncio.get_running_loop().create_task(self._run_async(key, future, fn))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        # Shielded: a cancelled caller, the first one included, only stops waiting
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def in_flight(self) -> int:
+        """
+        Get the number of keys with a call in progress.
+
+        Returns:
+            int: The number of in-flight calls
+        """
+        with self._lock:
+            return len(self._calls)
+
+    async def _run_async(
+        self, key: Hashable, future: Future, fn: Callable[[], Awaitable[T]]
+    ) -> None:
+        try:
+            self._resolve(key, future, await fn())
+        except BaseException as e:
+            self._fail(key, future, e)
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                record(f"{self.name}.coalesced", 1)
+                return future, False
+            future = self._calls[key] = Future()
+            # Running futures cannot be cancelled by one of their waiters
+            future.set_running_or_notify_cancel()
+            return future, True
+
+    def _resolve(self, key: Hashable, future: Future, result) -> None:
+        # Forget the key first so callers arriving afterwards start a fresh call
+        self._forget(key)
+        future.set_result(result)
+
+    def _fail(self, key: Hashable, future: Future, error: BaseException) -> None:
+        self._forget(key)
+        future.set_exception(error)
+
+    def _forget(self, key: Hashable) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
@@ -0,0 +1,279 @@
+"""
+Deterministic formatting of the root agent's answer into ``AgentResponseSchema``.
+
+The output agent otherwise spends a whole model call reshaping text that is
+already structured. When the root agent's answer is Markdown (headings, fenced
+code blocks, bullet lists, "Note:" paragraphs) or already schema JSON,
+``format_response`` builds the response locally and
+``format_before_model`` returns it in place of the model call. Anything it
+cannot parse falls through to the LLM as before.
+"""
+
+import logging
+import re
+from typing import Dict, List, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+from pydantic import ValidationError
+
+from ...config import OUTPUT_FORMATTER_ENABLED
+from .schema import AgentResponseSchema, Section
+from .serialization import dump_response, response_json_schema, validate_response
+
+logger = logging.getLogger(__name__)
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_BULLET = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+(.*)$")
+_NOTE = re.compile(r"^\s*(?:>\s*)?(?:\*\*|__)?(?:note|notes|tip|warning)\s*:\s*(?:\*\*|__)?\s*", re.I)
+# A short line ending in a colon, e.g. "**Examples:**", introduces the list below it
+_LABEL = re.compile(r"^\s*(?:\*\*|__)?([^*_:]{1,40}?)(?:\*\*|__)?\s*:\s*(?:\*\*|__)?\s*$")
+_EMPHASIS = re.compile(r"^(?:\*\*|__)(.+?)(?:\*\*|__)$")
+# Prefix ADK adds when another agent's reply is shown to this agent
+_FOREIGN_REPLY = re.compile(r"^\[([\w.-]+)\] said: ", re.S)
+
+
+def format_response(text: str) -> Optional[AgentResponseSchema]:
+    """
+    Build the structured response from a Markdown or JSON answer.
+
+    Args:
+        text (str): The root agent's answer
+
+    Returns:
+        Optional[AgentResponseSchema]: The response, or None if the text does
+            not have enough structure to be formatted deterministically
+    """
+    text = text.strip()
+    if not text:
+        return None
+
+    if text.startswith("{") or text.startswith("```json"):
+        try:
+            return validate_response(text.removeprefix("```json").removesuffix("```"))
+        except ValidationError:
+            return None
+
+    return _parse_markdown(text)
+
+
+def format_before_model(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """
+    ``before_model_callback`` for the output agent: answer without a model call when possible.
+
+    Args:
+        callback_context (CallbackContext): The callback context
+        llm_request (LlmRequest): The request the output agent would send
+
+    Returns:
+        Optional[LlmResponse]: The formatted JSON response, or None to call the model
+    """
+    # Send the prebuilt schema instead of having it regenerated from the model class
+    llm_request.config.response_schema = response_json_schema()
+    if not OUTPUT_FORMATTER_ENABLED:
+        return None
+
+    answer = _latest_answer(llm_request.contents, callback_context.agent_name)
+    response = format_response(answer) if answer else None
+    if response is None:
+        logger.debug("Output formatter could not parse the answer; using the model")
+        return None
+
+    logger.debug("Formatted the answer locally into %d section(s)", len(response.sections))
+    return LlmResponse(
+        content=types.Content(
+            role="model", parts=[types.Part(text=dump_response(response).decode())]
+        )
+    )
+
+
+# --- Markdown parsing ---
+
+
+def _parse_markdown(text: str) -> Optional[AgentResponseSchema]:
+    lines = text.splitlines()
+    heading_levels = _heading_levels(lines)
+    levels = sorted(set(heading_levels))
+    if not levels:
+        return None
+
+    # A single top-level heading is the title; the next level down starts sections
+    title_level = (
+        levels[0] if heading_levels.count(levels[0]) == 1 and len(levels) > 1 else None
+    )
+    section_level = levels[1] if title_level is not None else levels[0]
+
+    title = ""
+    sections: List[Dict] = []
+    current: Optional[Dict] = None
+    paragraph: List[str] = []
+    list_target = "key_points"
+    code: Optional[List[str]] = None
+
+    def flush_paragraph():
+        if paragraph and current is not None:
+            _add_paragraph(current, " ".join(paragraph))
+        paragraph.clear()
+
+    for line in lines:
+        if code is not None:
+            if _FENCE.match(line):
+                if current is not None:
+                    current["code_blocks"].append("\n".join(code))
+                code = None
+            else:
+                code.append(line)
+            continue
+
+        if _FENCE.match(line):
+            flush_paragraph()
+            code = []
+            continue
+
+        heading = _HEADING.match(line)
+        if heading:
+            flush_paragraph()
+            level, name = len(heading.group(1)), _strip_emphasis(heading.group(2))
+            if level == title_level:
+                title = name
+            elif level == section_level:
+                current = _new_section(name)
+                sections.append(current)
+                list_target = "key_points"
+            elif current is not None and not current["sub_heading"]:
+                current["sub_heading"] = name
+                list_target = _list_target(name)
+            elif current is not None:
+                list_target = _list_target(name)
+                if list_target == "key_points":
+                    current["content"].append(name)
+            continue
+
+        if current is None:
+            # Text before the first section becomes an introduction
+            if line.strip():
+                current = _new_section(title or "Overview")
+                sections.append(current)
+            else:
+                continue
+
+        bullet = _BULLET.match(line)
+        if bullet:
+            flush_paragraph()
+            current[list_target].append(_strip_emphasis(bullet.group(1).strip()))
+            continue
+
+        if not line.strip():
+            flush_paragraph()
+            continue
+
+        label = _LABEL.match(line) if not paragraph else None
+        if label:
+            flush_paragraph()
+            list_target = _list_target(label.group(1))
+            if list_target == "key_points":
+                paragraph.append(line.strip())
+            continue
+
+        list_target = "key_points"
+        paragraph.append(line.strip())
+
+    if code is not None:
+        # Unterminated code fence: the answer was cut off
+        return None
+    flush_paragraph()
+
+    sections = [section for section in sections if _has_body(section)]
+    if not sections:
+        return None
+
+    try:
+        return AgentResponseSchema(
+            title=title or sections[0]["heading"],
+            sections=[
+                Section(
+                    heading=section["heading"],
+                    sub_heading=section["sub_heading"],
+                    content="\n\n".join(section["content"]),
+                    code_blocks=section["code_blocks"],
+                    examples=section["examples"],
+                    key_points=section["key_points"],
+                    notes=" ".join(section["notes"]),
+                )
+                for section in sections
+            ],
+        )
+    except ValidationError:
+        return None
+
+
+def _new_section(heading: str) -> Dict:
+    return {
+        "heading": heading,
+        "sub_heading": "",
+        "content": [],
+        "code_blocks": [],
+        "examples": [],
+        "key_points": [],
+        "notes": [],
+    }
+
+
+def _add_paragraph(section: Dict, paragraph: str) -> None:
+    note = _NOTE.match(paragraph)
+    if note:
+        section["notes"].append(paragraph[note.end() :].strip())
+    else:
+        section["content"].append(paragraph)
+
+
+def _list_target(label: str) -> str:
+    label = label.lower()
+    if "example" in label:
+        return "examples"
+    if label.startswith("note"):
+        return "notes"
+    return "key_points"
+
+
+def _has_body(section: Dict) -> bool:
+    return any(section[key] for key in ("content", "code_blocks", "examples", "key_points", "notes"))
+
+
+def _heading_levels(lines: List[str]) -> List[int]:
+    # Comments in code blocks ("# fit model") look like headings; skip fenced lines
+    levels = []
+    in_code = False
+    for line in lines:
+        if _FENCE.match(line):
+            in_code = not in_code
+            continue
+        heading = None if in_code else _HEADING.match(line)
+        if heading:
+            levels.append(len(heading.group(1)))
+    return levels
+
+
+def _strip_emphasis(text: str) -> str:
+    match = _EMPHASIS.match(text)
+    return match.group(1).strip() if match else text
+
+
+# --- Request inspection ---
+
+
+def _latest_answer(contents: List[types.Content], agent_name: str) -> Optional[str]:
+    # The root agent's reply reaches the output agent as "[root] said: ..." user parts
+    for content in reversed(contents):
+        texts = []
+        for part in content.parts or []:
+            match = _FOREIGN_REPLY.match(part.text or "")
+            if match and match.group(1) != agent_name:
+                texts.append(part.text[match.end() :])
+        if texts:
+            return "\n".join(texts)
+    return None
@@ -0,0 +1,123 @@
+"""
+Validated fast path for ``AgentResponseSchema`` payloads.
+
+Every response is validated and serialized, and every model call made by the
+output agent carries the response JSON schema. This module keeps the pieces
+that are otherwise rebuilt each time:
+
+- cached ``TypeAdapter`` instances for the response and its sections
+- bytes-level serialization straight from the validated model with
+  pydantic's Rust encoder, skipping the intermediate dict and ``str``
+- the request JSON schema, built once per ``SCHEMA_VERSION`` with its
+  ``$defs`` already inlined
+"""
+
+import copy
+import functools
+from typing import Any, Dict, Union
+
+from pydantic import TypeAdapter
+
+from .schema import SCHEMA_VERSION, AgentResponseSchema, Section
+
+
+@functools.lru_cache(maxsize=None)
+def response_adapter() -> TypeAdapter:
+    """
+    Get the shared adapter for ``AgentResponseSchema``.
+
+    Returns:
+        TypeAdapter: The adapter, built on first use
+    """
+    return TypeAdapter(AgentResponseSchema)
+
+
+@functools.lru_cache(maxsize=None)
+def section_adapter() -> TypeAdapter:
+    """
+    Get the shared adapter for ``Section``.
+
+    Returns:
+        TypeAdapter: The adapter, built on first use
+    """
+    return TypeAdapter(Section)
+
+
+def validate_response(data: Union[str, bytes, Dict[str, Any]]) -> AgentResponseSchema:
+    """
+    Validate a response given as JSON text, JSON bytes or a dict.
+
+    Args:
+        data (Union[str, bytes, Dict[str, Any]]): The payload
+
+    Returns:
+        AgentResponseSchema: The validated response
+
+    Raises:
+        pydantic.ValidationError: If the payload does not match the schema
+    """
+    if isinstance(data, (str, bytes)):
+        return response_adapter().validate_json(data)
+    return response_adapter().validate_python(data)
+
+
+def validate_section(data: Union[str, bytes, Dict[str, Any]]) -> Section:
+    """
+    Validate a single section given as JSON text, JSON bytes or a dict.
+
+    Args:
+        data (Union[str, bytes, Dict[str, Any]]): The payload
+
+    Returns:
+        Section: The validated section
+
+    Raises:
+        pydantic.ValidationError: If the payload does not match the schema
+    """
+    if isinstance(data, (str, bytes)):
+        return section_adapter().validate_json(data)
+    return section_adapter().validate_python(data)
+
+
+def dump_response(response: AgentResponseSchema) -> bytes:
+    """
+    Serialize a validated response to JSON bytes.
+
+    Args:
+        response (AgentResponseSchema): The response
+
+    Returns:
+        bytes: Compact UTF-8 JSON
+    """
+    return response_adapter().dump_json(response)
+
+
+def response_json_schema(version: str = SCHEMA_VERSION) -> Dict[str, Any]:
+    """
+    Get the response JSON schema to send with a model request.
+
+    Args:
+        version (str): Schema version; a new version builds a new schema
+
+    Returns:
+        Dict[str, Any]: A private copy the caller may modify; the model client
+            rewrites the schema in place while preparing the request
+    """
+    return copy.deepcopy(_json_schema(version))
+
+
+@functools.lru_cache(maxsize=8)
+def _json_schema(version: str) -> Dict[str, Any]:
+    schema = AgentResponseSchema.model_json_schema()
+    return _inline_refs(schema, schema.pop("$defs", {}))
+
+
+def _inline_refs(node: Any, defs: Dict[str, Any]) -> Any:
+    if isinstance(node, dict):
+        ref = node.get("$ref")
+        if ref is not None:
+            return _inline_refs(defs[ref.rsplit("/", 1)[-1]], defs)
+        return {key: _inline_refs(value, defs) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_inline_refs(value, defs) for value in node]
+    return node
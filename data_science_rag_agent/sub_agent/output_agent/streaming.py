@@ -0,0 +1,217 @@
+"""
+Incremental delivery of the output agent's ``AgentResponseSchema`` JSON.
+
+Without streaming, the caller sees nothing until the whole response has been
+generated. ``AgentResponseStreamParser`` is fed the JSON text as the model
+streams it and reports the ``title`` as soon as its string is complete and
+every ``Section`` as soon as its object closes, each validated on its own.
+``stream_agent_response`` runs the agent with server-sent-event streaming and
+yields those pieces as they arrive.
+"""
+
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import Runner
+from google.genai import types
+from pydantic import ValidationError
+
+from .schema import AgentResponseSchema, Section
+from .serialization import validate_response, validate_section
+
+
+class AgentResponseStreamParser:
+    """
+    Incremental parser for one ``AgentResponseSchema`` JSON document.
+
+    Text before the opening brace (e.g. a Markdown code fence) is ignored.
+    Each character is scanned once. Positions are offsets into the whole
+    stream, and only the chunks from the oldest still-open string or section
+    onward are kept for slicing, so parsing stays linear in the stream length.
+    """
+
+    def __init__(self):
+        self.title: Optional[str] = None
+        self.sections: List[Section] = []
+        self.errors: List[str] = []
+        self.done = False
+
+        self._chunks: List[str] = []
+        # Chunks that may still be sliced; _pending[0] starts at _pending_offset
+        self._pending: List[str] = []
+        self._pending_offset = 0
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._expect_key = False
+        self._key: Optional[str] = None
+        self._in_sections = False
+        self._section_start = -1
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Consume the next piece of streamed text.
+
+        Args:
+            chunk (str): Newly generated text
+
+        Returns:
+            List[Dict[str, Any]]: Events completed by this chunk:
+                ``{"type": "title", "title": str}`` and
+                ``{"type": "section", "index": int, "section": Section}``
+        """
+        self._chunks.append(chunk)
+        self._pending.append(chunk)
+        events: List[Dict[str, Any]] = []
+        # Every earlier chunk has been scanned, so the scan resumes at this one
+        chunk_offset = self._pos
+
+        while self._pos - chunk_offset < len(chunk) and not self.done:
+            char = chunk[self._pos - chunk_offset]
+
+            if self._start < 0:
+                if char == "{":
+                    self._start = self._pos
+                    self._depth = 1
+                    self._expect_key = True
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._on_string(self._slice(self._string_start, self._pos + 1), events)
+            elif char == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif char in "{[":
+                if self._depth == 1 and self._key == "sections" and char == "[":
+                    self._in_sections = True
+                elif self._depth == 2 and self._in_sections and char == "{":
+                    self._section_start = self._pos
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 2 and self._in_sections and char == "}":
+                    self._on_section(self._slice(self._section_start, self._pos + 1), events)
+                    self._section_start = -1
+                elif self._depth == 1 and self._in_sections:
+                    self._in_sections = False
+                elif self._depth == 0:
+                    self.done = True
+            elif char == "," and self._depth == 1:
+                self._expect_key = True
+
+            self._pos += 1
+
+        # Forget the chunks no open string or section can still need
+        keep = self._pos
+        if self._in_string:
+            keep = min(keep, self._string_start)
+        if self._section_start >= 0:
+            keep = min(keep, self._section_start)
+        while self._pending and self._pending_offset + len(self._pending[0]) <= keep:
+            self._pending_offset += len(self._pending.pop(0))
+        return events
+
+    @property
+    def text(self) -> str:
+        """All text fed so far."""
+        return "".join(self._chunks)
+
+    def result(self) -> AgentResponseSchema:
+        """
+        Validate the complete document.
+
+        Returns:
+            AgentResponseSchema: The parsed response
+
+        Raises:
+            ValueError: If no JSON object was streamed or it is not complete
+            pydantic.ValidationError: If the document does not match the schema
+        """
+        if self._start < 0 or not self.done:
+            raise ValueError("The streamed response is not a complete JSON object")
+        return validate_response(self.text[self._start : self._pos])
+
+    def _slice(self, start: int, end: int) -> str:
+        text = "".join(self._pending)
+        return text[start - self._pending_offset : end - self._pending_offset]
+
+    def _on_string(self, literal: str, events: List[Dict[str, Any]]) -> None:
+        if self._expect_key:
+            self._key = json.loads(literal)
+            self._expect_key = False
+        elif self._key == "title" and self.title is None:
+            self.title = json.loads(literal)
+            events.append({"type": "title", "title": self.title})
+
+    def _on_section(self, literal: str, events: List[Dict[str, Any]]) -> None:
+        try:
+            section = validate_section(literal)
+        except ValidationError as e:
+            self.errors.append(f"Section {len(self.sections)}: {e}")
+            return
+        self.sections.append(section)
+        events.append(
+            {"type": "section", "index": len(self.sections) - 1, "section": section}
+        )
+
+
+async def stream_agent_response(
+    runner: Runner,
+    user_id: str,
+    session_id: str,
+    message: str,
+    author: str = "output_agent",
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run the agent with streaming and yield the response title and sections as they complete.
+
+    Args:
+        runner (Runner): A runner for the root agent
+        user_id (str): The user id
+        session_id (str): An existing session id
+        message (str): The user's message
+        author (str): The agent whose output follows ``AgentResponseSchema``
+
+    Yields:
+        Dict[str, Any]: ``title`` and ``section`` events as produced by
+            ``AgentResponseStreamParser.feed``, then ``{"type": "response",
+            "response": AgentResponseSchema}`` or ``{"type": "error",
+            "message": str}`` once the agent has finished
+    """
+    parser = AgentResponseStreamParser()
+    streamed = False
+    new_message = types.Content(role="user", parts=[types.Part(text=message)])
+
+    async for event in runner.run_async(
+        user_id=user_id,
+        session_id=session_id,
+        new_message=new_message,
+        run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+    ):
+        if event.author != author or not event.content or not event.content.parts:
+            continue
+        text = "".join(part.text or "" for part in event.content.parts)
+
+        if event.partial:
+            streamed = True
+            for item in parser.feed(text):
+                yield item
+        elif not streamed:
+            # Responses that were not streamed (e.g. produced without a model
+            # call) arrive as one final event
+            for item in parser.feed(text):
+                yield item
+
+    try:
+        yield {"type": "response", "response": parser.result()}
+    except (ValueError, ValidationError) as e:
+        yield {"type": "error", "message": str(e)}
@@ -0,0 +1,338 @@
+"""
+Tracing and metrics for the request hot path.
+
+Tools wrap their stages in ``span(...)`` and report values with ``record(...)``.
+Both go to the process-wide exporter:
+
+- ``InMemoryExporter`` keeps recent finished spans and histogram samples, for
+  tests and benchmarks
+- ``OpenTelemetryExporter`` forwards spans and histograms to the
+  OpenTelemetry API when it is installed, nesting them under the ADK's own
+  spans; what happens next is up to the configured OpenTelemetry SDK
+- with no exporter, ``span`` hands out a shared no-op span
+
+Every finished span also records its duration in the ``<name>.duration_ms``
+histogram, so per-stage latency breakdowns need no extra calls.
+"""
+
+import contextvars
+import logging
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+from .config import (
+    TELEMETRY_EXPORTER,
+    TELEMETRY_MEMORY_MAX_SAMPLES,
+    TELEMETRY_MEMORY_MAX_SPANS,
+)
+
+logger = logging.getLogger(__name__)
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+@dataclass
+class Span:
+    """
+    One timed stage of a request.
+    """
+
+    name: str
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    parent: Optional[str] = None
+    start_ns: int = 0
+    end_ns: int = 0
+    error: Optional[str] = None
+    _exporter: Optional["Exporter"] = field(default=None, repr=False, compare=False)
+    _token: Any = field(default=None, repr=False, compare=False)
+    _handle: Any = field(default=None, repr=False, compare=False)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        self._exporter.on_start(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = time.perf_counter_ns()
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        try:
+            self._exporter.on_end(self)
+            self._exporter.record(f"{self.name}.duration_ms", self.duration_ms, {})
+        except Exception:
+            logger.exception("Telemetry export failed for span %s", self.name)
+
+
+class _NoopSpan:
+    """
+    Stand-in returned by ``span`` when telemetry is off.
+    """
+
+    name = ""
+    attributes: Dict[str, Any] = {}
+    duration_ms = 0.0
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Exporter:
+    """
+    Receives finished spans and metric samples.
+    """
+
+    def on_start(self, span: Span) -> None:
+        pass
+
+    def on_end(self, span: Span) -> None:
+        pass
+
+    def record(self, name: str, value: float, attributes: Dict[str, Any]) -> None:
+        pass
+
+
+class InMemoryExporter(Exporter):
+    """
+    Keeps recent spans and recent histogram samples in memory.
+
+    Args:
+        max_spans (int): Number of finished spans to keep
+        max_samples (int): Number of samples kept per histogram; older ones
+            are dropped, so summaries describe a sliding window
+    """
+
+    def __init__(
+        self,
+        max_spans: int = TELEMETRY_MEMORY_MAX_SPANS,
+        max_samples: int = TELEMETRY_MEMORY_MAX_SAMPLES,
+    ):
+        self.spans: Deque[Span] = deque(maxlen=max_spans)
+        self.max_samples = max_samples
+        self.histograms: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def on_end(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def record(self, name: str, value: float, attributes: Dict[str, Any]) -> None:
+        with self._lock:
+            samples = self.histograms.get(name)
+            if samples is None:
+                samples = self.histograms[name] = deque(maxlen=self.max_samples)
+            samples.append(float(value))
+
+    def finished_spans(self, name: Optional[str] = None) -> List[Span]:
+        """
+        Get finished spans, oldest first.
+
+        Args:
+            name (Optional[str]): Only spans with this name
+
+        Returns:
+            List[Span]: The spans
+        """
+        with self._lock:
+            return [span for span in self.spans if name is None or span.name == name]
+
+    def summary(self, name: str) -> Dict[str, float]:
+        """
+        Summarize the recent samples of one histogram.
+
+        Args:
+            name (str): Histogram name, e.g. "rag_query.retrieve.duration_ms"
+
+        Returns:
+            Dict[str, float]: count, mean, p50, p95 and p99 of the kept samples;
+                empty if nothing was recorded
+        """
+        with self._lock:
+            values = sorted(self.histograms.get(name, ()))
+        if not values:
+            return {}
+        return {
+            "count": len(values),
+            "mean": sum(values) / len(values),
+            "p50": _percentile(values, 50),
+            "p95": _percentile(values, 95),
+            "p99": _percentile(values, 99),
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+            self.histograms.clear()
+
+
+class OpenTelemetryExporter(Exporter):
+    """
+    Forwards spans and histograms to the OpenTelemetry API.
+    """
+
+    def __init__(self):
+        from opentelemetry import context, metrics, trace
+
+        self._context = context
+        self._trace = trace
+        self._tracer = trace.get_tracer(__name__.rsplit(".", 1)[0])
+        self._meter = metrics.get_meter(__name__.rsplit(".", 1)[0])
+        self._histograms: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span) -> None:
+        otel_span = self._tracer.start_span(
+            span.name, attributes=_otel_attributes(span.attributes)
+        )
+        span._handle = (
+            otel_span,
+            self._context.attach(self._trace.set_span_in_context(otel_span)),
+        )
+
+    def on_end(self, span: Span) -> None:
+        otel_span, token = span._handle
+        self._context.detach(token)
+        otel_span.set_attributes(_otel_attributes(span.attributes))
+        if span.error is not None:
+            otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, span.error))
+        otel_span.end()
+
+    def record(self, name: str, value: float, attributes: Dict[str, Any]) -> None:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.get(name)
+                if histogram is None:
+                    histogram = self._histograms[name] = self._meter.create_histogram(name)
+        histogram.record(value, attributes=_otel_attributes(attributes))
+
+
+def span(name: str, **attributes: Any):
+    """
+    Time a stage of the current request.
+
+    Use as ``with span("rag_query.retrieve", corpus=name) as s: ...``; attributes
+    can be added later with ``s.set_attribute``. Exceptions propagate and are
+    recorded on the span.
+
+    Args:
+        name (str): Dotted stage name
+        **attributes: Initial span attributes
+
+    Returns:
+        A context manager yielding the span
+    """
+    exporter = get_exporter()
+    if exporter is None:
+        return _NOOP_SPAN
+    parent = _current_span.get()
+    return Span(
+        name=name,
+        attributes=attributes,
+        parent=parent.name if parent is not None else None,
+        _exporter=exporter,
+    )
+
+
+def record(name: str, value: float, **attributes: Any) -> None:
+    """
+    Add a sample to a histogram, e.g. the number of results a query returned.
+
+    Args:
+        name (str): Histogram name
+        value (float): The sample
+        **attributes: Sample attributes
+    """
+    exporter = get_exporter()
+    if exporter is not None:
+        exporter.record(name, value, attributes)
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    # Nearest-rank percentile of sorted values
+    rank = math.ceil(percentile / 100 * len(values)) - 1
+    return values[max(0, min(len(values) - 1, rank))]
+
+
+def _otel_attributes(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    # OpenTelemetry accepts only primitive attribute values
+    return {
+        key: value if isinstance(value, (str, bool, int, float)) else str(value)
+        for key, value in attributes.items()
+    }
+
+
+_exporter: Optional[Exporter] = None
+_exporter_configured = False
+_exporter_lock = threading.Lock()
+
+
+def get_exporter() -> Optional[Exporter]:
+    """
+    Get the process-wide exporter, creating it from ``TELEMETRY_EXPORTER`` on first use.
+
+    Returns:
+        Optional[Exporter]: The exporter, or None when telemetry is off
+    """
+    global _exporter, _exporter_configured
+
+    if not _exporter_configured:
+        with _exporter_lock:
+            if not _exporter_configured:
+                _exporter = _create_exporter(TELEMETRY_EXPORTER)
+                _exporter_configured = True
+    return _exporter
+
+
+def set_exporter(exporter: Optional[Exporter]) -> None:
+    """
+    Replace the process-wide exporter, e.g. with an ``InMemoryExporter`` in tests.
+
+    Args:
+        exporter (Optional[Exporter]): The exporter; None turns telemetry off
+    """
+    global _exporter, _exporter_configured
+
+    with _exporter_lock:
+        _exporter = exporter
+        _exporter_configured = True
+
+
+def _create_exporter(name: str) -> Optional[Exporter]:
+    if name == "none":
+        return None
+    if name == "memory":
+        return InMemoryExporter()
+    if name in ("otel", "auto"):
+        try:
+            return OpenTelemetryExporter()
+        except ImportError:
+            if name == "otel":
+                logger.warning("TELEMETRY_EXPORTER=otel but opentelemetry is not installed")
+            return None
+    raise ValueError(
+        f"Unknown telemetry exporter '{name}'. Expected 'auto', 'otel', 'memory' or 'none'."
+    )
@@ -3,12 +3,37 @@ RAG Tools package for interacting with Vertex AI RAG corpora.
 """
 
 from .add_data import add_data
+from .bulk_add_data import bulk_add_data
+from .async_tools import (
+    add_data_async,
+    create_corpus_async,
+    default_rag_config_async,
+    delete_corpus_async,
+    delete_document_async,
+    get_corpus_info_async,
+    list_corpus_async,
+    rag_query_async,
+    sync_corpus_async,
+)
 from .create_corpus import create_corpus
 from .delete_corpus import delete_corpus
 from .delete_document import delete_document
 from .get_corpus_info import get_corpus_info
 from .list_corpus import list_corpus
 from .rag_query import rag_query
+from .rag_query_batch import arag_query_batch, rag_query_batch
+from .sync_corpus import sync_corpus
+from .corpus_registry import corpus_registry
+from .dedup_index import dedup_indexes
+from .rerank import (
+    BM25Reranker,
+    CrossEncoderReranker,
+    get_reranker,
+    set_reranker,
+)
+from .retrieval_cache import retrieval_cache
+from .semantic_cache import semantic_cache
+from ..embeddings import HashingEmbedder, get_embedding_service
 from .utils import (
     check_corpus_exists,
     get_corpus_resource_name,
@@ -17,13 +42,36 @@ from .utils import (
 
 __all__ = [
     "add_data",
+    "bulk_add_data",
     "create_corpus",
     "list_corpus",
     "rag_query",
+    "rag_query_batch",
+    "arag_query_batch",
     "get_corpus_info",
     "delete_corpus",
     "delete_document",
+    "sync_corpus",
+    "add_data_async",
+    "create_corpus_async",
+    "default_rag_config_async",
+    "delete_corpus_async",
+    "delete_document_async",
+    "get_corpus_info_async",
+    "list_corpus_async",
+    "rag_query_async",
+    "sync_corpus_async",
     "check_corpus_exists",
     "get_corpus_resource_name",
     "set_current_corpus",
+    "corpus_registry",
+    "dedup_indexes",
+    "retrieval_cache",
+    "BM25Reranker",
+    "CrossEncoderReranker",
+    "get_reranker",
+    "set_reranker",
+    "semantic_cache",
+    "HashingEmbedder",
+    "get_embedding_service",
 ]
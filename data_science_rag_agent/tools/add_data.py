@@ -2,19 +2,25 @@
 Tool for adding new data sources to a Vertex AI RAG corpus.
 """
 
+import os
 import re
-from typing import List
+from typing import List, Tuple
 
 from google.adk.tools.tool_context import ToolContext
-from vertexai import rag
 
+from ..backends import get_backend
 from ..config import (
     DEFAULT_CHUNK_OVERLAP,
     DEFAULT_CHUNK_SIZE,
     DEFAULT_EMBEDDING_REQUESTS_PER_MIN,
 )
 
-from .utils import check_corpus_exists, get_corpus_resource_name
+from .dedup_index import filter_ingested, record_ingested
+from .utils import (
+    check_corpus_exists,
+    get_corpus_resource_name,
+    invalidate_corpus_caches,
+)
 
 
 def add_data(
@@ -57,6 +63,120 @@ def add_data(
         }
 
     # Pre-process paths to validate and convert Google Docs URLs to Drive format if needed
+    backend = get_backend()
+    validated_paths, invalid_paths, conversions = validate_paths(
+        paths, backend.supports_local_paths
+    )
+
+    # Check if we have any valid paths after validation
+    if not validated_paths:
+        return {
+            "status": "error",
+            "message": "No valid paths provided. Please provide Google Drive URLs or GCS paths.",
+            "corpus_name": corpus_name,
+            "invalid_paths": invalid_paths,
+        }
+
+    try:
+        # Get the corpus resource name
+        corpus_resource_name = get_corpus_resource_name(corpus_name)
+
+        # Skip documents whose content is already in the corpus
+        new_paths, skipped_paths, content_hashes, replaced = filter_ingested(
+            corpus_resource_name, validated_paths
+        )
+
+        files_added = 0
+        files_failed = 0
+        errors = []
+        if new_paths:
+            # Import files to the corpus with the default chunking configuration
+            import_result = backend.import_files(
+                corpus_resource_name,
+                new_paths,
+                chunk_size=DEFAULT_CHUNK_SIZE,
+                chunk_overlap=DEFAULT_CHUNK_OVERLAP,
+                max_embedding_requests_per_min=DEFAULT_EMBEDDING_REQUESTS_PER_MIN,
+            )
+            files_added = import_result.imported_rag_files_count
+            files_failed = import_result.failed_rag_files_count
+            # Stale copies of changed sources are deleted only once their
+            # replacement is in
+            _, errors = record_ingested(
+                corpus_resource_name,
+                new_paths,
+                import_result,
+                content_hashes,
+                replaced=replaced,
+            )
+
+            # Cached retrievals no longer reflect the corpus contents
+            invalidate_corpus_caches(corpus_resource_name)
+
+        # Set this as the current corpus if not already set
+        if not tool_context.state.get("current_corpus"):
+            tool_context.state["current_corpus"] = corpus_name
+
+        # Build the success message
+        conversion_msg = ""
+        if conversions:
+            conversion_msg = " (Converted Google Docs URLs to Drive format)"
+        skipped_msg = ""
+        if skipped_paths:
+            skipped_msg = f"; skipped {len(skipped_paths)} already ingested"
+
+        # A backend may reject sources without raising, e.g. Drive URLs on the
+        # local backend, so nothing imported is not a success
+        if files_failed and not files_added:
+            status = "error"
+            message = f"Could not add any of the {files_failed} file(s) to corpus '{corpus_name}'"
+        elif files_failed or errors:
+            status = "partial"
+            message = (
+                f"Added {files_added} file(s) to corpus '{corpus_name}' with "
+                f"{files_failed} failed import(s) and {len(errors)} other error(s)"
+                f"{conversion_msg}{skipped_msg}"
+            )
+        else:
+            status = "success"
+            message = f"Successfully added {files_added} file(s) to corpus '{corpus_name}'{conversion_msg}{skipped_msg}"
+
+        return {
+            "status": status,
+            "message": message,
+            "corpus_name": corpus_name,
+            "files_added": files_added,
+            "files_failed": files_failed,
+            "paths": new_paths,
+            "skipped_paths": skipped_paths,
+            "invalid_paths": invalid_paths,
+            "conversions": conversions,
+            "errors": errors,
+        }
+
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Error adding data to corpus: {str(e)}",
+            "corpus_name": corpus_name,
+            "paths": paths,
+        }
+
+
+def validate_paths(
+    paths: List[str], allow_local_paths: bool = False
+) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Validate source paths and normalize Google Docs/Drive URLs to the Drive file format.
+
+    Args:
+        paths (List[str]): URLs, GCS paths or (if allowed) local paths
+        allow_local_paths (bool): Accept existing local files and directories
+
+    Returns:
+        Tuple[List[str], List[str], List[str]]: Validated paths, invalid paths with
+            the reason, and descriptions of the URL conversions that were applied
+    """
     validated_paths = []
     invalid_paths = []
     conversions = []
@@ -97,61 +217,14 @@ def add_data(
             validated_paths.append(path)
             continue
 
+        # Local files and directories, for backends that can read them
+        if allow_local_paths and os.path.exists(
+            path[len("file://"):] if path.startswith("file://") else path
+        ):
+            validated_paths.append(path)
+            continue
+
         # If we're here, the path wasn't in a recognized format
         invalid_paths.append(f"{path} (Invalid format)")
 
-    # Check if we have any valid paths after validation
-    if not validated_paths:
-        return {
-            "status": "error",
-            "message": "No valid paths provided. Please provide Google Drive URLs or GCS paths.",
-            "corpus_name": corpus_name,
-            "invalid_paths": invalid_paths,
-        }
-
-    try:
-        # Get the corpus resource name
-        corpus_resource_name = get_corpus_resource_name(corpus_name)
-
-        # Set up chunking configuration
-        transformation_config = rag.TransformationConfig(
-            chunking_config=rag.ChunkingConfig(
-                chunk_size=DEFAULT_CHUNK_SIZE,
-                chunk_overlap=DEFAULT_CHUNK_OVERLAP,
-            ),
-        )
-
-        # Import files to the corpus
-        import_result = rag.import_files(
-            corpus_resource_name,
-            validated_paths,
-            transformation_config=transformation_config,
-            max_embedding_requests_per_min=DEFAULT_EMBEDDING_REQUESTS_PER_MIN,
-        )
-
-        # Set this as the current corpus if not already set
-        if not tool_context.state.get("current_corpus"):
-            tool_context.state["current_corpus"] = corpus_name
-
-        # Build the success message
-        conversion_msg = ""
-        if conversions:
-            conversion_msg = " (Converted Google Docs URLs to Drive format)"
-
-        return {
-            "status": "success",
-            "message": f"Successfully added {import_result.imported_rag_files_count} file(s) to corpus '{corpus_name}'{conversion_msg}",
-            "corpus_name": corpus_name,
-            "files_added": import_result.imported_rag_files_count,
-            "paths": validated_paths,
-            "invalid_paths": invalid_paths,
-            "conversions": conversions,
-        }
-
-    except Exception as e:
-        return {
-            "status": "error",
-            "message": f"Error adding data to corpus: {str(e)}",
-            "corpus_name": corpus_name,
-            "paths": paths,
-        }
+    return validated_paths, invalid_paths, conversions
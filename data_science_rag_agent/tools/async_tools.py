@@ -0,0 +1,285 @@
+"""
+Asynchronous variants of the RAG tools.
+
+The backend SDK calls are blocking, so running the plain tools on the ADK
+runner's event loop stalls every other session for the duration of each RPC.
+The variants here run the blocking tool on a bounded thread pool and await the
+result. Each variant is a real ``async def`` with the wrapped tool's signature
+and docstring, and is declared under the wrapped tool's name, so the model sees
+exactly the same tool declarations. (ADK rebuilds tool functions from their code
+object, which drops a docstring copied onto a generic wrapper.)
+"""
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, TypeVar
+
+from google.adk.tools.tool_context import ToolContext
+
+from ..config import (
+    BULK_INGEST_MAX_CONCURRENCY,
+    LIST_TOOL_PAGE_SIZE,
+    RAG_TOOL_MAX_WORKERS,
+)
+from .add_data import add_data
+from .create_corpus import create_corpus
+from .default_rag_config import default_rag_config
+from .delete_corpus import delete_corpus
+from .delete_document import delete_document
+from .get_corpus_info import get_corpus_info
+from .list_corpus import list_corpus
+from .rag_query import rag_query
+from .sync_corpus import sync_corpus
+
+T = TypeVar("T")
+
+# Shared by every async tool so the number of in-flight blocking calls is bounded
+_executor = ThreadPoolExecutor(
+    max_workers=RAG_TOOL_MAX_WORKERS, thread_name_prefix="rag-tool"
+)
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking callable on the shared tool thread pool.
+
+    Args:
+        func (Callable[..., T]): The blocking callable
+        *args: Positional arguments for ``func``
+        **kwargs: Keyword arguments for ``func``
+
+    Returns:
+        T: The callable's return value
+    """
+    loop = asyncio.get_running_loop()
+    # Carry context variables (e.g. tracing state) over to the worker thread
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        _executor, functools.partial(context.run, func, *args, **kwargs)
+    )
+
+
+def _declared_as(func: Callable) -> Callable[[Callable], Callable]:
+    """Give an async variant the name of the blocking tool it runs."""
+
+    def declare(async_tool: Callable) -> Callable:
+        async_tool.__name__ = func.__name__
+        async_tool.__qualname__ = func.__qualname__
+        return async_tool
+
+    return declare
+
+
+@_declared_as(add_data)
+async def add_data_async(
+    corpus_name: str,
+    paths: List[str],
+    tool_context: ToolContext,
+) -> dict:
+    """
+    Add new data sources to a Vertex AI RAG corpus.
+
+    Args:
+        corpus_name (str): The name of the corpus to add data to. If empty, the current corpus will be used.
+        paths (List[str]): List of URLs or GCS paths to add to the corpus.
+                          Supported formats:
+                          - Google Drive: "https://drive.google.com/file/d/{FILE_ID}/view"
+                          - Google Docs/Sheets/Slides: "https://docs.google.com/{type}/d/{FILE_ID}/..."
+                          - Google Cloud Storage: "gs://{BUCKET}/{PATH}"
+                          Example: ["https://drive.google.com/file/d/123", "gs://my_bucket/my_files_dir"]
+        tool_context (ToolContext): The tool context
+
+    Returns:
+        dict: Information about the added data and status
+    """
+    return await run_blocking(add_data, corpus_name, paths, tool_context)
+
+
+@_declared_as(create_corpus)
+async def create_corpus_async(
+    corpus_name: str,
+    tool_context: ToolContext,
+) -> dict:
+    """
+    Create a new Vertex AI RAG corpus with the specified name.
+
+    Args:
+        corpus_name (str): The name for the new corpus
+        tool_context (ToolContext): The tool context for state management
+
+    Returns:
+        dict: Status information about the operation
+    """
+    return await run_blocking(create_corpus, corpus_name, tool_context)
+
+
+@_declared_as(default_rag_config)
+async def default_rag_config_async(tool_context: ToolContext) -> dict:
+    """
+    Configure and set up a default Vertex AI RAG resource.
+
+    The setup runs once per process; later calls return the cached
+    corpus name without touching Vertex AI.
+
+    Args:
+        tool_context (ToolContext): Context object for state management.
+
+    Returns:
+        dict: A status dictionary with success flag and message.
+    """
+    return await run_blocking(default_rag_config, tool_context)
+
+
+@_declared_as(delete_corpus)
+async def delete_corpus_async(corpus_name: str, confirm: bool, tool_context: ToolContext) -> dict:
+    """
+    Delete a Vertex AI RAG corpus when it's no longer needed.
+    Requires confirmation to prevent accidental deletion.
+
+
+    Args:
+
+        corpus_name(str):  The full resource name of the corpus to delete.
+        confirm (bool): Must be set to True to confirm deletion
+        tool_context (ToolContext) : The tool context for state management
+
+    Returns:
+    dict: Status information about the deletion operation
+    """
+    return await run_blocking(delete_corpus, corpus_name, confirm, tool_context)
+
+
+@_declared_as(delete_document)
+async def delete_document_async(
+    corpus_name: str, document_id: str, tool_context: ToolContext
+) -> dict:
+    """
+    Delete a specific document from a Vertex AI RAG corpus.
+
+    Args:
+        corpus_name (str): The full resource name of the corpus containing the document.
+                          Preferably use the resource_name from list_corpora results.
+        document_id (str): The ID of the specific document/file to delete. This can be
+                          obtained from get_corpus_info results.
+        tool_context (ToolContext): The tool context
+
+    Returns:
+        dict: Status information about the deletion operation
+    """
+    return await run_blocking(delete_document, corpus_name, document_id, tool_context)
+
+
+@_declared_as(get_corpus_info)
+async def get_corpus_info_async(
+    corpus_name: str,
+    tool_context: ToolContext,
+    page_size: int = LIST_TOOL_PAGE_SIZE,
+    page_token: str = "",
+    fields: Optional[List[str]] = None,
+    summary_only: bool = False,
+) -> dict:
+    """
+    Get information about a specific RAG corpus and one page of its files.
+
+    Args:
+         corpus_name (str): The full resource name of the corpus to get information about.
+                            Preferably use the resource_name from the list_corpus results
+         tool_context (ToolContext): The tool context for state management
+         page_size (int): The maximum number of files to return
+         page_token (str): The next_page_token of a previous call, to get the next page
+         fields (Optional[List[str]]): File fields to return, any of file_id, display_name,
+                            resource_id, source_uri, create_time and update_time; all if empty
+         summary_only (bool): Return only the file count and the newest update time
+                            instead of the files
+
+    Returns:
+        dict: Information about the corpus and a page of its files, with the
+              number of files on the page (page_file_count) and a
+              next_page_token that is empty on the last page. The total
+              file_count is only returned with summary_only
+    """
+    return await run_blocking(
+        get_corpus_info, corpus_name, tool_context, page_size, page_token, fields, summary_only
+    )
+
+
+@_declared_as(list_corpus)
+async def list_corpus_async(
+    page_size: int = LIST_TOOL_PAGE_SIZE,
+    page_token: str = "",
+    fields: Optional[List[str]] = None,
+    summary_only: bool = False,
+) -> dict:
+    """
+    List the available Vertex AI RAG corpora, one page at a time.
+
+    Args:
+        page_size (int): The maximum number of corpora to return
+        page_token (str): The next_page_token of a previous call, to get the next page
+        fields (Optional[List[str]]): Corpus fields to return, any of resource_name,
+                            display_name, create_time and update_time; all if empty
+        summary_only (bool): Return only the corpus count and the newest update time
+
+    Returns:
+
+     dict: A page of available corpora and status, with each corpus containing:
+           - resource_name: The full resource name to use with other tools
+           - display_name: The human-readable name of the corpus
+           - create_time: When the corpus was created
+           - update_time: When the corpus was last updated
+           and a next_page_token that is empty on the last page
+    """
+    return await run_blocking(list_corpus, page_size, page_token, fields, summary_only)
+
+
+@_declared_as(rag_query)
+async def rag_query_async(
+    corpus_name: str,
+    query: str,
+    tool_context: ToolContext,
+    additional_corpora: Optional[List[str]] = None,
+) -> dict:
+    """
+    Query a Vertex AI RAG corpus with user questions and retrieve relevant information.
+
+    Args:
+        corpus_name (str): The name of the corpus to query.
+                           Preferably use the resource_name from list_corpus results.
+        query (str): The text query to search for in the corpus.
+        tool_context (ToolContext): The tool context.
+        additional_corpora (Optional[List[str]]): Other corpora to query in parallel.
+                           Their results are merged by score into one top-k list.
+
+    Returns:
+        dict: The query results and status.
+    """
+    return await run_blocking(rag_query, corpus_name, query, tool_context, additional_corpora)
+
+
+@_declared_as(sync_corpus)
+async def sync_corpus_async(
+    corpus_name: str,
+    source_prefix: str,
+    tool_context: ToolContext,
+    dry_run: bool = False,
+    max_concurrency: int = BULK_INGEST_MAX_CONCURRENCY,
+) -> dict:
+    """
+    Make a corpus match a GCS prefix or local directory by applying only the differences.
+
+    Args:
+        corpus_name (str): The name of the corpus to sync.
+        source_prefix (str): A GCS prefix ("gs://{BUCKET}/{PREFIX}") or, for the
+            local backend, a local directory.
+        tool_context (ToolContext): The tool context.
+        dry_run (bool): Only compute and return the plan without changing the corpus.
+        max_concurrency (int): Number of import and delete operations run at the same time.
+
+    Returns:
+        dict: The plan (paths to add, update and delete) and, unless dry_run, its outcome
+    """
+    return await run_blocking(
+        sync_corpus, corpus_name, source_prefix, tool_context, dry_run, max_concurrency
+    )
@@ -0,0 +1,333 @@
+"""
+Parallel, resumable bulk ingestion into a RAG corpus.
+
+``add_data`` sends every path in one blocking import, so a single bad path or a
+timeout loses the whole run. ``bulk_add_data`` splits the paths into batches,
+imports them concurrently within the embedding-rate budget and records finished
+paths in a local journal so that a re-run resumes where the previous one
+stopped. The journal only lives for one run: it is deleted once every batch has
+succeeded, so a later run of the same paths checks their content again.
+
+Like ``ResilientBackend``, a batch is only retried when its import was rejected
+before it reached the backend. A timed-out import may still complete, and
+sending it again would create duplicate files; such batches are left to the
+next run, whose dedup check skips whatever did land.
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Set
+
+from google.adk.tools.tool_context import ToolContext
+
+from ..backends import get_backend
+from ..config import (
+    BULK_INGEST_BATCH_SIZE,
+    BULK_INGEST_JOURNAL_DIR,
+    BULK_INGEST_MAX_CONCURRENCY,
+    BULK_INGEST_MAX_RETRIES,
+    DEFAULT_CHUNK_OVERLAP,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_EMBEDDING_REQUESTS_PER_MIN,
+)
+from ..backends.resilient import BackendOverloaded, CircuitOpenError
+from .add_data import validate_paths
+from .dedup_index import filter_ingested, record_ingested, synced_index
+from .utils import (
+    check_corpus_exists,
+    get_corpus_resource_name,
+    invalidate_corpus_caches,
+)
+
+logger = logging.getLogger(__name__)
+
+# Errors raised before an import reached the backend, so retrying cannot
+# import a file twice
+RETRYABLE_IMPORT_ERRORS = (BackendOverloaded, CircuitOpenError)
+
+
+class IngestionJournal:
+    """
+    Append-only JSON-lines record of the paths a bulk run has already imported.
+
+    Entries are keyed by path only, so the journal is scoped to one run and
+    removed with ``clear`` once that run has fully succeeded.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.completed: Set[str] = set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        self.completed.add(json.loads(line)["path"])
+
+    @classmethod
+    def for_corpus(cls, corpus_resource_name: str, journal_dir: str) -> "IngestionJournal":
+        os.makedirs(journal_dir, exist_ok=True)
+        corpus_id = corpus_resource_name.split("/")[-1]
+        return cls(os.path.join(journal_dir, f"{corpus_id}.jsonl"))
+
+    def record(self, paths: List[str], batch: int) -> None:
+        now = datetime.now(timezone.utc).isoformat()
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            for path in paths:
+                f.write(json.dumps({"path": path, "batch": batch, "time": now}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+            self.completed.update(paths)
+
+    def clear(self) -> None:
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self.completed.clear()
+
+
+def bulk_add_data(
+    corpus_name: str,
+    paths: List[str],
+    tool_context: ToolContext,
+    batch_size: int = BULK_INGEST_BATCH_SIZE,
+    max_concurrency: int = BULK_INGEST_MAX_CONCURRENCY,
+    max_retries: int = BULK_INGEST_MAX_RETRIES,
+    journal_dir: str = BULK_INGEST_JOURNAL_DIR,
+) -> dict:
+    """
+    Import a large number of sources into a corpus in parallel, resumable batches.
+
+    Args:
+        corpus_name (str): The name of the corpus to add data to.
+        paths (List[str]): URLs or GCS paths to add, in the formats accepted by add_data.
+        tool_context (ToolContext): The tool context.
+        batch_size (int): Number of paths per import request.
+        max_concurrency (int): Number of batches imported at the same time.
+        max_retries (int): Retries per batch whose import was rejected before
+            reaching the backend.
+        journal_dir (str): Directory of the per-corpus journals of unfinished runs.
+
+    Returns:
+        dict: Overall status, totals and per-batch throughput
+    """
+    if not check_corpus_exists(corpus_name, tool_context):
+        return {
+            "status": "error",
+            "message": f"Corpus '{corpus_name}' does not exist. Please create it first using the create_corpus tool.",
+            "corpus_name": corpus_name,
+        }
+
+    try:
+        return _bulk_add_data(
+            corpus_name, paths, batch_size, max_concurrency, max_retries, journal_dir
+        )
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Error bulk adding data to corpus: {str(e)}",
+            "corpus_name": corpus_name,
+        }
+
+
+def _bulk_add_data(
+    corpus_name: str,
+    paths: List[str],
+    batch_size: int,
+    max_concurrency: int,
+    max_retries: int,
+    journal_dir: str,
+) -> dict:
+    backend = get_backend()
+    validated_paths, invalid_paths, _ = validate_paths(
+        paths, backend.supports_local_paths
+    )
+    corpus_resource_name = get_corpus_resource_name(corpus_name)
+    journal = IngestionJournal.for_corpus(corpus_resource_name, journal_dir)
+
+    # Resume: skip everything an unfinished previous run already imported
+    remaining = list(
+        dict.fromkeys(path for path in validated_paths if path not in journal.completed)
+    )
+    journaled = len(validated_paths) - len(remaining)
+    # Build the dedup index once here; each batch checks its own paths against
+    # it, so fingerprinting runs on the pool instead of before it
+    synced_index(corpus_resource_name)
+    batches = [
+        remaining[start : start + batch_size]
+        for start in range(0, len(remaining), batch_size)
+    ]
+
+    # Split the embedding budget so concurrent batches together stay within it
+    workers = max(1, min(max_concurrency, len(batches)))
+    requests_per_min = max(1, DEFAULT_EMBEDDING_REQUESTS_PER_MIN // workers)
+
+    logger.info(
+        "Bulk ingesting %d path(s) into '%s' in %d batch(es) with %d worker(s); "
+        "%d already in the journal",
+        len(remaining),
+        corpus_name,
+        len(batches),
+        workers,
+        journaled,
+    )
+
+    started = time.perf_counter()
+    batch_reports: List[Dict[str, Any]] = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rag-ingest") as pool:
+        futures = [
+            pool.submit(
+                _import_batch,
+                corpus_resource_name,
+                number,
+                batch,
+                requests_per_min,
+                max_retries,
+                journal,
+            )
+            for number, batch in enumerate(batches)
+        ]
+        for future in as_completed(futures):
+            report = future.result()
+            batch_reports.append(report)
+            logger.info(
+                "Batch %d/%d %s: %d file(s) in %ss (%s files/s)",
+                report["batch"] + 1,
+                len(batches),
+                report["status"],
+                report["files_added"],
+                report["seconds"],
+                report["files_per_second"],
+            )
+    elapsed = time.perf_counter() - started
+
+    batch_reports.sort(key=lambda report: report["batch"])
+    files_added = sum(report["files_added"] for report in batch_reports)
+    already_ingested = journaled + sum(report["skipped"] for report in batch_reports)
+    failed_batches = [r for r in batch_reports if r["status"] != "success"]
+    if files_added:
+        invalidate_corpus_caches(corpus_resource_name)
+
+    if not failed_batches:
+        status = "success"
+        # Everything is in and indexed; a later run starts from the dedup index
+        journal.clear()
+    elif len(failed_batches) < len(batch_reports):
+        status = "partial"
+    else:
+        status = "error"
+
+    return {
+        "status": status,
+        "message": (
+            f"Imported {files_added} file(s) into corpus '{corpus_name}' from "
+            f"{len(batches)} batch(es); {len(failed_batches)} batch(es) need a re-run"
+        ),
+        "corpus_name": corpus_name,
+        "files_added": files_added,
+        "already_ingested": already_ingested,
+        "invalid_paths": invalid_paths,
+        "seconds": round(elapsed, 3),
+        "files_per_second": round(files_added / elapsed, 3) if elapsed else 0.0,
+        # Only an unfinished run keeps its journal for the re-run to resume from
+        "journal": journal.path if failed_batches else None,
+        "batches": batch_reports,
+    }
+
+
+def _import_batch(
+    corpus_resource_name: str,
+    number: int,
+    paths: List[str],
+    requests_per_min: int,
+    max_retries: int,
+    journal: IngestionJournal,
+) -> Dict[str, Any]:
+    """
+    Import one batch, retrying only imports the backend rejected before starting.
+
+    Paths whose content is already in the corpus are dropped first. The
+    batch's files are indexed as soon as it is in, and the stale copies of
+    changed sources it replaces are deleted then. Errors are reported in the
+    batch's result rather than raised.
+    """
+    started = time.perf_counter()
+    message = ""
+    status = "error"
+    files_added = 0
+    attempt = 0
+    batch_size = len(paths)
+    skipped: List[str] = []
+    try:
+        paths, skipped, content_hashes, replaced = filter_ingested(
+            corpus_resource_name, paths
+        )
+    except Exception as e:
+        message = f"Could not check the batch against the corpus: {e}"
+        logger.warning("Batch %d failed: %s", number + 1, message)
+        paths = []
+    else:
+        if not paths:
+            # Everything in the batch is already in the corpus
+            status = "success"
+
+    for attempt in range(1, max_retries + 2 if paths else 1):
+        try:
+            result = get_backend().import_files(
+                corpus_resource_name,
+                paths,
+                chunk_size=DEFAULT_CHUNK_SIZE,
+                chunk_overlap=DEFAULT_CHUNK_OVERLAP,
+                max_embedding_requests_per_min=requests_per_min,
+            )
+        except RETRYABLE_IMPORT_ERRORS as e:
+            message = str(e)
+            logger.warning("Batch %d attempt %d rejected: %s", number + 1, attempt, message)
+            if attempt <= max_retries:
+                time.sleep(random.uniform(0, min(30.0, 2.0**attempt)))
+            continue
+        except Exception as e:
+            # The import may still be running or may have partly landed, so it
+            # is not sent again; the next run's dedup check sorts it out
+            message = str(e)
+            logger.warning("Batch %d attempt %d failed: %s", number + 1, attempt, message)
+            break
+
+        files_added = result.imported_rag_files_count
+        try:
+            _, errors = record_ingested(
+                corpus_resource_name, paths, result, content_hashes, replaced=replaced
+            )
+        except Exception as e:
+            status = "partial"
+            message = f"Imported, but could not record the files in the dedup index: {e}"
+            break
+        if result.failed_rag_files_count:
+            # The backend does not say which paths failed, so the batch is
+            # left out of the journal and retried by the next run
+            status = "partial"
+            message = f"{result.failed_rag_files_count} file(s) failed to import"
+        else:
+            journal.record(paths, number)
+            status = "success"
+            message = "; ".join(errors)
+        break
+
+    seconds = time.perf_counter() - started
+    return {
+        "batch": number,
+        "status": status,
+        "message": message,
+        "paths": batch_size,
+        "skipped": len(skipped),
+        "files_added": files_added,
+        "attempts": attempt,
+        "seconds": round(seconds, 3),
+        "files_per_second": round(files_added / seconds, 3) if seconds else 0.0,
+    }
@@ -0,0 +1,210 @@
+"""
+Process-wide registry of RAG corpora.
+
+Resolving a display name or checking that a corpus exists used to scan the
+full corpus listing on every call. The registry keeps the result of a single
+paginated listing in memory and serves lookups from it until the entry expires
+or is explicitly invalidated. Concurrent refreshes share one listing.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from ..backends import CorpusRecord, get_backend
+from ..config import (
+    CORPUS_REGISTRY_LIST_PAGE_SIZE,
+    CORPUS_REGISTRY_MISS_REFRESH_SECONDS,
+    CORPUS_REGISTRY_TTL_SECONDS,
+)
+from ..single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class CorpusRegistry:
+    """
+    Cache of display-name -> resource-name and resource-name -> metadata.
+
+    The registry is filled lazily by one paginated corpus listing and
+    refreshed once ``ttl_seconds`` have passed. A lookup that misses triggers
+    at most one extra refresh every ``miss_refresh_seconds``, so corpora
+    created by other processes still become visible quickly.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = CORPUS_REGISTRY_TTL_SECONDS,
+        miss_refresh_seconds: float = CORPUS_REGISTRY_MISS_REFRESH_SECONDS,
+        page_size: int = CORPUS_REGISTRY_LIST_PAGE_SIZE,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.miss_refresh_seconds = miss_refresh_seconds
+        self.page_size = page_size
+        self._lock = threading.RLock()
+        self._by_display_name: Dict[str, str] = {}
+        self._by_resource_name: Dict[str, Dict[str, str]] = {}
+        self._loaded_at: Optional[float] = None
+        self._flight = SingleFlight("corpus_registry.refresh")
+
+    # --- Population ---
+
+    def refresh(self) -> List[Dict[str, str]]:
+        """
+        Reload the registry from a single paginated corpus listing.
+
+        Callers that arrive while a listing is in progress wait for it instead
+        of starting their own.
+
+        Returns:
+            List[Dict[str, str]]: Metadata for every corpus in the project
+        """
+        return self._flight.do("list_corpora", self._refresh)
+
+    def _refresh(self) -> List[Dict[str, str]]:
+        by_display_name: Dict[str, str] = {}
+        by_resource_name: Dict[str, Dict[str, str]] = {}
+
+        # The backend walks every page of the listing
+        for corpus in get_backend().list_corpora(page_size=self.page_size):
+            metadata = _corpus_metadata(corpus)
+            by_resource_name[metadata["resource_name"]] = metadata
+            if metadata["display_name"]:
+                by_display_name[metadata["display_name"]] = metadata["resource_name"]
+
+        with self._lock:
+            self._by_display_name = by_display_name
+            self._by_resource_name = by_resource_name
+            self._loaded_at = time.monotonic()
+
+        logger.debug("Corpus registry refreshed with %d corpora", len(by_resource_name))
+        return list(by_resource_name.values())
+
+    def invalidate(self) -> None:
+        """Drop every cached entry; the next lookup reloads the registry."""
+        with self._lock:
+            self._by_display_name = {}
+            self._by_resource_name = {}
+            self._loaded_at = None
+
+    def add(self, corpus: CorpusRecord) -> None:
+        """
+        Record a corpus that was just created so it is visible without a listing.
+
+        Args:
+            corpus (CorpusRecord): The corpus returned by the backend
+        """
+        metadata = _corpus_metadata(corpus)
+        with self._lock:
+            self._by_resource_name[metadata["resource_name"]] = metadata
+            if metadata["display_name"]:
+                self._by_display_name[metadata["display_name"]] = metadata[
+                    "resource_name"
+                ]
+
+    def remove(self, resource_name: str) -> None:
+        """
+        Forget a corpus that was just deleted.
+
+        Args:
+            resource_name (str): The full resource name of the deleted corpus
+        """
+        with self._lock:
+            metadata = self._by_resource_name.pop(resource_name, None)
+            if metadata and self._by_display_name.get(metadata["display_name"]) == (
+                resource_name
+            ):
+                del self._by_display_name[metadata["display_name"]]
+
+    # --- Lookups ---
+
+    def corpora(self) -> List[Dict[str, str]]:
+        """
+        Get metadata for every known corpus, refreshing the registry if stale.
+
+        Returns:
+            List[Dict[str, str]]: Metadata for every corpus in the project
+        """
+        self._ensure_fresh()
+        with self._lock:
+            return list(self._by_resource_name.values())
+
+    def resolve(self, display_name: str) -> Optional[str]:
+        """
+        Map a corpus display name to its full resource name.
+
+        Args:
+            display_name (str): The display name of the corpus
+
+        Returns:
+            Optional[str]: The resource name, or None if no corpus has that name
+        """
+        return self._lookup(lambda: self._by_display_name.get(display_name))
+
+    def get(self, resource_name: str) -> Optional[Dict[str, str]]:
+        """
+        Get the cached metadata for a corpus.
+
+        Args:
+            resource_name (str): The full resource name of the corpus
+
+        Returns:
+            Optional[Dict[str, str]]: The corpus metadata, or None if unknown
+        """
+        return self._lookup(lambda: self._by_resource_name.get(resource_name))
+
+    def exists(self, corpus_name: str, resource_name: Optional[str] = None) -> bool:
+        """
+        Check whether a corpus exists by display name or resource name.
+
+        Args:
+            corpus_name (str): The display name or resource name of the corpus
+            resource_name (Optional[str]): The resolved resource name, if known
+
+        Returns:
+            bool: True if the corpus is known to the registry
+        """
+        return bool(
+            self._lookup(
+                lambda: corpus_name in self._by_display_name
+                or corpus_name in self._by_resource_name
+                or (resource_name is not None and resource_name in self._by_resource_name)
+            )
+        )
+
+    def _lookup(self, find):
+        self._ensure_fresh()
+        with self._lock:
+            found = find()
+            loaded_at = self._loaded_at
+        if found:
+            return found
+
+        # A miss may be a corpus created elsewhere; re-list at a bounded rate
+        if loaded_at is None or (
+            time.monotonic() - loaded_at >= self.miss_refresh_seconds
+        ):
+            self.refresh()
+            with self._lock:
+                return find()
+        return found
+
+    def _ensure_fresh(self) -> None:
+        with self._lock:
+            loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at >= self.ttl_seconds:
+            self.refresh()
+
+
+def _corpus_metadata(corpus: CorpusRecord) -> Dict[str, str]:
+    return {
+        "resource_name": corpus.name,
+        "display_name": corpus.display_name,
+        "create_time": corpus.create_time,
+        "update_time": corpus.update_time,
+    }
+
+
+# Shared by every tool in this process
+corpus_registry = CorpusRegistry()
@@ -2,16 +2,20 @@
 Tool for creating a new Vertex AI RAG corpus.
 """
 
+import logging
 import re
 
 from google.adk.tools.tool_context import ToolContext
-from vertexai import rag
-
+from ..backends import get_backend
 from ..config import (
     DEFAULT_EMBEDDING_MODEL,
 )
+from ..telemetry import span
+from .corpus_registry import corpus_registry
 from .utils import check_corpus_exists
 
+logger = logging.getLogger(__name__)
+
 
 def create_corpus(
     corpus_name: str,
@@ -27,70 +31,64 @@ def create_corpus(
     Returns:
         dict: Status information about the operation
     """
-    print(f"[DEBUG] Starting create_corpus with corpus_name='{corpus_name}'")
+    with span("create_corpus", corpus=corpus_name) as create_span:
+        # Check if corpus already exists
+        with span("create_corpus.check_exists"):
+            exists = check_corpus_exists(corpus_name, tool_context)
+        if exists:
+            logger.info("Corpus %s already exists. Skipping creation.", corpus_name)
+            create_span.set_attribute("created", False)
+            return {
+                "status": "info",
+                "message": f"Corpus '{corpus_name}' already exists",
+                "corpus_name": corpus_name,
+                "corpus_created": False,
+            }
 
-    # Check if corpus already exists
-    if check_corpus_exists(corpus_name, tool_context):
-        print(f"[INFO] Corpus '{corpus_name}' already exists. Skipping creation.")
-        return {
-            "status": "info",
-            "message": f"Corpus '{corpus_name}' already exists",
-            "corpus_name": corpus_name,
-            "corpus_created": False,
-        }
-
-    try:
-        # Clean corpus name for use as display name
-        display_name = re.sub(r"[^a-zA-Z0-9_-]", "_", corpus_name)
-        print(
-            f"[DEBUG] Cleaned display_name='{display_name}' from corpus_name='{corpus_name}'"
-        )
+        try:
+            # Clean corpus name for use as display name
+            display_name = re.sub(r"[^a-zA-Z0-9_-]", "_", corpus_name)
+            logger.debug(
+                "Creating corpus display_name=%s with embedding model %s",
+                display_name,
+                DEFAULT_EMBEDDING_MODEL,
+            )
 
-        # Configure embedding model
-        print(f"[DEBUG] Using embedding model '{DEFAULT_EMBEDDING_MODEL}'")
-        embedding_model_config = rag.RagEmbeddingModelConfig(
-            vertex_prediction_endpoint=rag.VertexPredictionEndpoint(
-                publisher_model=DEFAULT_EMBEDDING_MODEL
+            # Create the corpus
+            with span("create_corpus.backend_create"):
+                rag_corpus = get_backend().create_corpus(
+                    display_name=display_name,
+                    embedding_model=DEFAULT_EMBEDDING_MODEL,
+                )
+            logger.info(
+                "Corpus created: name=%s, display_name=%s",
+                rag_corpus.name,
+                rag_corpus.display_name,
             )
-        )
 
-        # Create the corpus
-        print("[DEBUG] Creating corpus with Vertex AI RAG...")
-        rag_corpus = rag.create_corpus(
-            display_name=display_name,
-            backend_config=rag.RagVectorDbConfig(
-                rag_embedding_model_config=embedding_model_config
-            ),
-        )
-        print(
-            f"[SUCCESS] Corpus created in Vertex AI: name='{rag_corpus.name}', display_name='{rag_corpus.display_name}'"
-        )
+            # Make the new corpus visible to every tool without another listing
+            corpus_registry.add(rag_corpus)
 
-        # Update state to track corpus existence
-        tool_context.state[f"corpus_exists_{corpus_name}"] = True
-        print(
-            f"[DEBUG] Updated tool_context.state with corpus_exists_{corpus_name}=True"
-        )
+            # Update state to track corpus existence
+            tool_context.state[f"corpus_exists_{corpus_name}"] = True
 
-        # Set this as the current corpus
-        tool_context.state["current_corpus"] = corpus_name
-        print(f"[DEBUG] Set current_corpus='{corpus_name}' in tool_context.state")
+            # Set this as the current corpus
+            tool_context.state["current_corpus"] = corpus_name
 
-        result = {
-            "status": "success",
-            "message": f"Successfully created corpus '{corpus_name}'",
-            "corpus_name": rag_corpus.name,
-            "display_name": rag_corpus.display_name,
-            "corpus_created": True,
-        }
-        print(f"[RESULT] {result}")
-        return result
+            create_span.set_attribute("created", True)
+            return {
+                "status": "success",
+                "message": f"Successfully created corpus '{corpus_name}'",
+                "corpus_name": rag_corpus.name,
+                "display_name": rag_corpus.display_name,
+                "corpus_created": True,
+            }
 
-    except Exception as e:
-        print(f"[ERROR] Exception occurred while creating corpus: {str(e)}")
-        return {
-            "status": "error",
-            "message": f"Error creating corpus: {str(e)}",
-            "corpus_name": corpus_name,
-            "corpus_created": False,
-        }
+        except Exception as e:
+            logger.error("Exception occurred while creating corpus: %s", e)
+            return {
+                "status": "error",
+                "message": f"Error creating corpus: {str(e)}",
+                "corpus_name": corpus_name,
+                "corpus_created": False,
+            }
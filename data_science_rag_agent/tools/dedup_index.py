@@ -0,0 +1,593 @@
+"""
+Persistent per-corpus index of ingested documents for duplicate detection.
+
+The index maps source URI, Google Drive file id and content hash to the RAG
+file id that holds the document, so "is this already ingested?" is a dictionary
+lookup instead of a listing of every file in the corpus. ``add_data`` and
+``delete_document`` keep it up to date without relisting the corpus.
+
+Backends that do not report the files an import created (Vertex AI) get a
+pending entry per imported source. It answers duplicate checks like any other
+entry; only when its RAG file id is actually needed is the corpus listed once
+to resolve it.
+
+Several processes may share an index file. Every change is a read-modify-write
+under an exclusive lock on a sibling ``.lock`` file, and each lookup through
+``dedup_indexes`` first reloads the file if another process saved it since.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..backends import ImportResult, RagFileRecord, get_backend
+from ..config import DEDUP_INDEX_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows: changes are only serialized within the process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_DRIVE_URL_PATTERN = re.compile(
+    r"https:\/\/drive\.google\.com\/(?:file\/d\/|open\?id=)([a-zA-Z0-9_-]+)(?:\/|$)"
+)
+
+# Key prefix of entries whose RAG file id is not known yet
+PENDING_PREFIX = "pending:"
+
+
+class DedupIndex:
+    """
+    Source URI / Drive id / content hash -> RAG file id for one corpus.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self.files: Dict[str, Dict[str, str]] = {}
+        self.synced = False
+        self._by_source_uri: Dict[str, str] = {}
+        self._by_drive_id: Dict[str, str] = {}
+        self._by_content_hash: Dict[str, str] = {}
+        # (inode, mtime, size) of the file as last read or written by this
+        # process; every save replaces the file, so the inode alone changes
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        self._update_depth = 0
+        self._load_if_changed()
+
+    # --- Lookups ---
+
+    def by_source_uri(self, source_uri: str) -> Optional[str]:
+        return self._by_source_uri.get(source_uri)
+
+    def by_drive_id(self, drive_id: str) -> Optional[str]:
+        return self._by_drive_id.get(drive_id)
+
+    def by_content_hash(self, content_hash: str) -> Optional[str]:
+        return self._by_content_hash.get(content_hash)
+
+    def content_hash_of(self, rag_file_id: str) -> str:
+        return self.files.get(rag_file_id, {}).get("content_hash", "")
+
+    def source_version_of(self, rag_file_id: str) -> str:
+        return self.files.get(rag_file_id, {}).get("source_version", "")
+
+    def has_pending(self) -> bool:
+        return any(rag_file_id.startswith(PENDING_PREFIX) for rag_file_id in self.files)
+
+    # --- Updates ---
+
+    def sync_from_files(
+        self,
+        files: Iterable[RagFileRecord],
+        content_hashes: Dict[str, str],
+        source_versions: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """
+        Rebuild the index from a corpus file listing.
+
+        Hashes and versions already known for a source URI are kept;
+        ``content_hashes`` and ``source_versions`` supply them for sources that
+        were just imported or listed.
+
+        Args:
+            files (Iterable[RagFileRecord]): Every file currently in the corpus
+            content_hashes (Dict[str, str]): Source URI -> content hash of new imports
+            source_versions (Optional[Dict[str, str]]): Source URI -> GCS generation
+                or local modification stamp, as recorded by ``sync_corpus``
+        """
+        source_versions = source_versions or {}
+        with self.update():
+            known = {entry["source_uri"]: entry for entry in self.files.values()}
+            rebuilt: Dict[str, Dict[str, str]] = {}
+            for rag_file in files:
+                rag_file_id = rag_file.name.split("/")[-1]
+                previous = known.get(rag_file.source_uri, {})
+                rebuilt[rag_file_id] = {
+                    "source_uri": rag_file.source_uri,
+                    "drive_id": rag_file.resource_id,
+                    "content_hash": content_hashes.get(
+                        rag_file.source_uri, previous.get("content_hash", "")
+                    ),
+                    "source_version": source_versions.get(
+                        rag_file.source_uri, previous.get("source_version", "")
+                    ),
+                }
+            self.files = rebuilt
+            self.synced = True
+
+    def add_files(
+        self,
+        files: Iterable[RagFileRecord],
+        content_hashes: Dict[str, str],
+        source_versions: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """
+        Index files that were just imported, keeping every other entry.
+
+        Args:
+            files (Iterable[RagFileRecord]): The imported files
+            content_hashes (Dict[str, str]): Source URI -> content hash
+            source_versions (Optional[Dict[str, str]]): Source URI -> source version
+        """
+        source_versions = source_versions or {}
+        with self.update():
+            for rag_file in files:
+                self.files.pop(PENDING_PREFIX + rag_file.source_uri, None)
+                self.files[rag_file.name.split("/")[-1]] = {
+                    "source_uri": rag_file.source_uri,
+                    "drive_id": rag_file.resource_id,
+                    "content_hash": content_hashes.get(rag_file.source_uri, ""),
+                    "source_version": source_versions.get(rag_file.source_uri, ""),
+                }
+
+    def add_pending(
+        self,
+        source_uris: Iterable[str],
+        content_hashes: Dict[str, str],
+        source_versions: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """
+        Index imported sources whose RAG file ids the backend did not report.
+
+        Args:
+            source_uris (Iterable[str]): Single-document sources that were imported
+            content_hashes (Dict[str, str]): Source URI -> content hash
+            source_versions (Optional[Dict[str, str]]): Source URI -> source version
+        """
+        source_versions = source_versions or {}
+        with self.update():
+            for source_uri in source_uris:
+                self.files[PENDING_PREFIX + source_uri] = {
+                    "source_uri": source_uri,
+                    "drive_id": drive_file_id(source_uri) or "",
+                    "content_hash": content_hashes.get(source_uri, ""),
+                    "source_version": source_versions.get(source_uri, ""),
+                }
+
+    def set_source_versions(self, source_versions: Dict[str, str]) -> None:
+        """
+        Record the current source version of already indexed sources.
+
+        Args:
+            source_versions (Dict[str, str]): Source URI -> source version
+        """
+        with self.update():
+            for entry in self.files.values():
+                if entry["source_uri"] in source_versions:
+                    entry["source_version"] = source_versions[entry["source_uri"]]
+
+    def mark_stale(self) -> None:
+        """Have the next ``synced_index`` call rebuild the index from a listing."""
+        with self.update():
+            self.synced = False
+
+    def remove_file(self, rag_file_id: str) -> None:
+        """
+        Forget a deleted RAG file.
+
+        Args:
+            rag_file_id (str): The id of the deleted file
+        """
+        self.remove_files([rag_file_id])
+
+    def remove_files(self, rag_file_ids: Iterable[str]) -> None:
+        """
+        Forget deleted RAG files.
+
+        Args:
+            rag_file_ids (Iterable[str]): The ids of the deleted files
+        """
+        with self.update():
+            for rag_file_id in rag_file_ids:
+                if self.files.pop(rag_file_id, None) is None and self.has_pending():
+                    # The file may be behind a pending entry; re-list before trusting it
+                    self.synced = False
+
+    @contextmanager
+    def update(self) -> Iterator["DedupIndex"]:
+        """
+        Group changes into one locked read-modify-write with a single save.
+
+        The outermost update takes the file lock and reloads the index if
+        another process saved it, so its changes are applied on top of theirs
+        instead of overwriting them. Nested updates join the outer one. If the
+        changes raise, they are dropped and the index is reloaded from disk.
+        """
+        with self._lock:
+            outermost = self._update_depth == 0
+            lock_file = self._lock_file() if outermost else None
+            self._update_depth += 1
+            try:
+                if outermost:
+                    self._load_if_changed()
+                yield self
+                if outermost:
+                    self._reindex()
+                    self._save()
+            except BaseException:
+                if outermost:
+                    self._stamp = None
+                    self._load_if_changed()
+                raise
+            finally:
+                self._update_depth -= 1
+                if lock_file is not None:
+                    lock_file.close()
+
+    def refresh(self) -> None:
+        """Reload the index if another process saved it since this one read it."""
+        with self._lock:
+            self._load_if_changed()
+
+    def _lock_file(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        lock_file = open(f"{self.path}.lock", "a")
+        if fcntl is not None:
+            # Released when the file is closed
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return lock_file
+
+    def _load_if_changed(self) -> None:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            if self._stamp is not None:
+                # Dropped by another process
+                self.files, self.synced, self._stamp = {}, False, None
+                self._reindex()
+            return
+        stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if stamp == self._stamp:
+            return
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.files = data.get("files", {})
+        self.synced = data.get("synced", False)
+        self._stamp = stamp
+        self._reindex()
+
+    def _reindex(self) -> None:
+        by_source_uri, by_drive_id, by_content_hash = {}, {}, {}
+        for rag_file_id, entry in self.files.items():
+            if entry.get("source_uri"):
+                by_source_uri[entry["source_uri"]] = rag_file_id
+            if entry.get("drive_id"):
+                by_drive_id[entry["drive_id"]] = rag_file_id
+            if entry.get("content_hash"):
+                by_content_hash[entry["content_hash"]] = rag_file_id
+        self._by_source_uri = by_source_uri
+        self._by_drive_id = by_drive_id
+        self._by_content_hash = by_content_hash
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"synced": self.synced, "files": self.files}, f)
+        os.replace(tmp_path, self.path)
+        stat = os.stat(self.path)
+        self._stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+class DedupIndexes:
+    """
+    Process-wide cache of the per-corpus dedup indexes.
+    """
+
+    def __init__(self, directory: str = DEDUP_INDEX_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._indexes: Dict[str, DedupIndex] = {}
+
+    def get(self, corpus_resource_name: str) -> DedupIndex:
+        with self._lock:
+            index = self._indexes.get(corpus_resource_name)
+            if index is None:
+                index = self._indexes[corpus_resource_name] = DedupIndex(
+                    self._path(corpus_resource_name)
+                )
+        # Pick up what other processes saved since this one last looked
+        index.refresh()
+        return index
+
+    def drop(self, corpus_resource_name: str) -> None:
+        with self._lock:
+            self._indexes.pop(corpus_resource_name, None)
+            path = self._path(corpus_resource_name)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _path(self, corpus_resource_name: str) -> str:
+        corpus_id = corpus_resource_name.split("/")[-1]
+        return os.path.join(self.directory, f"{corpus_id}.json")
+
+
+def drive_file_id(path: str) -> Optional[str]:
+    """
+    Extract the file id from a Google Drive file URL.
+
+    Args:
+        path (str): The source path
+
+    Returns:
+        Optional[str]: The Drive file id, or None for other sources
+    """
+    match = _DRIVE_URL_PATTERN.match(path)
+    return match.group(1) if match else None
+
+
+def content_hash(path: str, storage_client=None) -> Optional[str]:
+    """
+    Fingerprint the content of a single GCS object or local file.
+
+    GCS objects use the MD5 stored in their metadata, so nothing is downloaded.
+    Local files are hashed in fixed-size blocks. Prefixes, directories and
+    Drive URLs return None and are always imported.
+
+    Args:
+        path (str): The source path
+        storage_client: A ``google.cloud.storage.Client`` to reuse across calls;
+            one is created if needed and not given
+
+    Returns:
+        Optional[str]: A ``"<algorithm>:<digest>"`` string, or None if unavailable
+    """
+    try:
+        if path.startswith("gs://"):
+            bucket_name, _, blob_name = path[len("gs://"):].partition("/")
+            if not blob_name or blob_name.endswith("/"):
+                return None
+            if storage_client is None:
+                from google.cloud import storage
+
+                storage_client = storage.Client()
+            blob = storage_client.bucket(bucket_name).get_blob(blob_name)
+            if blob is None:
+                return None
+            if blob.md5_hash:
+                return f"md5:{base64.b64decode(blob.md5_hash).hex()}"
+            return f"crc32c:{blob.crc32c}" if blob.crc32c else None
+
+        local_path = path[len("file://"):] if path.startswith("file://") else path
+        if os.path.isfile(local_path):
+            digest = hashlib.sha256()
+            with open(local_path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+            return f"sha256:{digest.hexdigest()}"
+    except Exception as e:
+        logger.warning("Could not fingerprint '%s': %s", path, e)
+    return None
+
+
+def synced_index(corpus_resource_name: str) -> DedupIndex:
+    """
+    Get a corpus's dedup index, building it from one file listing on first use.
+
+    Args:
+        corpus_resource_name (str): The full resource name of the corpus
+
+    Returns:
+        DedupIndex: The corpus's index
+    """
+    index = dedup_indexes.get(corpus_resource_name)
+    if not index.synced:
+        index.sync_from_files(get_backend().list_files(corpus_resource_name), {})
+    return index
+
+
+def resolve_file_id(corpus_resource_name: str, rag_file_id: str) -> Optional[str]:
+    """
+    Get the real RAG file id of an index entry, listing the corpus once if it is pending.
+
+    Args:
+        corpus_resource_name (str): The full resource name of the corpus
+        rag_file_id (str): An id from the index, possibly a pending one
+
+    Returns:
+        Optional[str]: The RAG file id, or None if the file is no longer in the corpus
+    """
+    if not rag_file_id.startswith(PENDING_PREFIX):
+        return rag_file_id
+    return relisted_index(corpus_resource_name).by_source_uri(rag_file_id[len(PENDING_PREFIX):])
+
+
+def relisted_index(corpus_resource_name: str) -> DedupIndex:
+    """
+    Get a corpus's dedup index rebuilt from a fresh file listing.
+
+    Use it where a stale answer is costly: the index only learns about files
+    changed through these tools, not ones deleted in the console.
+
+    Args:
+        corpus_resource_name (str): The full resource name of the corpus
+
+    Returns:
+        DedupIndex: The corpus's index, matching the corpus's current files
+    """
+    index = dedup_indexes.get(corpus_resource_name)
+    index.sync_from_files(get_backend().list_files(corpus_resource_name), {})
+    return index
+
+
+def filter_ingested(
+    corpus_resource_name: str, paths: List[str]
+) -> Tuple[List[str], List[Dict[str, str]], Dict[str, str], Dict[str, str]]:
+    """
+    Drop the paths whose content is already in the corpus.
+
+    A Drive file is skipped if its id is indexed. A GCS object or local file is
+    skipped if the same source with the same hash, or the same content under
+    another source, is indexed. A source whose content changed is imported and
+    its old RAG file is returned for ``record_ingested`` to delete once the new
+    version is in. Prefixes and directories cannot be fingerprinted cheaply and
+    are always imported.
+
+    Args:
+        corpus_resource_name (str): The full resource name of the corpus
+        paths (List[str]): Validated source paths
+
+    Returns:
+        Tuple[List[str], List[Dict[str, str]], Dict[str, str], Dict[str, str]]:
+            Paths to import, skipped paths with the matching RAG file id, the
+            content hash of every fingerprinted path to import keyed by source
+            URI, and the RAG file id each changed source replaces keyed by source URI
+    """
+    index = synced_index(corpus_resource_name)
+    to_import: List[str] = []
+    skipped: List[Dict[str, str]] = []
+    content_hashes: Dict[str, str] = {}
+    replaced: Dict[str, str] = {}
+    storage_client = None
+
+    for path in paths:
+        drive_id = drive_file_id(path)
+        if drive_id:
+            rag_file_id = index.by_drive_id(drive_id)
+            if rag_file_id:
+                skipped.append({"path": path, "rag_file_id": rag_file_id})
+                continue
+            to_import.append(path)
+            continue
+
+        source_uri = path[len("file://"):] if path.startswith("file://") else path
+        if path.startswith("gs://") and storage_client is None:
+            from google.cloud import storage
+
+            # One client for every object in this call
+            storage_client = storage.Client()
+        digest = content_hash(path, storage_client)
+        if digest:
+            rag_file_id = index.by_source_uri(source_uri)
+            if rag_file_id and index.content_hash_of(rag_file_id) == digest:
+                skipped.append({"path": path, "rag_file_id": rag_file_id})
+                continue
+            duplicate_id = index.by_content_hash(digest)
+            if duplicate_id:
+                skipped.append({"path": path, "rag_file_id": duplicate_id})
+                continue
+            if rag_file_id:
+                # Changed content: the stale copy goes once the new one is imported.
+                # Resolve it now, while it is the only file with this source URI
+                stale_id = resolve_file_id(corpus_resource_name, rag_file_id)
+                if stale_id:
+                    replaced[source_uri] = stale_id
+            content_hashes[source_uri] = digest
+        to_import.append(path)
+
+    return to_import, skipped, content_hashes, replaced
+
+
+def record_ingested(
+    corpus_resource_name: str,
+    paths: List[str],
+    result: Optional[ImportResult],
+    content_hashes: Dict[str, str],
+    source_versions: Optional[Dict[str, str]] = None,
+    replaced: Optional[Dict[str, str]] = None,
+) -> Tuple[List[str], List[str]]:
+    """
+    Index the files of an import and delete the stale copies they replace.
+
+    Only sources known to have been imported are indexed and have their stale
+    copy deleted. When the backend does not report the created files and some
+    of them failed, which sources made it in is unknown: nothing is replaced
+    and the index is re-listed on next use.
+
+    Args:
+        corpus_resource_name (str): The full resource name of the corpus
+        paths (List[str]): The paths passed to ``import_files``
+        result (Optional[ImportResult]): The import's result; None if it raised
+        content_hashes (Dict[str, str]): Hashes returned by ``filter_ingested``
+        source_versions (Optional[Dict[str, str]]): Source versions seen by ``sync_corpus``
+        replaced (Optional[Dict[str, str]]): Stale RAG file ids returned by ``filter_ingested``
+
+    Returns:
+        Tuple[List[str], List[str]]: The paths known to be imported, and errors
+            from deleting stale copies
+    """
+    if result is None:
+        return [], []
+
+    index = dedup_indexes.get(corpus_resource_name)
+    source_uris = {
+        (path[len("file://"):] if path.startswith("file://") else path): path
+        for path in paths
+    }
+    documents: List[str] = []
+    if result.rag_files:
+        imported = [
+            source_uris[rag_file.source_uri]
+            for rag_file in result.rag_files
+            if rag_file.source_uri in source_uris
+        ]
+    elif not result.failed_rag_files_count:
+        documents = [
+            source_uri
+            for source_uri in source_uris
+            if drive_file_id(source_uri) or source_uri in content_hashes
+        ]
+        imported = list(paths)
+    else:
+        imported = []
+
+    errors = []
+    removed = []
+    for path in imported:
+        source_uri = path[len("file://"):] if path.startswith("file://") else path
+        stale_id = (replaced or {}).get(source_uri)
+        if not stale_id:
+            continue
+        try:
+            get_backend().delete_file(f"{corpus_resource_name}/ragFiles/{stale_id}")
+            removed.append(stale_id)
+        except Exception as e:
+            logger.warning("Failed to delete replaced RAG file '%s': %s", stale_id, e)
+            errors.append(f"Failed to delete replaced file '{stale_id}': {str(e)}")
+
+    # One locked save for the whole batch
+    with index.update():
+        if result.rag_files:
+            index.add_files(result.rag_files, content_hashes, source_versions)
+        elif imported:
+            index.add_pending(documents, content_hashes, source_versions)
+            if len(documents) < len(source_uris):
+                # Prefixes and directories expand to files we cannot name
+                index.mark_stale()
+        else:
+            index.mark_stale()
+        index.remove_files(removed)
+    return imported, errors
+
+
+# Shared by every tool in this process
+dedup_indexes = DedupIndexes()
@@ -1,18 +1,34 @@
+import logging
 import re
+import threading
+from types import SimpleNamespace
+from typing import Optional
+
+from ..telemetry import span
 from .create_corpus import create_corpus
-from .get_corpus_info import get_corpus_info
 from .add_data import add_data
+from .dedup_index import relisted_index
 from .utils import check_corpus_exists, get_corpus_resource_name
 from google.adk.tools.tool_context import ToolContext
 
+logger = logging.getLogger(__name__)
+
+DATA_SCIENCE_CORPUS = "data_science_agent"
+DEFAULT_DOCUMENT_URL = (
+    "https://drive.google.com/file/d/1jN5t9ldRyDgExvzkEtIUnhMHLkTEynrr/view"
+)
+
+# Result of the one-time bootstrap, shared by every session in the process
+_bootstrap_lock = threading.Lock()
+_bootstrap_result: Optional[dict] = None
+
 
 def default_rag_config(tool_context: ToolContext) -> dict:
     """
     Configure and set up a default Vertex AI RAG resource.
 
-    This function checks whether a specific RAG corpus already exists.
-    If not, it creates a new corpus, adds a given document, and ensures
-    no duplicate entries are added.
+    The setup runs once per process; later calls return the cached
+    corpus name without touching Vertex AI.
 
     Args:
         tool_context (ToolContext): Context object for state management.
@@ -20,83 +36,144 @@ def default_rag_config(tool_context: ToolContext) -> dict:
     Returns:
         dict: A status dictionary with success flag and message.
     """
+    result = bootstrap_default_corpus(tool_context)
+    if result.get("success"):
+        # Let rag_query skip its existence check for this session
+        tool_context.state[f"corpus_exists_{result['corpus_name']}"] = True
+    return result
+
+
+def bootstrap_default_corpus(tool_context: Optional[ToolContext] = None) -> dict:
+    """
+    Idempotently set up the default corpus for this process.
+
+    Concurrent first callers wait on a single in-flight bootstrap. Only a
+    successful result is cached, so a failed setup is retried on the next call.
+    Can be called at startup without a tool context.
+
+    Args:
+        tool_context (Optional[ToolContext]): Context object for state management.
+
+    Returns:
+        dict: A status dictionary with success flag, message and corpus name.
+    """
+    global _bootstrap_result
+
+    result = _bootstrap_result
+    if result is not None:
+        return dict(result)
+
+    with _bootstrap_lock:
+        if _bootstrap_result is None:
+            result = _setup_default_corpus(tool_context or SimpleNamespace(state={}))
+            if not result.get("success"):
+                return result
+            _bootstrap_result = result
+        return dict(_bootstrap_result)
+
+
+def reset_default_rag_config(corpus_name: Optional[str] = None) -> None:
+    """
+    Forget the cached bootstrap result, e.g. after the default corpus is deleted.
+
+    Args:
+        corpus_name (Optional[str]): Only reset if this is the bootstrapped corpus's
+            resource name; None always resets
+    """
+    global _bootstrap_result
+
+    with _bootstrap_lock:
+        if corpus_name is None or (
+            _bootstrap_result is not None
+            and _bootstrap_result.get("corpus_name") == corpus_name
+        ):
+            _bootstrap_result = None
+
+
+def _setup_default_corpus(tool_context: ToolContext) -> dict:
+    """
+    Check whether the default RAG corpus already exists.
+
+    If not, create a new corpus, add the default document, and ensure
+    no duplicate entries are added.
+    """
     try:
-        data_science_corpus = "data_science_agent"
-        document_url = (
-            "https://drive.google.com/file/d/1jN5t9ldRyDgExvzkEtIUnhMHLkTEynrr/view"
-        )
-
-        print("\n========== ⚙️ Starting Default RAG Configuration ==========")
-
-        # --- Validate Google Drive URL ---
-        print("🔍 Validating provided document URL...")
-        drive_match = re.match(
-            r"https:\/\/drive\.google\.com\/(?:file\/d\/|open\?id=)([a-zA-Z0-9_-]+)(?:\/|$)",
-            document_url,
-        )
-        if drive_match:
+        data_science_corpus = DATA_SCIENCE_CORPUS
+        document_url = DEFAULT_DOCUMENT_URL
+
+        with span("default_rag_config.setup") as setup_span:
+            # --- Validate Google Drive URL ---
+            drive_match = re.match(
+                r"https:\/\/drive\.google\.com\/(?:file\/d\/|open\?id=)([a-zA-Z0-9_-]+)(?:\/|$)",
+                document_url,
+            )
+            if not drive_match:
+                logger.error("Invalid Google Drive URL format: %s", document_url)
+                return {"success": False, "message": "Invalid Google Drive URL format."}
             file_id = drive_match.group(1)
-            print(f"✅ Valid Google Drive file detected | File ID: {file_id}")
-        else:
-            print(f"❌ Invalid Google Drive URL format: {document_url}")
-            return {"success": False, "message": "Invalid Google Drive URL format."}
-
-        # --- Get corpus resource name ---
-        full_corpus_name = get_corpus_resource_name(corpus_name=data_science_corpus)
-        print(f"📌 Corpus Resource Name: {full_corpus_name}")
-
-        # --- Check if corpus already exists ---
-        print("🔍 Checking if corpus already exists...")
-        exists = check_corpus_exists(
-            corpus_name=full_corpus_name, tool_context=tool_context
-        )
-        print(f"➡️ Corpus Exists: {'Yes' if exists else 'No'}")
-
-        corpus_info = get_corpus_info(
-            corpus_name=full_corpus_name, tool_context=tool_context
-        )
-        # print(f"📊 Corpus Info: {corpus_info}")
-
-        # --- Check for existing file in corpus ---
-        print("🔍 Checking if the file already exists in the corpus...")
-        is_file_exists = any(
-            file_id == file.get("resource_id") for file in corpus_info.get("files", [])
-        )
-
-        if is_file_exists:
-            print(f"⚠️ File with ID '{file_id}' already exists in the corpus.")
-            return {
-                "success": True,
-                "message": f"File with ID '{file_id}' already exists in the corpus.",
-                "corpus_name": full_corpus_name,
-            }
-
-        # --- Create new corpus if not found ---
-        print("🆕 Creating new corpus...")
-        new_corpus = create_corpus(
-            corpus_name=data_science_corpus, tool_context=tool_context
-        )
-        print(f"✅ New Corpus Created: {new_corpus}")
-
-        # --- Add document to corpus ---
-        full_corpus_name = new_corpus.get("corpus_name")
-        print(f"📥 Adding document '{document_url}' to corpus '{full_corpus_name}'...")
-        new_data = add_data(
-            corpus_name=full_corpus_name,
-            paths=[document_url],
-            tool_context=tool_context,
-        )
-        print(f"✅ New Data Added: {new_data}")
-
-        print("🎉 Setup Complete: New corpus and document added successfully.")
-        print("===========================================================\n")
+
+            # --- Get corpus resource name ---
+            with span("default_rag_config.resolve_corpus"):
+                full_corpus_name = get_corpus_resource_name(corpus_name=data_science_corpus)
+
+            # --- Check if corpus already exists ---
+            with span("default_rag_config.check_exists"):
+                exists = check_corpus_exists(
+                    corpus_name=full_corpus_name, tool_context=tool_context
+                )
+            logger.debug("Default corpus %s exists: %s", full_corpus_name, exists)
+
+            # --- Check for existing file in corpus ---
+            if exists:
+                # Runs once per process, so check a fresh listing rather than
+                # an index that misses files deleted outside these tools
+                with span("default_rag_config.check_document"):
+                    ingested = relisted_index(full_corpus_name).by_drive_id(file_id)
+                if ingested:
+                    logger.debug("File %s already exists in %s", file_id, full_corpus_name)
+                    setup_span.set_attribute("document_added", False)
+                    return {
+                        "success": True,
+                        "message": f"File with ID '{file_id}' already exists in the corpus.",
+                        "corpus_name": full_corpus_name,
+                    }
+            else:
+                # --- Create new corpus if not found ---
+                with span("default_rag_config.create_corpus"):
+                    new_corpus = create_corpus(
+                        corpus_name=data_science_corpus, tool_context=tool_context
+                    )
+                logger.debug("New corpus created: %s", new_corpus)
+                if new_corpus.get("status") != "success":
+                    return {
+                        "success": False,
+                        "message": f"Could not create the default corpus: {new_corpus.get('message')}",
+                    }
+                full_corpus_name = new_corpus.get("corpus_name")
+
+            # --- Add document to corpus ---
+            with span("default_rag_config.add_document"):
+                new_data = add_data(
+                    corpus_name=full_corpus_name,
+                    paths=[document_url],
+                    tool_context=tool_context,
+                )
+            logger.debug("Default document added to %s: %s", full_corpus_name, new_data)
+            if new_data.get("status") != "success":
+                return {
+                    "success": False,
+                    "message": f"Could not add the default document: {new_data.get('message')}",
+                    "corpus_name": full_corpus_name,
+                }
+            setup_span.set_attribute("document_added", True)
+            logger.info("Default corpus %s set up", full_corpus_name)
 
         return {
             "success": True,
-            "message": "New corpus and document added successfully.",
+            "message": "Default corpus and document set up successfully.",
             "corpus_name": full_corpus_name,
         }
 
     except Exception as e:
-        print("❌ ERROR during RAG setup:", str(e))
+        logger.error("Error during RAG setup: %s", e)
         return {"success": False, "message": f"Error while setting up RAG: {str(e)}"}
@@ -3,9 +3,15 @@ Tool for deleting a Vertex AI RAG corpus when it's no longer needed.
 """
 
 from google.adk.tools.tool_context import ToolContext
-from vertexai import rag
-
-from .utils import check_corpus_exists, get_corpus_resource_name
+from ..backends import get_backend
+from .corpus_registry import corpus_registry
+from .dedup_index import dedup_indexes
+from .default_rag_config import reset_default_rag_config
+from .utils import (
+    check_corpus_exists,
+    get_corpus_resource_name,
+    invalidate_corpus_caches,
+)
 
 
 def delete_corpus(corpus_name: str, confirm: bool, tool_context: ToolContext) -> dict:
@@ -47,7 +53,12 @@ def delete_corpus(corpus_name: str, confirm: bool, tool_context: ToolContext) ->
         full_corpus_name = get_corpus_resource_name(corpus_name=corpus_name)
 
         # Delete the corpus
-        rag.delete_corpus(full_corpus_name)
+        get_backend().delete_corpus(full_corpus_name)
+        corpus_registry.remove(full_corpus_name)
+        dedup_indexes.drop(full_corpus_name)
+        invalidate_corpus_caches(full_corpus_name)
+        # The next default_rag_config call must set the default corpus up again
+        reset_default_rag_config(full_corpus_name)
 
         # Remove from state by setting to false
 
@@ -3,9 +3,13 @@ Tool for deleting a specific document from a Vertex AI RAG corpus.
 """
 
 from google.adk.tools.tool_context import ToolContext
-from vertexai import rag
-
-from .utils import check_corpus_exists, get_corpus_resource_name
+from ..backends import get_backend
+from .dedup_index import dedup_indexes
+from .utils import (
+    check_corpus_exists,
+    get_corpus_resource_name,
+    invalidate_corpus_caches,
+)
 
 
 def delete_document(
@@ -41,7 +45,11 @@ def delete_document(
         # Delete the document
         rag_file_path = f"{full_corpus_name}/ragFiles/{document_id}"
 
-        rag.delete_file(rag_file_path)
+        get_backend().delete_file(rag_file_path)
+        dedup_indexes.get(full_corpus_name).remove_file(document_id)
+
+        # Cached retrievals may still reference the deleted document
+        invalidate_corpus_caches(full_corpus_name)
 
         return {
             "status": "success",
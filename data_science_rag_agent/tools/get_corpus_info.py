@@ -1,25 +1,63 @@
 """
 Tool for retrieving detailed information about a specific RAG corpus.
-"""
-
-from google.adk.tools.tool_context import ToolContext
 
-from vertexai import rag
+Files are returned one page at a time, so large corpora never have to be held
+in memory or serialized into the model's context in full. The summary mode
+walks the listing page by page and keeps only counters.
+"""
 
-from .utils import check_corpus_exists, get_corpus_resource_name
+from typing import Any, Dict, List, Optional
 
+from google.adk.tools.tool_context import ToolContext
 
-def get_corpus_info(corpus_name: str, tool_context: ToolContext) -> dict:
+from ..backends import RagFileRecord, get_backend
+from ..config import LIST_FILES_PAGE_SIZE, LIST_TOOL_PAGE_SIZE
+from .corpus_registry import corpus_registry
+from .utils import (
+    check_corpus_exists,
+    check_fields,
+    clamp_page_size,
+    get_corpus_resource_name,
+    project,
+)
+
+FILE_FIELDS = (
+    "file_id",
+    "display_name",
+    "resource_id",
+    "source_uri",
+    "create_time",
+    "update_time",
+)
+
+
+def get_corpus_info(
+    corpus_name: str,
+    tool_context: ToolContext,
+    page_size: int = LIST_TOOL_PAGE_SIZE,
+    page_token: str = "",
+    fields: Optional[List[str]] = None,
+    summary_only: bool = False,
+) -> dict:
     """
-    Get detailed information about a specific RAG corpus including its files.
+    Get information about a specific RAG corpus and one page of its files.
 
     Args:
-         corpus_name (str): The full resoruce name of the corpus to get information about.
-                            Prefreable use the resource_name form the list_corpora results
-          tool_contex (ToolContext) : The tool context for state management
-
-        Returns:
-        Dict:Infomation about the corpus and its files
+         corpus_name (str): The full resource name of the corpus to get information about.
+                            Preferably use the resource_name from the list_corpus results
+         tool_context (ToolContext): The tool context for state management
+         page_size (int): The maximum number of files to return
+         page_token (str): The next_page_token of a previous call, to get the next page
+         fields (Optional[List[str]]): File fields to return, any of file_id, display_name,
+                            resource_id, source_uri, create_time and update_time; all if empty
+         summary_only (bool): Return only the file count and the newest update time
+                            instead of the files
+
+    Returns:
+        dict: Information about the corpus and a page of its files, with the
+              number of files on the page (page_file_count) and a
+              next_page_token that is empty on the last page. The total
+              file_count is only returned with summary_only
     """
 
     try:
@@ -31,74 +69,39 @@ def get_corpus_info(corpus_name: str, tool_context: ToolContext) -> dict:
                 "corpus_name": corpus_name,
             }
 
-        # Get corpus resource name
+        check_fields(fields, FILE_FIELDS)
 
+        # Get corpus resource name and, when known, its display name
         full_corpus_name = get_corpus_resource_name(corpus_name=corpus_name)
+        corpus = corpus_registry.get(full_corpus_name)
+        corpus_display_name = (corpus or {}).get("display_name") or corpus_name
 
-        corpus_display_name = corpus_name  # Default if we can't get actual display name
-
-        # Process file information
-
-        file_details = []
-
-        try:
-            # get the list of files in the corpus
-
-            files = rag.list_files(full_corpus_name)
-
-            for rag_file in files:
-                # getting document specific details
-
-                try:
-                    # extracting the file id from the name
-                    file_id = rag_file.name.split("/")[-1]
-
-                    file_info = {
-                        "file_id": file_id,
-                        "diplay_name": (
-                            rag_file.display_name
-                            if hasattr(rag_file, "display_name")
-                            else ""
-                        ),
-                        "resource_id": rag_file.google_drive_source.resource_ids[
-                            0
-                        ].resource_id,
-                        "soruce_uri": (
-                            rag_file.source_uri
-                            if hasattr(rag_file, "source_uri")
-                            else ""
-                        ),
-                        "create_time": (
-                            rag_file.create_time
-                            if hasattr(rag_file, "create_time")
-                            else ""
-                        ),
-                        "upate_time": (
-                            rag_file.update_time
-                            if hasattr(rag_file, "update_time")
-                            else ""
-                        ),
-                    }
-
-                    file_details.append(file_info)
-
-                except Exception:
-                    # continue to the next file
-                    continue
-
-        except Exception as e:
-            # continue without file details
-            pass
-
-            # Basic corpus info
+        if summary_only:
+            return {
+                "status": "success",
+                "message": f"Successfully summarized corpus '{corpus_display_name}'",
+                "corpus_name": corpus_name,
+                "corpus_display_name": corpus_display_name,
+                **_summarize_files(full_corpus_name),
+            }
 
+        # Fetch a single page of the file listing
+        page = get_backend().list_files_page(
+            full_corpus_name, clamp_page_size(page_size), page_token
+        )
+        files = [project(_file_info(rag_file), fields) for rag_file in page.files]
+
+        message = f"Successfully retrieved {len(files)} file(s) of corpus '{corpus_display_name}'"
+        if page.next_page_token:
+            message += "; pass next_page_token as page_token to get more"
         return {
             "status": "success",
-            "message": f"Successfully retrieved information for corpus '{corpus_display_name}'",
+            "message": message,
             "corpus_name": corpus_name,
             "corpus_display_name": corpus_display_name,
-            "file_count": len(file_details),
-            "files": file_details,
+            "page_file_count": len(files),
+            "files": files,
+            "next_page_token": page.next_page_token,
         }
 
     except Exception as e:
@@ -108,3 +111,25 @@ def get_corpus_info(corpus_name: str, tool_context: ToolContext) -> dict:
             "message": f"Error getting corpus information: {str(e)}",
             "corpus_name": corpus_name,
         }
+
+
+def _file_info(rag_file: RagFileRecord) -> Dict[str, Any]:
+    return {
+        # extracting the file id from the name
+        "file_id": rag_file.name.split("/")[-1],
+        "display_name": rag_file.display_name,
+        "resource_id": rag_file.resource_id,
+        "source_uri": rag_file.source_uri,
+        "create_time": rag_file.create_time,
+        "update_time": rag_file.update_time,
+    }
+
+
+def _summarize_files(full_corpus_name: str) -> Dict[str, Any]:
+    # list_files streams page by page, so only the counters stay in memory
+    file_count = 0
+    newest_update_time = ""
+    for rag_file in get_backend().list_files(full_corpus_name, page_size=LIST_FILES_PAGE_SIZE):
+        file_count += 1
+        newest_update_time = max(newest_update_time, rag_file.update_time or "")
+    return {"file_count": file_count, "newest_update_time": newest_update_time}
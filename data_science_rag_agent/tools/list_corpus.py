@@ -2,52 +2,80 @@
 Tool for listing all available Vertex AI RAG corpora.
 """
 
-from typing import Dict, List, Union
-from vertexai import rag
+from typing import Dict, List, Optional
 
+from ..config import LIST_TOOL_PAGE_SIZE
+from .corpus_registry import corpus_registry
+from .utils import check_fields, clamp_page_size, project
 
-def list_corpus() -> dict:
+CORPUS_FIELDS = ("resource_name", "display_name", "create_time", "update_time")
+
+
+def list_corpus(
+    page_size: int = LIST_TOOL_PAGE_SIZE,
+    page_token: str = "",
+    fields: Optional[List[str]] = None,
+    summary_only: bool = False,
+) -> dict:
     """
-    List all available Vertex AI RAG corpora.
+    List the available Vertex AI RAG corpora, one page at a time.
+
+    Args:
+        page_size (int): The maximum number of corpora to return
+        page_token (str): The next_page_token of a previous call, to get the next page
+        fields (Optional[List[str]]): Corpus fields to return, any of resource_name,
+                            display_name, create_time and update_time; all if empty
+        summary_only (bool): Return only the corpus count and the newest update time
 
     Returns:
 
-     dict: A list of available corpora and status, with each corpus containing:
+     dict: A page of available corpora and status, with each corpus containing:
            - resource_name: The full resource name to use with other tools
            - display_name: The human-readable name of the corpus
            - create_time: When the corpus was created
            - update_time: When the corpus was last updated
+           and a next_page_token that is empty on the last page
     """
 
     try:
+        check_fields(fields, CORPUS_FIELDS)
+        try:
+            offset = int(page_token or 0)
+        except ValueError:
+            offset = -1
+        if offset < 0:
+            raise ValueError(f"Invalid page token '{page_token}'")
 
-        # Get the list of corpora
-
-        all_corpus = rag.list_corpora()
-
-        # Process corpus information into a more usable format
-
-        corpus_info: List[Dict[str, Union[str, int]]] = []
-
-        for corpus in all_corpus:
-            corpus_data: Dict[str, Union[str, int]] = {
-                "resource_name": corpus.name,
-                "display_name": corpus.display_name,
-                "create_time": (
-                    str(corpus.create_time) if hasattr(corpus, "create_time") else ""
-                ),
-                "update_time": (
-                    str(corpus.update_time) if hasattr(corpus, "update_time") else ""
-                ),
-            }
-
-            corpus_info.append(corpus_data)
+        # The first page gets a fresh list of corpora, which also re-populates the
+        # shared registry; later pages page through that same registry snapshot
+        corpus_info: List[Dict[str, str]] = (
+            corpus_registry.corpora() if page_token else corpus_registry.refresh()
+        )
 
+        if summary_only:
             return {
                 "status": "success",
                 "message": f"Found {len(corpus_info)} available corpora",
-                "corpora": corpus_info,
+                "corpus_count": len(corpus_info),
+                "newest_update_time": max(
+                    (corpus["update_time"] or "" for corpus in corpus_info), default=""
+                ),
             }
+
+        page_size = clamp_page_size(page_size)
+        corpora = [
+            project(corpus, fields) for corpus in corpus_info[offset : offset + page_size]
+        ]
+        next_page_token = (
+            str(offset + page_size) if offset + page_size < len(corpus_info) else ""
+        )
+
+        return {
+            "status": "success",
+            "message": f"Found {len(corpus_info)} available corpora; returning {len(corpora)}",
+            "corpora": corpora,
+            "next_page_token": next_page_token,
+        }
     except Exception as e:
         return {
             "status": "error",
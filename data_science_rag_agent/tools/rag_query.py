@@ -1,15 +1,59 @@
 """
-Tool for querying Vertex AI RAG corpora and retrieving relevant information.
+Tool for querying RAG corpora and retrieving relevant information.
 """
 
+import contextvars
 import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Tuple
+
 from google.adk.tools.tool_context import ToolContext
-from vertexai import rag
-from ..config import DEFAULT_DISTANCE_THRESHOLD, DEFAULT_TOP_K
+from ..backends import get_backend
+from ..backends.resilient import request_deadline
+from ..config import (
+    DEFAULT_DISTANCE_THRESHOLD,
+    DEFAULT_TOP_K,
+    RAG_FANOUT_DEADLINE_SECONDS,
+    RAG_FANOUT_DUPLICATE_SIMILARITY,
+    RAG_FANOUT_MAX_WORKERS,
+    RAG_HYBRID_CANDIDATES,
+    RAG_RERANK_CANDIDATES,
+    RAG_RERANK_ENABLED,
+    RAG_RETRIEVAL_MODE,
+)
+from ..single_flight import SingleFlight
+from ..telemetry import record, span
+from .rerank import reciprocal_rank_fusion, rerank
+from .retrieval_cache import retrieval_cache
+from .semantic_cache import semantic_cache
 from .utils import check_corpus_exists, get_corpus_resource_name
 
+logger = logging.getLogger(__name__)
+
+# Shared pool for querying several corpora at once
+_fanout_executor = ThreadPoolExecutor(
+    max_workers=RAG_FANOUT_MAX_WORKERS, thread_name_prefix="rag-fanout"
+)
+
+# Runs the lexical half of hybrid retrieval; separate from the fan-out pool,
+# whose workers wait on it
+_lexical_executor = ThreadPoolExecutor(
+    max_workers=RAG_FANOUT_MAX_WORKERS, thread_name_prefix="rag-lexical"
+)
+
+# Concurrent cache misses for the same retrieval share one backend call
+_retrieval_flight = SingleFlight("rag_query.retrieve")
 
-def rag_query(corpus_name: str, query: str, tool_context: ToolContext) -> dict:
+
+def rag_query(
+    corpus_name: str,
+    query: str,
+    tool_context: ToolContext,
+    additional_corpora: Optional[List[str]] = None,
+) -> dict:
     """
     Query a Vertex AI RAG corpus with user questions and retrieve relevant information.
 
@@ -18,98 +62,419 @@ def rag_query(corpus_name: str, query: str, tool_context: ToolContext) -> dict:
                            Preferably use the resource_name from list_corpus results.
         query (str): The text query to search for in the corpus.
         tool_context (ToolContext): The tool context.
+        additional_corpora (Optional[List[str]]): Other corpora to query in parallel.
+                           Their results are merged by score into one top-k list.
 
     Returns:
         dict: The query results and status.
     """
 
     try:
-        corpus_name
-        print("\n========== 🔍 Starting RAG Query ==========")
-        print(f"📂 Corpus Name: {corpus_name}")
-        print(f"💬 Query: {query}")
-
-        # --- Check if corpus exists ---
-        print("🔍 Checking if corpus exists...")
-        if not check_corpus_exists(corpus_name=corpus_name, tool_context=tool_context):
-            print(f"❌ Corpus '{corpus_name}' not found.")
-            return {
-                "status": "error",
-                "message": f"Corpus '{corpus_name}' does not exist. Please create it first using the create_corpus tool.",
-                "query": query,
-                "corpus_name": corpus_name,
-            }
-        print(f"✅ Corpus '{corpus_name}' found.")
-
-        # --- Get the full corpus resource name ---
-        full_corpus_name = get_corpus_resource_name(corpus_name=corpus_name)
-        print(f"📌 Full Corpus Resource Name: {full_corpus_name}")
-
-        # --- Configure retrieval parameters ---
-        print("⚙️ Configuring retrieval parameters...")
-        rag_retrieval_config = rag.RagRetrievalConfig(
-            top_k=DEFAULT_TOP_K,
-            filter=rag.Filter(vector_distance_threshold=DEFAULT_DISTANCE_THRESHOLD),
-        )
-        print(
-            f"🔧 Retrieval Config: Top K = {DEFAULT_TOP_K}, Distance Threshold = {DEFAULT_DISTANCE_THRESHOLD}"
-        )
+        with span("rag_query", corpus=corpus_name) as query_span:
+            logger.debug("RAG query on corpus %s: %s", corpus_name, query)
 
-        # --- Perform the query ---
-        print("🚀 Performing retrieval query...")
-        response = rag.retrieval_query(
-            rag_resources=[rag.RagResource(rag_corpus=full_corpus_name)],
-            text=query,
-            rag_retrieval_config=rag_retrieval_config,
-        )
-        print("📨 Query executed successfully. Processing results...")
-
-        # --- Process the response into a usable format ---
-        results = []
-        if hasattr(response, "contexts") and response.contexts:
-            for context_group in response.contexts.contexts:
-                result = {
-                    "source_uri": getattr(context_group, "source_uri", ""),
-                    "source_name": getattr(context_group, "source_display_name", ""),
-                    "text": getattr(context_group, "text", ""),
-                    "score": getattr(context_group, "score", 0.0),
+            # --- Fan out when several corpora are requested ---
+            corpus_names = list(dict.fromkeys([corpus_name, *(additional_corpora or [])]))
+            if len(corpus_names) > 1:
+                query_span.set_attribute("corpora", len(corpus_names))
+                return _rag_query_multi(corpus_names, query, tool_context)
+
+            # --- Check if corpus exists ---
+            with span("rag_query.check_exists"):
+                exists = check_corpus_exists(
+                    corpus_name=corpus_name, tool_context=tool_context
+                )
+            if not exists:
+                logger.debug("Corpus %s not found", corpus_name)
+                query_span.set_attribute("status", "error")
+                return {
+                    "status": "error",
+                    "message": f"Corpus '{corpus_name}' does not exist. Please create it first using the create_corpus tool.",
+                    "query": query,
+                    "corpus_name": corpus_name,
                 }
-                results.append(result)
 
-        # --- Handle empty results ---
-        if not results:
-            print(
-                f"⚠️ No relevant results found in corpus '{corpus_name}' for query '{query}'."
-            )
-            return {
-                "status": "warning",
-                "message": f"No results found in corpus '{corpus_name}' for query: '{query}'",
-                "query": query,
-                "corpus_name": corpus_name,
-                "results": [],
-                "results_count": 0,
-            }
-
-        # --- Return successful results ---
-        print(f"🎉 Query successful! Retrieved {len(results)} result(s).")
-        print("=========================================================\n")
-        return {
-            "status": "success",
-            "message": f"Successfully queried corpus '{corpus_name}'",
-            "query": query,
-            "corpus_name": corpus_name,
-            "results": results,
-            "results_count": len(results),
-        }
+            # --- Get the full corpus resource name ---
+            with span("rag_query.resolve_corpus"):
+                full_corpus_name = get_corpus_resource_name(corpus_name=corpus_name)
+
+            # --- Retrieve, serving repeated questions from the caches ---
+            with span("rag_query.retrieve"):
+                results = _retrieve_cached(full_corpus_name, query)
+
+            # --- Build the response ---
+            with span("rag_query.format"):
+                response = _query_response(corpus_name, query, results)
+            record("rag_query.results", len(results))
+            query_span.set_attribute("status", response["status"])
+            query_span.set_attribute("results", len(results))
+            logger.debug("RAG query on %s returned %d result(s)", corpus_name, len(results))
+            return response
 
     except Exception as e:
         error_msg = f"❌ ERROR: Failed to query corpus '{corpus_name}' | {str(e)}"
-        logging.error(error_msg)
-        print(error_msg)
-        print("=========================================================\n")
+        logger.error(error_msg)
         return {
             "status": "error",
             "message": error_msg,
             "query": query,
             "corpus_name": corpus_name,
         }
+
+
+def _query_response(
+    corpus_name: str, query: str, results: List[Dict[str, Any]]
+) -> dict:
+    """
+    Build the rag_query response for a single corpus.
+    """
+    if not results:
+        return {
+            "status": "warning",
+            "message": f"No results found in corpus '{corpus_name}' for query: '{query}'",
+            "query": query,
+            "corpus_name": corpus_name,
+            "results": [],
+            "results_count": 0,
+        }
+
+    return {
+        "status": "success",
+        "message": f"Successfully queried corpus '{corpus_name}'",
+        "query": query,
+        "corpus_name": corpus_name,
+        "results": results,
+        "results_count": len(results),
+    }
+
+
+def _rag_query_multi(
+    corpus_names: List[str], query: str, tool_context: ToolContext
+) -> dict:
+    """
+    Query several corpora concurrently and merge their contexts into one top-k.
+
+    Corpora that do not answer within ``RAG_FANOUT_DEADLINE_SECONDS`` are
+    reported as timed out and left out of the merge, so the total latency is
+    bounded by the deadline rather than the sum of all corpora. The deadline
+    also bounds the backend calls themselves, so a hung retrieval gives its
+    fan-out worker back instead of holding it until the RPC returns.
+    """
+    per_corpus: Dict[str, Dict[str, Any]] = {}
+    resolved: Dict[str, str] = {}
+    for name in corpus_names:
+        with span("rag_query.check_exists"):
+            exists = check_corpus_exists(corpus_name=name, tool_context=tool_context)
+        if exists:
+            with span("rag_query.resolve_corpus"):
+                resolved[name] = get_corpus_resource_name(corpus_name=name)
+        else:
+            per_corpus[name] = _corpus_status(name, "error", "Corpus does not exist")
+
+    if not resolved:
+        return {
+            "status": "error",
+            "message": f"None of the corpora {corpus_names} exist. Please create them first using the create_corpus tool.",
+            "query": query,
+            "corpus_name": corpus_names[0],
+            "corpora": [per_corpus[name] for name in corpus_names],
+        }
+
+    logger.debug("Querying %d corpora in parallel", len(resolved))
+    # Each retrieval runs in a copy of this context, so its spans nest under
+    # the caller's span instead of becoming new root traces, and its backend
+    # calls inherit the request deadline
+    with request_deadline(RAG_FANOUT_DEADLINE_SECONDS):
+        futures = {
+            _fanout_executor.submit(
+                contextvars.copy_context().run, _timed_retrieve, full_corpus_name, query
+            ): name
+            for name, full_corpus_name in resolved.items()
+        }
+    _, pending = wait(futures, timeout=RAG_FANOUT_DEADLINE_SECONDS)
+
+    merged = []
+    for future, name in futures.items():
+        if future in pending:
+            # Only stops retrievals still queued; running ones end at the deadline
+            future.cancel()
+            per_corpus[name] = _corpus_status(
+                name, "timeout", f"No answer within {RAG_FANOUT_DEADLINE_SECONDS}s"
+            )
+            continue
+        try:
+            results, latency_ms = future.result()
+        except Exception as e:
+            per_corpus[name] = _corpus_status(name, "error", str(e))
+            continue
+        merged.extend({**result, "corpus_name": name} for result in results)
+        per_corpus[name] = _corpus_status(
+            name, "success", results_count=len(results), latency_ms=latency_ms
+        )
+
+    with span("rag_query.format"):
+        results = _merge_results(merged, DEFAULT_TOP_K)
+    corpora = [per_corpus[name] for name in corpus_names]
+    record("rag_query.results", len(results))
+    logger.debug("Multi-corpus query returned %d merged result(s)", len(results))
+
+    if not results:
+        return {
+            "status": "warning",
+            "message": f"No results found in corpora {corpus_names} for query: '{query}'",
+            "query": query,
+            "corpus_name": corpus_names[0],
+            "corpora": corpora,
+            "results": [],
+            "results_count": 0,
+        }
+
+    return {
+        "status": "success",
+        "message": f"Successfully queried {len(resolved)} corpora",
+        "query": query,
+        "corpus_name": corpus_names[0],
+        "corpora": corpora,
+        "results": results,
+        "results_count": len(results),
+    }
+
+
+def _corpus_status(
+    corpus_name: str,
+    status: str,
+    message: str = "",
+    results_count: int = 0,
+    latency_ms: float = 0.0,
+) -> Dict[str, Any]:
+    return {
+        "corpus_name": corpus_name,
+        "status": status,
+        "message": message,
+        "results_count": results_count,
+        "latency_ms": round(latency_ms, 2),
+    }
+
+
+def _timed_retrieve(
+    full_corpus_name: str, query: str
+) -> Tuple[List[Dict[str, Any]], float]:
+    with span("rag_query.retrieve", corpus=full_corpus_name) as retrieve_span:
+        start = time.perf_counter()
+        results = _retrieve_cached(full_corpus_name, query)
+        latency_ms = (time.perf_counter() - start) * 1000
+        retrieve_span.set_attribute("results", len(results))
+    return results, latency_ms
+
+
+def _merge_results(results: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+    """
+    Keep the ``top_k`` best contexts, dropping near-duplicate chunk texts.
+
+    Scores are vector distances, so lower is better, except for hybrid results,
+    which carry their ``distance`` separately and a fused score, higher is better.
+    """
+    merged: List[Dict[str, Any]] = []
+    seen: List[set] = []
+    for result in sorted(results, key=_rank_key):
+        shingles = _shingles(result.get("text", ""))
+        if any(
+            _jaccard(shingles, other) >= RAG_FANOUT_DUPLICATE_SIMILARITY
+            for other in seen
+        ):
+            continue
+        merged.append(result)
+        seen.append(shingles)
+        if len(merged) == top_k:
+            break
+    return merged
+
+
+def _rank_key(result: Dict[str, Any]) -> float:
+    if "distance" in result:
+        return -result.get("score", 0.0)
+    return result.get("score", 0.0)
+
+
+def _shingles(text: str, size: int = 3) -> set:
+    words = re.findall(r"\w+", text.casefold())
+    if len(words) < size:
+        return {" ".join(words)}
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+def _jaccard(a: set, b: set) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def _retrieve_cached(full_corpus_name: str, query: str) -> List[Dict[str, Any]]:
+    """
+    Retrieve contexts for a query, serving repeated questions from the caches.
+
+    Concurrent misses for the same cache key are coalesced into one retrieval.
+    """
+    results = retrieval_cache.get(
+        full_corpus_name, query, DEFAULT_TOP_K, DEFAULT_DISTANCE_THRESHOLD
+    )
+    if results is not None:
+        record("rag_query.cache_hits", 1, cache="retrieval")
+        logger.debug("Retrieval cache hit for %s", full_corpus_name)
+        return results
+
+    key = retrieval_cache.make_key(
+        full_corpus_name, query, DEFAULT_TOP_K, DEFAULT_DISTANCE_THRESHOLD
+    )
+    return _retrieval_flight.do(key, lambda: _retrieve_uncached(full_corpus_name, query))
+
+
+def _retrieve_uncached(full_corpus_name: str, query: str) -> List[Dict[str, Any]]:
+    # Read before retrieving: results of a corpus invalidated meanwhile are not cached
+    generation = retrieval_cache.generation(full_corpus_name)
+    results = _retrieve_semantic_cached(full_corpus_name, query)
+    retrieval_cache.put(
+        full_corpus_name,
+        query,
+        DEFAULT_TOP_K,
+        DEFAULT_DISTANCE_THRESHOLD,
+        results,
+        generation=generation,
+    )
+    return results
+
+
+def _retrieve_semantic_cached(
+    full_corpus_name: str, query: str
+) -> List[Dict[str, Any]]:
+    """
+    Serve paraphrases of earlier questions from the semantic cache, otherwise retrieve.
+    """
+    if not semantic_cache.enabled:
+        return _retrieve(full_corpus_name, query)
+
+    generation = semantic_cache.generation(full_corpus_name)
+    embedding = semantic_cache.embed(query)
+    results = semantic_cache.lookup(
+        full_corpus_name,
+        query,
+        DEFAULT_TOP_K,
+        DEFAULT_DISTANCE_THRESHOLD,
+        embedding=embedding,
+    )
+    if results is not None:
+        record("rag_query.cache_hits", 1, cache="semantic")
+        logger.debug("Semantic cache hit for %s", full_corpus_name)
+        return results
+
+    results = _retrieve(full_corpus_name, query)
+    semantic_cache.add(
+        full_corpus_name,
+        query,
+        DEFAULT_TOP_K,
+        DEFAULT_DISTANCE_THRESHOLD,
+        results,
+        embedding=embedding,
+        generation=generation,
+    )
+    return results
+
+
+def _retrieve(full_corpus_name: str, query: str) -> List[Dict[str, Any]]:
+    """
+    Run a retrieval query against the RAG backend and flatten the returned contexts.
+
+    In hybrid mode, BM25 keyword search runs alongside vector search and the two
+    rankings are fused. With reranking enabled, ``RAG_RERANK_CANDIDATES``
+    contexts are fetched and reranked down to ``DEFAULT_TOP_K``.
+    """
+    backend = get_backend()
+    top_k = max(RAG_RERANK_CANDIDATES, DEFAULT_TOP_K) if RAG_RERANK_ENABLED else DEFAULT_TOP_K
+    hybrid = RAG_RETRIEVAL_MODE == "hybrid"
+    if hybrid and not backend.supports_lexical:
+        logger.debug("Hybrid retrieval needs a lexical index; using vector search only")
+        hybrid = False
+    if hybrid:
+        top_k = max(top_k, RAG_HYBRID_CANDIDATES)
+        lexical_future = _lexical_executor.submit(
+            contextvars.copy_context().run,
+            _lexical_search,
+            backend,
+            full_corpus_name,
+            query,
+            top_k,
+        )
+
+    # --- Perform the query ---
+    with span("rag_query.vector_search", top_k=top_k) as search_span:
+        contexts = backend.retrieval_query(
+            corpus_names=[full_corpus_name],
+            text=query,
+            top_k=top_k,
+            distance_threshold=DEFAULT_DISTANCE_THRESHOLD,
+        )
+        search_span.set_attribute("results", len(contexts))
+
+    # --- Process the response into a usable format ---
+    results = [asdict(context) for context in contexts]
+
+    # --- Fuse keyword and vector rankings ---
+    if hybrid:
+        results = _fuse_hybrid(results, lexical_future.result(), DEFAULT_DISTANCE_THRESHOLD)
+        record("rag_query.hybrid_candidates", len(results))
+
+    # --- Rerank the overfetched candidates ---
+    if RAG_RERANK_ENABLED:
+        with span("rag_query.rerank", candidates=len(results)):
+            results, _ = rerank(query, results, DEFAULT_TOP_K)
+    return results[:DEFAULT_TOP_K]
+
+
+def _lexical_search(
+    backend, full_corpus_name: str, query: str, top_k: int
+) -> List[Dict[str, Any]]:
+    # Runs in a copy of the caller's context, so the span nests under the
+    # retrieval alongside the vector search
+    with span("rag_query.lexical_search", top_k=top_k) as search_span:
+        contexts = backend.lexical_query([full_corpus_name], query, top_k)
+        search_span.set_attribute("results", len(contexts))
+    return [asdict(context) for context in contexts]
+
+
+def _fuse_hybrid(
+    vector_results: List[Dict[str, Any]],
+    lexical_results: List[Dict[str, Any]],
+    distance_threshold: float,
+) -> List[Dict[str, Any]]:
+    """
+    Merge vector and keyword results by reciprocal rank; chunks found by both rise.
+
+    Keyword hits farther than ``distance_threshold`` from the query are dropped
+    like vector hits are. Each fused result's ``score`` is its fused score,
+    higher is better, and ``distance`` keeps its vector distance.
+    """
+    lexical_results = [
+        result for result in lexical_results if result.get("score", 0.0) <= distance_threshold
+    ]
+    candidates: List[Dict[str, Any]] = []
+    positions: Dict[Tuple[str, str], int] = {}
+    rankings: List[List[int]] = []
+    for results in (vector_results, lexical_results):
+        ranking = []
+        for result in results:
+            key = (result.get("source_uri", ""), result.get("text", ""))
+            if key not in positions:
+                positions[key] = len(candidates)
+                candidates.append(result)
+            ranking.append(positions[key])
+        rankings.append(ranking)
+
+    fused = reciprocal_rank_fusion(rankings)
+    return [
+        {
+            **candidates[i],
+            "score": round(fused[i], 6),
+            "distance": candidates[i].get("score", 0.0),
+        }
+        for i in sorted(fused, key=lambda i: -fused[i])
+    ]
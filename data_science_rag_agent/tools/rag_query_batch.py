@@ -0,0 +1,207 @@
+"""
+Batch querying of a RAG corpus for offline evaluation and cache warming.
+
+Unlike the agent tools, these entry points are called from scripts and jobs.
+They run many questions against one corpus with bounded concurrency and a rate
+limit, and stream back one ``rag_query``-shaped response per question as soon
+as it is ready. Each batch runs on its own ``max_concurrency``-thread pool, so
+a large batch cannot take the worker threads the agent tools share.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional
+
+from ..config import RAG_BATCH_MAX_CONCURRENCY, RAG_BATCH_REQUESTS_PER_SECOND
+from ..rate_limit import TokenBucket
+from .corpus_registry import corpus_registry
+from .rag_query import _query_response, _retrieve_cached
+from .retrieval_cache import normalize_query
+from .utils import get_corpus_resource_name
+
+logger = logging.getLogger(__name__)
+
+
+def rag_query_batch(
+    corpus_name: str,
+    queries: Iterable[str],
+    max_concurrency: int = RAG_BATCH_MAX_CONCURRENCY,
+    requests_per_second: float = RAG_BATCH_REQUESTS_PER_SECOND,
+) -> Iterator[dict]:
+    """
+    Run many queries against a corpus and yield each response as it finishes.
+
+    Identical queries (after normalization) are retrieved once and answered
+    for every occurrence. Responses arrive in completion order, not input order;
+    each one carries its ``query``.
+
+    Args:
+        corpus_name (str): The name or resource name of the corpus to query
+        queries (Iterable[str]): The questions to run
+        max_concurrency (int): Maximum number of retrievals in flight
+        requests_per_second (float): Retrieval rate limit; 0 disables limiting
+
+    Yields:
+        dict: A response with the same shape as ``rag_query``'s
+    """
+    groups = _group_queries(queries)
+    full_corpus_name = _resolve_corpus(corpus_name)
+    if full_corpus_name is None:
+        for originals in groups.values():
+            for query in originals:
+                yield _missing_corpus_response(corpus_name, query)
+        return
+
+    limiter = TokenBucket(requests_per_second)
+    pending_queries = iter(groups)
+    in_flight = {}
+
+    with ThreadPoolExecutor(
+        max_workers=max_concurrency, thread_name_prefix="rag-batch"
+    ) as executor:
+        # Only keep max_concurrency retrievals submitted so memory stays bounded
+        for key in pending_queries:
+            in_flight[
+                executor.submit(
+                    contextvars.copy_context().run,
+                    _run_query,
+                    limiter,
+                    corpus_name,
+                    full_corpus_name,
+                    groups[key][0],
+                )
+            ] = key
+            if len(in_flight) >= max_concurrency:
+                break
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = in_flight.pop(future)
+                yield from _fan_out(future.result(), groups[key])
+
+                next_key = next(pending_queries, None)
+                if next_key is not None:
+                    in_flight[
+                        executor.submit(
+                            contextvars.copy_context().run,
+                            _run_query,
+                            limiter,
+                            corpus_name,
+                            full_corpus_name,
+                            groups[next_key][0],
+                        )
+                    ] = next_key
+
+
+async def arag_query_batch(
+    corpus_name: str,
+    queries: Iterable[str],
+    max_concurrency: int = RAG_BATCH_MAX_CONCURRENCY,
+    requests_per_second: float = RAG_BATCH_REQUESTS_PER_SECOND,
+) -> AsyncIterator[dict]:
+    """
+    Async iterator version of ``rag_query_batch`` for use inside an event loop.
+
+    Args:
+        corpus_name (str): The name or resource name of the corpus to query
+        queries (Iterable[str]): The questions to run
+        max_concurrency (int): Maximum number of retrievals in flight
+        requests_per_second (float): Retrieval rate limit; 0 disables limiting
+
+    Yields:
+        dict: A response with the same shape as ``rag_query``'s
+    """
+    groups = _group_queries(queries)
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="rag-batch")
+
+    def run_blocking(func, *args):
+        # Carry context variables (e.g. tracing state) over to the worker thread
+        return loop.run_in_executor(
+            executor, functools.partial(contextvars.copy_context().run, func, *args)
+        )
+
+    tasks = []
+    try:
+        full_corpus_name = await run_blocking(_resolve_corpus, corpus_name)
+        if full_corpus_name is None:
+            for originals in groups.values():
+                for query in originals:
+                    yield _missing_corpus_response(corpus_name, query)
+            return
+
+        limiter = TokenBucket(requests_per_second)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(key: str):
+            async with semaphore:
+                await limiter.acquire_async()
+                response = await run_blocking(
+                    _run_query, None, corpus_name, full_corpus_name, groups[key][0]
+                )
+                return key, response
+
+        tasks = [asyncio.ensure_future(run(key)) for key in groups]
+        for next_done in asyncio.as_completed(tasks):
+            key, response = await next_done
+            for item in _fan_out(response, groups[key]):
+                yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Queued retrievals of an abandoned batch are dropped, running ones finish
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _group_queries(queries: Iterable[str]) -> Dict[str, List[str]]:
+    groups: Dict[str, List[str]] = {}
+    for query in queries:
+        groups.setdefault(normalize_query(query), []).append(query)
+    return groups
+
+
+def _resolve_corpus(corpus_name: str) -> Optional[str]:
+    full_corpus_name = get_corpus_resource_name(corpus_name=corpus_name)
+    if corpus_registry.exists(corpus_name, resource_name=full_corpus_name):
+        return full_corpus_name
+    return None
+
+
+def _run_query(
+    limiter: Optional[TokenBucket],
+    corpus_name: str,
+    full_corpus_name: str,
+    query: str,
+) -> dict:
+    if limiter is not None:
+        limiter.acquire()
+    try:
+        results = _retrieve_cached(full_corpus_name, query)
+        return _query_response(corpus_name, query, results)
+    except Exception as e:
+        logger.warning("Batch query failed for '%s': %s", query, e)
+        return {
+            "status": "error",
+            "message": f"Failed to query corpus '{corpus_name}' | {str(e)}",
+            "query": query,
+            "corpus_name": corpus_name,
+        }
+
+
+def _fan_out(response: dict, originals: List[str]) -> Iterator[dict]:
+    # Answer every duplicate of the query with its own copy of the response
+    for query in originals:
+        yield {**response, "query": query}
+
+
+def _missing_corpus_response(corpus_name: str, query: str) -> dict:
+    return {
+        "status": "error",
+        "message": f"Corpus '{corpus_name}' does not exist. Please create it first using the create_corpus tool.",
+        "query": query,
+        "corpus_name": corpus_name,
+    }
@@ -0,0 +1,175 @@
+"""
+Rerank stage applied after retrieval.
+
+With reranking enabled, ``rag_query`` overfetches ``RAG_RERANK_CANDIDATES``
+contexts, rescores them with a reranker and fuses that ranking with the vector
+ranking before keeping the top-k. The default reranker is in-process BM25; any
+callable taking ``(query, texts)`` and returning one relevance score per text
+(for example a cross-encoder) can be plugged in with ``set_reranker``.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..config import RAG_RERANK_FUSION, RAG_RERANK_RRF_K, RAG_RERANK_WEIGHT
+from ..lexical import bm25_scores
+
+# (query, candidate texts) -> relevance scores, higher is better
+Reranker = Callable[[str, List[str]], Sequence[float]]
+
+
+class BM25Reranker:
+    """
+    Lexical reranker scoring candidates with BM25 over the candidate set.
+    """
+
+    def __call__(self, query: str, texts: List[str]) -> List[float]:
+        return bm25_scores(query, texts)
+
+
+class CrossEncoderReranker:
+    """
+    Adapter for pair scorers such as cross-encoders.
+
+    Args:
+        score_pairs (Callable[[List[Tuple[str, str]]], Sequence[float]]): Scores a
+            batch of (query, text) pairs, e.g. ``CrossEncoder(...).predict``
+    """
+
+    def __init__(self, score_pairs: Callable[[List[Tuple[str, str]]], Sequence[float]]):
+        self.score_pairs = score_pairs
+
+    def __call__(self, query: str, texts: List[str]) -> List[float]:
+        return [float(score) for score in self.score_pairs([(query, text) for text in texts])]
+
+
+def reciprocal_rank_fusion(rankings: List[List[int]], k: float = RAG_RERANK_RRF_K) -> Dict[int, float]:
+    """
+    Fuse several rankings of the same items by reciprocal rank.
+
+    Args:
+        rankings (List[List[int]]): Item indices, best first, one list per ranker
+        k (float): Damping constant; larger values flatten the rank weights
+
+    Returns:
+        Dict[int, float]: Fused score per item index; higher is better
+    """
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking):
+            fused[item] = fused.get(item, 0.0) + 1.0 / (k + rank + 1)
+    return fused
+
+
+def weighted_fusion(
+    first: Sequence[float], second: Sequence[float], weight: float
+) -> List[float]:
+    """
+    Blend two score lists after min-max normalizing each.
+
+    Args:
+        first (Sequence[float]): Scores from the first ranker, higher is better
+        second (Sequence[float]): Scores from the second ranker, higher is better
+        weight (float): Share of the second ranker in the result, 0 to 1
+
+    Returns:
+        List[float]: Fused scores
+    """
+    return [
+        (1.0 - weight) * a + weight * b
+        for a, b in zip(_min_max(first), _min_max(second))
+    ]
+
+
+def rerank(
+    query: str,
+    results: List[Dict[str, Any]],
+    top_k: int,
+    reranker: Optional[Reranker] = None,
+    fusion: str = RAG_RERANK_FUSION,
+    weight: float = RAG_RERANK_WEIGHT,
+) -> Tuple[List[Dict[str, Any]], float]:
+    """
+    Rescore retrieved contexts and keep the best ``top_k``.
+
+    Args:
+        query (str): The query text
+        results (List[Dict[str, Any]]): Retrieved contexts, best first, with a
+            distance ``score`` or, after hybrid fusion, a ``distance``
+        top_k (int): Number of contexts to keep
+        reranker (Optional[Reranker]): Scorer to use instead of the configured one
+        fusion (str): "rrf" for reciprocal-rank fusion or "weighted" for score blending
+        weight (float): Share of the reranker score with weighted fusion
+
+    Returns:
+        Tuple[List[Dict[str, Any]], float]: The kept contexts, each with its
+            ``rerank_score``, and the reranking time in milliseconds
+    """
+    if not results:
+        return [], 0.0
+
+    started = time.perf_counter()
+    texts = [result.get("text", "") for result in results]
+    rerank_scores = [float(score) for score in (reranker or get_reranker())(query, texts)]
+
+    if fusion == "weighted":
+        similarities = [
+            1.0 - result.get("distance", result.get("score", 0.0)) for result in results
+        ]
+        fused = dict(enumerate(weighted_fusion(similarities, rerank_scores, weight)))
+    elif fusion == "rrf":
+        # The retrieval order is the first ranking, vector or hybrid alike
+        retrieval_ranking = list(range(len(results)))
+        rerank_ranking = sorted(range(len(results)), key=lambda i: -rerank_scores[i])
+        fused = reciprocal_rank_fusion([retrieval_ranking, rerank_ranking])
+    else:
+        raise ValueError(f"Unknown fusion '{fusion}'; expected 'rrf' or 'weighted'")
+
+    order = sorted(fused, key=lambda i: -fused[i])[:top_k]
+    reranked = [
+        {**results[i], "rerank_score": round(rerank_scores[i], 6)} for i in order
+    ]
+    return reranked, (time.perf_counter() - started) * 1000
+
+
+def _min_max(scores: Sequence[float]) -> List[float]:
+    if not scores:
+        return []
+    low, high = min(scores), max(scores)
+    if high == low:
+        return [0.0] * len(scores)
+    return [(score - low) / (high - low) for score in scores]
+
+
+_reranker: Optional[Reranker] = None
+_reranker_lock = threading.Lock()
+
+
+def get_reranker() -> Reranker:
+    """
+    Get the reranker used by ``rag_query``; BM25 unless another one was set.
+
+    Returns:
+        Reranker: The process-wide reranker
+    """
+    global _reranker
+
+    if _reranker is None:
+        with _reranker_lock:
+            if _reranker is None:
+                _reranker = BM25Reranker()
+    return _reranker
+
+
+def set_reranker(reranker: Optional[Reranker]) -> None:
+    """
+    Replace the reranker used by ``rag_query``, e.g. with a ``CrossEncoderReranker``.
+
+    Args:
+        reranker (Optional[Reranker]): The reranker; None restores BM25
+    """
+    global _reranker
+
+    with _reranker_lock:
+        _reranker = reranker
@@ -0,0 +1,335 @@
+"""
+Result cache for RAG retrieval queries.
+
+Entries are keyed on (corpus resource name, normalized query text, top_k,
+distance threshold) and held in a bounded in-process LRU with a TTL. An optional
+SQLite file can be configured as a shared second level so several workers on
+the same host reuse each other's results.
+
+Each corpus has a generation counter that invalidation bumps (in the SQLite
+file when one is configured, so every worker sees it). A retrieval reads the
+generation before it runs and its ``put`` is dropped if the corpus was
+invalidated meanwhile, and in-process entries stored under an older generation
+are no longer served.
+"""
+
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import (
+    RETRIEVAL_CACHE_MAX_ENTRIES,
+    RETRIEVAL_CACHE_PATH,
+    RETRIEVAL_CACHE_TTL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str, int, float]
+
+# Generation reported when the shared level cannot be read; never matches an entry
+UNKNOWN_GENERATION = -1
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize query text so trivially different phrasings share a cache entry.
+
+    Args:
+        query (str): The raw query text
+
+    Returns:
+        str: The case-folded query with collapsed whitespace and no trailing punctuation
+    """
+    return re.sub(r"[\s?!.]+$", "", " ".join(query.casefold().split()))
+
+
+class SqliteCacheBackend:
+    """
+    On-disk cache level shared between processes through a SQLite file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS retrieval_cache ("
+                " key TEXT PRIMARY KEY,"
+                " corpus TEXT NOT NULL,"
+                " results TEXT NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS retrieval_cache_corpus"
+                " ON retrieval_cache (corpus)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS retrieval_cache_generations ("
+                " corpus TEXT PRIMARY KEY,"
+                " generation INTEGER NOT NULL)"
+            )
+
+    def generation(self, corpus: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT generation FROM retrieval_cache_generations WHERE corpus = ?",
+                (corpus,),
+            ).fetchone()
+        return row[0] if row else 0
+
+    def get(self, key: CacheKey) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results, expires_at FROM retrieval_cache WHERE key = ?",
+                (json.dumps(key),),
+            ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def put(
+        self, key: CacheKey, results: List[Dict[str, Any]], ttl: float, generation: int
+    ) -> None:
+        # Checked in the same statement, so an invalidation by another worker
+        # cannot slip in between the check and the write
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO retrieval_cache"
+                " SELECT ?, ?, ?, ?"
+                " WHERE COALESCE((SELECT generation FROM retrieval_cache_generations"
+                " WHERE corpus = ?), 0) = ?",
+                (
+                    json.dumps(key),
+                    key[0],
+                    json.dumps(results),
+                    time.time() + ttl,
+                    key[0],
+                    generation,
+                ),
+            )
+
+    def invalidate_corpus(self, corpus: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM retrieval_cache WHERE corpus = ?", (corpus,))
+            self._conn.execute(
+                "INSERT INTO retrieval_cache_generations VALUES (?, 1)"
+                " ON CONFLICT (corpus) DO UPDATE SET generation = generation + 1",
+                (corpus,),
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM retrieval_cache")
+
+
+class RetrievalCache:
+    """
+    Bounded LRU + TTL cache of retrieval results with hit/miss/eviction counters.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RETRIEVAL_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = RETRIEVAL_CACHE_TTL_SECONDS,
+        backend: Optional[SqliteCacheBackend] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.backend = backend
+        self._lock = threading.Lock()
+        # key -> (expiry, corpus generation at store time, results)
+        self._entries: "OrderedDict[CacheKey, Tuple[float, int, List[Dict[str, Any]]]]" = (
+            OrderedDict()
+        )
+        # Per-corpus generations when there is no shared level
+        self._generations: Dict[str, int] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def make_key(
+        corpus: str, query: str, top_k: int, distance_threshold: float
+    ) -> CacheKey:
+        return (corpus, normalize_query(query), int(top_k), float(distance_threshold))
+
+    def generation(self, corpus: str) -> int:
+        """
+        Get a corpus's invalidation generation; read it before retrieving.
+
+        Args:
+            corpus (str): The full corpus resource name
+
+        Returns:
+            int: The generation, or ``UNKNOWN_GENERATION`` if the shared level
+                cannot be read
+        """
+        if self.backend is None:
+            with self._lock:
+                return self._generations.get(corpus, 0)
+        try:
+            return self.backend.generation(corpus)
+        except sqlite3.Error as e:
+            logger.warning("Retrieval cache backend read failed: %s", e)
+            return UNKNOWN_GENERATION
+
+    def get(
+        self, corpus: str, query: str, top_k: int, distance_threshold: float
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up cached results for a retrieval.
+
+        Args:
+            corpus (str): The full corpus resource name
+            query (str): The query text
+            top_k (int): The number of results requested
+            distance_threshold (float): The vector distance threshold
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: The cached results, or None on a miss
+        """
+        key = self.make_key(corpus, query, top_k, distance_threshold)
+        now = time.monotonic()
+        generation = self.generation(corpus)
+        if generation == UNKNOWN_GENERATION:
+            with self._lock:
+                self._misses += 1
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, stored_generation, results = entry
+                if expires_at > now and stored_generation == generation:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return results
+                # Expired, or the corpus was invalidated by another worker
+                del self._entries[key]
+                self._evictions += 1
+
+        if self.backend is not None:
+            try:
+                results = self.backend.get(key)
+            except sqlite3.Error as e:
+                logger.warning("Retrieval cache backend read failed: %s", e)
+                results = None
+            if results is not None:
+                self._store(key, results, now, generation)
+                with self._lock:
+                    self._hits += 1
+                return results
+
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def put(
+        self,
+        corpus: str,
+        query: str,
+        top_k: int,
+        distance_threshold: float,
+        results: List[Dict[str, Any]],
+        generation: Optional[int] = None,
+    ) -> None:
+        """
+        Store the results of a retrieval unless the corpus changed while it ran.
+
+        Args:
+            corpus (str): The full corpus resource name
+            query (str): The query text
+            top_k (int): The number of results requested
+            distance_threshold (float): The vector distance threshold
+            results (List[Dict[str, Any]]): The processed retrieval results
+            generation (Optional[int]): ``generation(corpus)`` as read before the
+                retrieval; the results are dropped if it has changed since.
+                None stores them under the current generation.
+        """
+        current = self.generation(corpus)
+        if generation is None:
+            generation = current
+        if generation == UNKNOWN_GENERATION or current != generation:
+            logger.debug("Dropping retrieval results for %s: corpus changed", corpus)
+            return
+
+        key = self.make_key(corpus, query, top_k, distance_threshold)
+        self._store(key, results, time.monotonic(), generation)
+
+        if self.backend is not None:
+            try:
+                self.backend.put(key, results, self.ttl_seconds, generation)
+            except sqlite3.Error as e:
+                logger.warning("Retrieval cache backend write failed: %s", e)
+
+    def invalidate_corpus(self, corpus: str) -> None:
+        """
+        Drop every cached result for a corpus after its contents changed.
+
+        Args:
+            corpus (str): The full corpus resource name
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == corpus]:
+                del self._entries[key]
+            self._generations[corpus] = self._generations.get(corpus, 0) + 1
+
+        if self.backend is not None:
+            try:
+                self.backend.invalidate_corpus(corpus)
+            except sqlite3.Error as e:
+                logger.warning("Retrieval cache backend invalidation failed: %s", e)
+
+    def clear(self) -> None:
+        """Drop every cached result and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache effectiveness counters.
+
+        Returns:
+            Dict[str, Any]: Hits, misses, evictions, hit/miss rate and current size
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "miss_rate": self._misses / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+    def _store(
+        self, key: CacheKey, results: List[Dict[str, Any]], now: float, generation: int
+    ) -> None:
+        with self._lock:
+            if self.backend is None and self._generations.get(key[0], 0) != generation:
+                # Invalidated after the caller's check
+                return
+            self._entries[key] = (now + self.ttl_seconds, generation, results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+
+# Shared by every tool in this process
+retrieval_cache = RetrievalCache(
+    backend=SqliteCacheBackend(RETRIEVAL_CACHE_PATH) if RETRIEVAL_CACHE_PATH else None
+)
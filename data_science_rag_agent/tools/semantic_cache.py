@@ -0,0 +1,230 @@
+"""
+Embedding-similarity cache in front of RAG retrieval.
+
+Exact-match caching misses paraphrases such as "what is overfitting" and
+"explain overfitting". The semantic cache stores the embeddings of past queries
+in a NumPy matrix and serves the cached contexts of the nearest past query when
+its cosine similarity passes a threshold.
+
+As in the retrieval cache, ``add`` takes the corpus generation read before the
+retrieval and drops results that an invalidation overtook.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import (
+    SEMANTIC_CACHE_ENABLED,
+    SEMANTIC_CACHE_MAX_ENTRIES,
+    SEMANTIC_CACHE_SIMILARITY_THRESHOLD,
+    SEMANTIC_CACHE_TTL_SECONDS,
+)
+from ..embeddings import get_embedding_service
+
+EmbedFn = Callable[[str], np.ndarray]
+BucketKey = Tuple[str, int, float]
+
+
+class _Bucket:
+    """Ring buffer of query embeddings sharing one (corpus, top_k, threshold)."""
+
+    def __init__(self, dim: int, capacity: int):
+        self.matrix = np.zeros((capacity, dim), dtype=np.float32)
+        self.expires_at = np.full(capacity, -np.inf)
+        self.results: List[Optional[List[Dict[str, Any]]]] = [None] * capacity
+        self.next_slot = 0
+        self.filled = 0
+
+
+class SemanticCache:
+    """
+    Serve cached retrieval results for queries similar to a previous one.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Optional[EmbedFn] = None,
+        similarity_threshold: float = SEMANTIC_CACHE_SIMILARITY_THRESHOLD,
+        max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = SEMANTIC_CACHE_TTL_SECONDS,
+        enabled: bool = True,
+    ):
+        # None means the shared embedding service, resolved on first use
+        self.embed_fn: Optional[EmbedFn] = embed_fn
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._buckets: Dict[BucketKey, _Bucket] = {}
+        # Bumped by every invalidation of a corpus
+        self._generations: Dict[str, int] = {}
+        self._hits = 0
+        self._misses = 0
+
+    def embed(self, query: str) -> Optional[np.ndarray]:
+        """
+        Embed and L2-normalize a query.
+
+        Args:
+            query (str): The query text
+
+        Returns:
+            Optional[np.ndarray]: The unit-length embedding, or None if it is all zeros
+        """
+        embed_fn = self.embed_fn or get_embedding_service()
+        vector = np.asarray(embed_fn(query), dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return None
+        return vector / norm
+
+    def generation(self, corpus: str) -> int:
+        """
+        Get a corpus's invalidation generation; read it before retrieving.
+
+        Args:
+            corpus (str): The full corpus resource name
+
+        Returns:
+            int: The number of times the corpus was invalidated
+        """
+        with self._lock:
+            return self._generations.get(corpus, 0)
+
+    def lookup(
+        self,
+        corpus: str,
+        query: str,
+        top_k: int,
+        distance_threshold: float,
+        embedding: Optional[np.ndarray] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Find cached results for the most similar past query.
+
+        Args:
+            corpus (str): The full corpus resource name
+            query (str): The query text
+            top_k (int): The number of results requested
+            distance_threshold (float): The vector distance threshold
+            embedding (Optional[np.ndarray]): A precomputed normalized query embedding
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: The cached results, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        if embedding is None:
+            embedding = self.embed(query)
+
+        with self._lock:
+            bucket = self._buckets.get((corpus, int(top_k), float(distance_threshold)))
+            if (
+                embedding is None
+                or bucket is None
+                or bucket.filled == 0
+                # Embeddings from a different model cannot be compared
+                or bucket.matrix.shape[1] != embedding.shape[0]
+            ):
+                self._misses += 1
+                return None
+
+            # One matrix-vector product scores every cached query at once
+            similarities = bucket.matrix[: bucket.filled] @ embedding
+            similarities[bucket.expires_at[: bucket.filled] <= time.monotonic()] = -np.inf
+            best = int(np.argmax(similarities))
+
+            if similarities[best] >= self.similarity_threshold:
+                self._hits += 1
+                return bucket.results[best]
+            self._misses += 1
+            return None
+
+    def add(
+        self,
+        corpus: str,
+        query: str,
+        top_k: int,
+        distance_threshold: float,
+        results: List[Dict[str, Any]],
+        embedding: Optional[np.ndarray] = None,
+        generation: Optional[int] = None,
+    ) -> None:
+        """
+        Remember the results of a retrieval unless the corpus changed while it ran.
+
+        Args:
+            corpus (str): The full corpus resource name
+            query (str): The query text
+            top_k (int): The number of results requested
+            distance_threshold (float): The vector distance threshold
+            results (List[Dict[str, Any]]): The processed retrieval results
+            embedding (Optional[np.ndarray]): A precomputed normalized query embedding
+            generation (Optional[int]): ``generation(corpus)`` as read before the
+                retrieval; the results are dropped if it has changed since.
+                None stores them under the current generation.
+        """
+        if not self.enabled:
+            return
+        if embedding is None:
+            embedding = self.embed(query)
+        if embedding is None:
+            return
+
+        key = (corpus, int(top_k), float(distance_threshold))
+        with self._lock:
+            if generation is not None and self._generations.get(corpus, 0) != generation:
+                return
+            bucket = self._buckets.get(key)
+            if bucket is None or bucket.matrix.shape[1] != embedding.shape[0]:
+                bucket = self._buckets[key] = _Bucket(embedding.shape[0], self.max_entries)
+
+            # Overwrite the oldest slot once the ring buffer is full
+            slot = bucket.next_slot
+            bucket.matrix[slot] = embedding
+            bucket.expires_at[slot] = time.monotonic() + self.ttl_seconds
+            bucket.results[slot] = results
+            bucket.next_slot = (slot + 1) % self.max_entries
+            bucket.filled = min(bucket.filled + 1, self.max_entries)
+
+    def invalidate_corpus(self, corpus: str) -> None:
+        """
+        Drop every cached query for a corpus after its contents changed.
+
+        Args:
+            corpus (str): The full corpus resource name
+        """
+        with self._lock:
+            for key in [key for key in self._buckets if key[0] == corpus]:
+                del self._buckets[key]
+            self._generations[corpus] = self._generations.get(corpus, 0) + 1
+
+    def clear(self) -> None:
+        """Drop every cached query and reset the counters."""
+        with self._lock:
+            self._buckets.clear()
+            self._hits = self._misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache effectiveness counters.
+
+        Returns:
+            Dict[str, Any]: Hits, misses, hit rate and number of cached queries
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "size": sum(bucket.filled for bucket in self._buckets.values()),
+            }
+
+
+# Shared by every tool in this process
+semantic_cache = SemanticCache(enabled=SEMANTIC_CACHE_ENABLED)
@@ -0,0 +1,340 @@
+"""
+Incremental sync of a RAG corpus with a GCS prefix or local directory.
+
+Instead of re-importing the whole source, ``sync_corpus`` diffs the source
+listing (GCS object generations, or modification time and size of local files)
+against the versions recorded in the corpus's dedup index, then imports only
+new and changed objects and deletes the files whose source was removed.
+The old copy of a changed object is deleted only once its new version is in,
+so a failed import never leaves the corpus without the document.
+"""
+
+import base64
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from google.adk.tools.tool_context import ToolContext
+
+from ..backends import get_backend
+from ..config import (
+    BULK_INGEST_BATCH_SIZE,
+    BULK_INGEST_MAX_CONCURRENCY,
+    DEFAULT_CHUNK_OVERLAP,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_EMBEDDING_REQUESTS_PER_MIN,
+)
+from .dedup_index import content_hash, dedup_indexes, record_ingested, relisted_index
+from .utils import (
+    check_corpus_exists,
+    get_corpus_resource_name,
+    invalidate_corpus_caches,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def sync_corpus(
+    corpus_name: str,
+    source_prefix: str,
+    tool_context: ToolContext,
+    dry_run: bool = False,
+    max_concurrency: int = BULK_INGEST_MAX_CONCURRENCY,
+) -> dict:
+    """
+    Make a corpus match a GCS prefix or local directory by applying only the differences.
+
+    Args:
+        corpus_name (str): The name of the corpus to sync.
+        source_prefix (str): A GCS prefix ("gs://{BUCKET}/{PREFIX}") or, for the
+            local backend, a local directory.
+        tool_context (ToolContext): The tool context.
+        dry_run (bool): Only compute and return the plan without changing the corpus.
+        max_concurrency (int): Number of import and delete operations run at the same time.
+
+    Returns:
+        dict: The plan (paths to add, update and delete) and, unless dry_run, its outcome
+    """
+    if not check_corpus_exists(corpus_name, tool_context):
+        return {
+            "status": "error",
+            "message": f"Corpus '{corpus_name}' does not exist. Please create it first using the create_corpus tool.",
+            "corpus_name": corpus_name,
+        }
+
+    backend = get_backend()
+    if not source_prefix.startswith("gs://") and not backend.supports_local_paths:
+        return {
+            "status": "error",
+            "message": "Invalid source: Please provide a GCS prefix (gs://bucket/prefix)",
+            "corpus_name": corpus_name,
+            "source_prefix": source_prefix,
+        }
+
+    try:
+        corpus_resource_name = get_corpus_resource_name(corpus_name)
+        source_versions, source_hashes, corpus_prefix = _list_source(source_prefix)
+        to_add, to_update, to_delete, unchanged = _plan(
+            corpus_resource_name, corpus_prefix, source_versions, source_hashes
+        )
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Error listing '{source_prefix}': {str(e)}",
+            "corpus_name": corpus_name,
+            "source_prefix": source_prefix,
+        }
+
+    plan = {
+        "corpus_name": corpus_name,
+        "source_prefix": source_prefix,
+        "to_add": to_add,
+        "to_update": [path for path, _ in to_update],
+        "to_delete": [source_uri for source_uri, _ in to_delete],
+        "unchanged": len(unchanged),
+    }
+    logger.info(
+        "Sync plan for '%s' from '%s': %d to add, %d to update, %d to delete, %d unchanged",
+        corpus_name,
+        source_prefix,
+        len(to_add),
+        len(to_update),
+        len(to_delete),
+        len(unchanged),
+    )
+    if dry_run:
+        return {
+            "status": "success",
+            "message": "Dry run: no changes were made",
+            "dry_run": True,
+            **plan,
+        }
+
+    started = time.perf_counter()
+    errors: List[str] = []
+    replaced = {path: rag_file_id for path, rag_file_id in to_update}
+    imports = to_add + [path for path, _ in to_update]
+    batches = [
+        imports[start : start + BULK_INGEST_BATCH_SIZE]
+        for start in range(0, len(imports), BULK_INGEST_BATCH_SIZE)
+    ]
+    workers = max(1, max_concurrency)
+    requests_per_min = max(
+        1, DEFAULT_EMBEDDING_REQUESTS_PER_MIN // max(1, min(workers, len(batches)))
+    )
+
+    index = dedup_indexes.get(corpus_resource_name)
+    # Sources that did not change keep their files and adopt the listed version
+    index.set_source_versions({uri: source_versions[uri] for uri in unchanged})
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rag-sync") as pool:
+        # Imports go first; each batch deletes the stale copies of the sources
+        # it re-imported, so a failed batch leaves the old versions in place
+        imported = 0
+        deleted = 0
+        imported_paths: List[str] = []
+        for count, batch_imported, batch_deleted, batch_errors in pool.map(
+            lambda batch: _import(
+                corpus_resource_name,
+                batch,
+                requests_per_min,
+                source_hashes,
+                source_versions,
+                replaced,
+            ),
+            batches,
+        ):
+            imported += count
+            deleted += batch_deleted
+            imported_paths.extend(batch_imported)
+            errors.extend(batch_errors)
+
+        # Then the files whose source was removed
+        stale_files = [rag_file_id for _, rag_file_id in to_delete]
+        removed: List[str] = []
+        for rag_file_id, error in zip(
+            stale_files,
+            pool.map(lambda rag_file_id: _delete(corpus_resource_name, rag_file_id), stale_files),
+        ):
+            if error:
+                errors.append(error)
+            else:
+                removed.append(rag_file_id)
+        index.remove_files(removed)
+        deleted += len(removed)
+
+    # Failed sources keep their old version on record, so the next sync retries them
+    done = set(imported_paths)
+    failed_paths = [path for path in imports if path not in done]
+    if deleted or imported:
+        invalidate_corpus_caches(corpus_resource_name)
+
+    return {
+        "status": "partial" if errors or failed_paths else "success",
+        "message": (
+            f"Synced corpus '{corpus_name}': imported {imported} file(s), "
+            f"deleted {deleted} stale file(s)"
+        ),
+        "dry_run": False,
+        **plan,
+        "files_added": imported,
+        "files_deleted": deleted,
+        "failed_paths": failed_paths,
+        "errors": errors,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def _list_source(source_prefix: str) -> Tuple[Dict[str, str], Dict[str, str], str]:
+    """
+    List the source objects with their versions.
+
+    Returns:
+        Tuple[Dict[str, str], Dict[str, str], str]: Source URI -> version, source
+            URI -> content hash where the listing provides one, and the prefix
+            that the corpus's source URIs for this source start with
+    """
+    versions: Dict[str, str] = {}
+    hashes: Dict[str, str] = {}
+
+    if source_prefix.startswith("gs://"):
+        from google.cloud import storage
+
+        bucket_name, _, prefix = source_prefix[len("gs://"):].partition("/")
+        for blob in storage.Client().list_blobs(bucket_name, prefix=prefix or None):
+            if blob.name.endswith("/"):
+                continue
+            uri = f"gs://{bucket_name}/{blob.name}"
+            versions[uri] = str(blob.generation)
+            if blob.md5_hash:
+                hashes[uri] = f"md5:{base64.b64decode(blob.md5_hash).hex()}"
+        return versions, hashes, source_prefix
+
+    root = source_prefix[len("file://"):] if source_prefix.startswith("file://") else source_prefix
+    if not os.path.isdir(root):
+        raise FileNotFoundError(f"Directory '{root}' does not exist")
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            stat = os.stat(path)
+            versions[path] = f"{stat.st_mtime_ns}:{stat.st_size}"
+    return versions, hashes, os.path.join(root, "")
+
+
+def _plan(
+    corpus_resource_name: str,
+    corpus_prefix: str,
+    source_versions: Dict[str, str],
+    source_hashes: Dict[str, str],
+) -> Tuple[List[str], List[Tuple[str, str]], List[Tuple[str, str]], List[str]]:
+    """
+    Diff the source listing against the corpus files under the same prefix.
+
+    The dedup index is rebuilt from a fresh corpus listing first, so files
+    changed by other processes or outside these tools are diffed as they are
+    now; the index only contributes the recorded versions and hashes. Files
+    indexed before their first sync have no recorded version; they are
+    compared by content hash when both sides have one and otherwise assumed
+    current, adopting the source version.
+
+    Returns:
+        Tuple: Paths to add, (path, stale RAG file id) to update,
+            (source URI, RAG file id) to delete, and the unchanged paths
+    """
+    index = relisted_index(corpus_resource_name)
+    in_corpus = {
+        entry["source_uri"]: rag_file_id
+        for rag_file_id, entry in index.files.items()
+        if entry["source_uri"].startswith(corpus_prefix)
+    }
+
+    to_add: List[str] = []
+    to_update: List[Tuple[str, str]] = []
+    unchanged: List[str] = []
+    for uri in sorted(source_versions):
+        rag_file_id = in_corpus.get(uri)
+        if rag_file_id is None:
+            to_add.append(uri)
+            continue
+
+        recorded_version = index.source_version_of(rag_file_id)
+        if recorded_version:
+            changed = recorded_version != source_versions[uri]
+        else:
+            recorded_hash = index.content_hash_of(rag_file_id)
+            changed = bool(
+                recorded_hash
+                and source_hashes.get(uri)
+                and recorded_hash != source_hashes[uri]
+            )
+        if changed:
+            to_update.append((uri, rag_file_id))
+        else:
+            unchanged.append(uri)
+
+    to_delete = [
+        (uri, rag_file_id)
+        for uri, rag_file_id in sorted(in_corpus.items())
+        if uri not in source_versions
+    ]
+    return to_add, to_update, to_delete, unchanged
+
+
+def _delete(corpus_resource_name: str, rag_file_id: str) -> str:
+    try:
+        get_backend().delete_file(f"{corpus_resource_name}/ragFiles/{rag_file_id}")
+        return ""
+    except Exception as e:
+        logger.warning("Failed to delete RAG file '%s': %s", rag_file_id, e)
+        return f"Failed to delete '{rag_file_id}': {str(e)}"
+
+
+def _import(
+    corpus_resource_name: str,
+    paths: List[str],
+    requests_per_min: int,
+    source_hashes: Dict[str, str],
+    source_versions: Dict[str, str],
+    replaced: Dict[str, str],
+) -> Tuple[int, List[str], int, List[str]]:
+    """
+    Import one batch and replace the stale copies of the sources it re-imported.
+
+    Returns:
+        Tuple[int, List[str], int, List[str]]: Files imported, paths known to be
+            imported, stale files deleted, and errors
+    """
+    # Local files get a content hash too so add_data recognizes them later
+    content_hashes = {}
+    for path in paths:
+        digest = source_hashes.get(path) if path.startswith("gs://") else content_hash(path)
+        if digest:
+            content_hashes[path] = digest
+
+    try:
+        result = get_backend().import_files(
+            corpus_resource_name,
+            paths,
+            chunk_size=DEFAULT_CHUNK_SIZE,
+            chunk_overlap=DEFAULT_CHUNK_OVERLAP,
+            max_embedding_requests_per_min=requests_per_min,
+        )
+    except Exception as e:
+        logger.warning("Failed to import %d path(s): %s", len(paths), e)
+        return 0, [], 0, [f"Failed to import {len(paths)} path(s): {str(e)}"]
+
+    batch_replaced = {path: replaced[path] for path in paths if path in replaced}
+    imported, errors = record_ingested(
+        corpus_resource_name,
+        paths,
+        result,
+        content_hashes,
+        {path: source_versions[path] for path in paths},
+        batch_replaced,
+    )
+    deleted = sum(1 for path in imported if path in batch_replaced) - len(errors)
+    if result.failed_rag_files_count:
+        errors.append(f"{result.failed_rag_files_count} file(s) failed to import")
+    return result.imported_rag_files_count, imported, deleted, errors
@@ -4,12 +4,14 @@ Utility functions for the RAG tools.
 
 import logging
 import re
-
-from vertexai import rag
+from typing import Any, Dict, Iterable, List, Optional
 
 from google.adk.tools.tool_context import ToolContext
 
-from ..config import LOCATION, PROJECT_ID
+from ..config import LIST_TOOL_MAX_PAGE_SIZE, LOCATION, PROJECT_ID
+from .corpus_registry import corpus_registry
+from .retrieval_cache import retrieval_cache
+from .semantic_cache import semantic_cache
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +27,7 @@ def get_corpus_resource_name(corpus_name: str) -> str:
         The full corpus name
     """
 
-    logger.info(f"Getting resource name for corpus: {corpus_name}")
+    logger.debug("Getting resource name for corpus: %s", corpus_name)
 
     # If it's already a full resource name with the projects/locations/ragCorpora format
 
@@ -35,14 +37,12 @@ def get_corpus_resource_name(corpus_name: str) -> str:
     # Check if this is a display name of an existing corpus
 
     try:
-        # List all corpora and check if there's a match with the display name
-        corpora = rag.list_corpora()
-
-        for corpus in corpora:
-            if hasattr(corpus, "display_name") and corpus.display_name == corpus_name:
-                return corpus.name
+        # Resolve the display name through the shared corpus registry
+        resource_name = corpus_registry.resolve(corpus_name)
+        if resource_name:
+            return resource_name
     except Exception as e:
-        logger.warning(f"Error when checking for corpus display name: {str(e)}")
+        logger.warning("Error when checking for corpus display name: %s", e)
 
         # If we can't check, continue with the default behavior
         pass
@@ -82,23 +82,18 @@ def check_corpus_exists(corpus_name: str, tool_context: ToolContext) -> bool:
         # Get full resource name
         corpus_resource_name = get_corpus_resource_name(corpus_name)
 
-        # List all corpora and check if this one exists
-        corpora = rag.list_corpora()
-        for corpus in corpora:
-            if (
-                corpus.name == corpus_resource_name
-                or corpus.display_name == corpus_name
-            ):
-                # Update state
-                tool_context.state[f"corpus_exists_{corpus_name}"] = True
-                # Also set this as the current corpus if no current corpus is set
-                if not tool_context.state.get("current_corpus"):
-                    tool_context.state["current_corpus"] = corpus_name
-                return True
+        # Look the corpus up in the shared registry
+        if corpus_registry.exists(corpus_name, resource_name=corpus_resource_name):
+            # Update state
+            tool_context.state[f"corpus_exists_{corpus_name}"] = True
+            # Also set this as the current corpus if no current corpus is set
+            if not tool_context.state.get("current_corpus"):
+                tool_context.state["current_corpus"] = corpus_name
+            return True
 
         return False
     except Exception as e:
-        logger.error(f"Error checking if corpus exists: {str(e)}")
+        logger.error("Error checking if corpus exists: %s", e)
         # If we can't check, assume it doesn't exist
         return False
 
@@ -120,3 +115,61 @@ def set_current_corpus(corpus_name: str, tool_context: ToolContext) -> bool:
         tool_context.state["current_corpus"] = corpus_name
         return True
     return False
+
+
+def invalidate_corpus_caches(corpus_resource_name: str) -> None:
+    """
+    Drop cached retrieval results for a corpus after its contents changed.
+
+    Args:
+        corpus_resource_name (str): The full resource name of the corpus
+    """
+    retrieval_cache.invalidate_corpus(corpus_resource_name)
+    semantic_cache.invalidate_corpus(corpus_resource_name)
+
+
+def clamp_page_size(page_size: int) -> int:
+    """
+    Bound a page size requested by the model to what a listing tool returns.
+
+    Args:
+        page_size (int): The requested page size
+
+    Returns:
+        int: The page size, between 1 and ``LIST_TOOL_MAX_PAGE_SIZE``
+    """
+    return max(1, min(int(page_size), LIST_TOOL_MAX_PAGE_SIZE))
+
+
+def check_fields(fields: Optional[List[str]], allowed: Iterable[str]) -> None:
+    """
+    Reject field names a listing tool cannot project.
+
+    Args:
+        fields (Optional[List[str]]): The requested fields; None or empty means all
+        allowed (Iterable[str]): The fields the tool returns
+
+    Raises:
+        ValueError: If any requested field is unknown
+    """
+    unknown = sorted(set(fields or []) - set(allowed))
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s) {unknown}. Expected any of {list(allowed)}"
+        )
+
+
+def project(item: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    """
+    Keep only the requested fields of a listed item.
+
+    Args:
+        item (Dict[str, Any]): The full item
+        fields (Optional[List[str]]): The fields to keep; None or empty keeps all
+
+    Returns:
+        Dict[str, Any]: The projected item
+    """
+    if not fields:
+        return item
+    return {key: item[key] for key in fields if key in item}
@@ -0,0 +1,61 @@
+"""
+Deferred, once-only Vertex AI initialization.
+
+Nothing calls ``vertexai.init`` at import time. The code paths that talk to
+Vertex AI (the Vertex RAG backend and the Vertex embedding model) call
+``init_vertexai`` first, and the first call does the work for the process.
+"""
+
+import logging
+import threading
+from typing import Optional
+
+from .config import LOCATION, PROJECT_ID
+
+logger = logging.getLogger(__name__)
+
+_initialized: Optional[bool] = None
+_init_lock = threading.Lock()
+
+
+def init_vertexai() -> bool:
+    """
+    Initialize Vertex AI for this process if it has not been attempted yet.
+
+    Returns:
+        bool: True if Vertex AI was initialized; False if the configuration is
+            missing or initialization failed (the failure is reported once)
+    """
+    global _initialized
+
+    if _initialized is None:
+        with _init_lock:
+            if _initialized is None:
+                _initialized = _init()
+    return _initialized
+
+
+def _init() -> bool:
+    if not (PROJECT_ID and LOCATION):
+        logger.warning(
+            "Missing Vertex AI configuration. PROJECT_ID=%s, LOCATION=%s. "
+            "Tools requiring Vertex AI may not work properly.",
+            PROJECT_ID,
+            LOCATION,
+        )
+        return False
+
+    try:
+        import vertexai
+
+        logger.info("Initializing Vertex AI with project=%s, location=%s", PROJECT_ID, LOCATION)
+        vertexai.init(project=PROJECT_ID, location=LOCATION)
+        logger.info("Vertex AI initialization successful")
+        return True
+    except Exception as e:
+        logger.error(
+            "Failed to initialize Vertex AI: %s. "
+            "Please check your Google Cloud credentials and project settings.",
+            e,
+        )
+        return False
@@ -0,0 +1,46 @@
+"""
+Shared test setup.
+
+The package reads its configuration at import time, so on-disk state is
+pointed at a temporary directory before any test module imports it.
+"""
+
+import os
+import tempfile
+
+_STATE_DIR = tempfile.mkdtemp(prefix="rag_tests_")
+os.environ.setdefault("RAG_BACKEND", "local")
+os.environ.setdefault("LOCAL_RAG_DIR", os.path.join(_STATE_DIR, "local_rag"))
+os.environ.setdefault("DEDUP_INDEX_DIR", os.path.join(_STATE_DIR, "dedup_index"))
+os.environ.setdefault("BULK_INGEST_JOURNAL_DIR", os.path.join(_STATE_DIR, "journal"))
+os.environ.setdefault("EMBEDDING_CACHE_PATH", "")
+os.environ.setdefault("TELEMETRY_EXPORTER", "none")
+
+import pytest  # noqa: E402
+
+from benchmarks.fake_backend import PROFILES, FakeRagBackend  # noqa: E402
+from data_science_rag_agent.backends import get_backend, set_backend  # noqa: E402
+
+
+@pytest.fixture
+def fake_backend(monkeypatch, tmp_path):
+    """An instant in-process backend with empty registry, caches, dedup indexes and bootstrap."""
+    from data_science_rag_agent.tools import corpus_registry, retrieval_cache, semantic_cache
+    from data_science_rag_agent.tools.dedup_index import dedup_indexes
+    from data_science_rag_agent.tools.default_rag_config import reset_default_rag_config
+
+    monkeypatch.setattr(dedup_indexes, "directory", str(tmp_path / "dedup_index"))
+    monkeypatch.setattr(dedup_indexes, "_indexes", {})
+    previous = get_backend()
+    backend = FakeRagBackend(PROFILES["instant"])
+    set_backend(backend)
+    for reset in (
+        corpus_registry.invalidate,
+        retrieval_cache.clear,
+        semantic_cache.clear,
+        reset_default_rag_config,
+    ):
+        reset()
+    yield backend
+    set_backend(previous)
+    corpus_registry.invalidate()
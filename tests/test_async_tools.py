@@ -0,0 +1,36 @@
+import asyncio
+import inspect
+from types import SimpleNamespace
+
+import pytest
+from google.adk.tools import FunctionTool
+
+from data_science_rag_agent.tools import async_tools
+
+TOOL_NAMES = (
+    "add_data",
+    "create_corpus",
+    "default_rag_config",
+    "delete_corpus",
+    "delete_document",
+    "get_corpus_info",
+    "list_corpus",
+    "rag_query",
+    "sync_corpus",
+)
+
+
+@pytest.mark.parametrize("name", TOOL_NAMES)
+def test_async_tools_declare_like_their_blocking_tool(name):
+    sync_tool = getattr(async_tools, name)
+    async_tool = getattr(async_tools, f"{name}_async")
+
+    assert inspect.iscoroutinefunction(async_tool)
+    async_declaration = FunctionTool(async_tool)._get_declaration()
+    assert async_declaration.description
+    assert async_declaration == FunctionTool(sync_tool)._get_declaration()
+
+
+def test_async_tool_runs_the_blocking_tool(fake_backend):
+    result = asyncio.run(async_tools.default_rag_config_async(SimpleNamespace(state={})))
+    assert result["success"] is True
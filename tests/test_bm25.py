@@ -0,0 +1,56 @@
+import numpy as np
+
+from data_science_rag_agent.backends.bm25 import LexicalIndex
+
+
+def test_bm25_ranks_matching_chunks_and_survives_remap(tmp_path):
+    index = LexicalIndex()
+    index.add(["gradient boosting trees", "linear regression"], 0)
+    index.add(["gradient descent on the loss", "random forest"], 2)
+
+    rows, scores = index.search("gradient", top_k=5)
+    assert sorted(rows.tolist()) == [0, 2]
+    assert np.all(scores > 0)
+
+    index.remap(np.array([False, True, True, True]))
+    rows, _ = index.search("gradient descent", top_k=5)
+    assert rows.tolist() == [1]
+
+    path = str(tmp_path / "lexical.npz")
+    index.save(path)
+    loaded = LexicalIndex.load(path)
+    assert loaded.search("regression", top_k=5)[0].tolist() == [0]
+
+
+def test_appends_keep_few_segments_and_rank_like_one_batch(tmp_path):
+    texts = [f"chunk {i} about topic{i % 7} and shared words" for i in range(200)]
+    batched = LexicalIndex()
+    for start in range(0, len(texts), 4):
+        batched.add(texts[start : start + 4], start)
+    whole = LexicalIndex()
+    whole.add(texts, 0)
+
+    assert len(batched.segments) <= 8
+    for query in ("topic3", "shared topic5 chunk"):
+        rows, scores = batched.search(query, top_k=10)
+        expected_rows, expected_scores = whole.search(query, top_k=10)
+        assert rows.tolist() == expected_rows.tolist()
+        assert np.allclose(scores, expected_scores)
+
+    path = str(tmp_path / "lexical.npz")
+    batched.save(path)
+    loaded = LexicalIndex.load(path)
+    expected_rows = whole.search("topic3", top_k=10)[0]
+    assert loaded.search("topic3", top_k=10)[0].tolist() == expected_rows.tolist()
+
+
+def test_copies_leave_the_original_unchanged():
+    index = LexicalIndex()
+    index.add(["gradient boosting"], 0)
+    updated = index.copy()
+    updated.add(["gradient descent"], 1)
+    updated.remap(np.array([False, True]))
+
+    assert index.search("gradient", top_k=5)[0].tolist() == [0]
+    assert index.search("descent", top_k=5)[0].tolist() == []
+    assert updated.search("descent", top_k=5)[0].tolist() == [0]
@@ -0,0 +1,126 @@
+import importlib
+import os
+import threading
+from types import SimpleNamespace
+
+from benchmarks.fake_backend import FakeRpcError
+from data_science_rag_agent.backends.resilient import BackendOverloaded
+from data_science_rag_agent.tools import bulk_add_data, dedup_index
+
+bulk_add_data_module = importlib.import_module("data_science_rag_agent.tools.bulk_add_data")
+
+
+def test_batches_fingerprint_their_own_paths_on_the_pool(fake_backend, monkeypatch, tmp_path):
+    monkeypatch.setattr(fake_backend, "supports_local_paths", True)
+    corpus_name = fake_backend.create_corpus("bulk_test", "").name
+    context = SimpleNamespace(state={f"corpus_exists_{corpus_name}": True})
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"doc_{i}.txt"
+        path.write_text(f"document {i}")
+        paths.append(str(path))
+
+    hashing_threads = set()
+    content_hash = dedup_index.content_hash
+
+    def recording_content_hash(path, storage_client=None):
+        hashing_threads.add(threading.current_thread().name)
+        return content_hash(path, storage_client)
+
+    monkeypatch.setattr(dedup_index, "content_hash", recording_content_hash)
+    result = bulk_add_data(
+        corpus_name,
+        paths,
+        context,
+        batch_size=2,
+        max_concurrency=2,
+        journal_dir=str(tmp_path / "journal"),
+    )
+    assert result["status"] == "success"
+    assert result["files_added"] == 4
+    assert hashing_threads and all(name.startswith("rag-ingest") for name in hashing_threads)
+
+    # A fresh journal still skips everything through the dedup index
+    fake_backend.reset_rpc_counts()
+    result = bulk_add_data(
+        corpus_name, paths, context, batch_size=2, journal_dir=str(tmp_path / "other")
+    )
+    assert result["status"] == "success"
+    assert result["files_added"] == 0
+    assert result["already_ingested"] == 4
+    assert fake_backend.rpc_counts() == {}
+
+
+def _local_corpus(fake_backend, monkeypatch, tmp_path, count):
+    monkeypatch.setattr(fake_backend, "supports_local_paths", True)
+    corpus_name = fake_backend.create_corpus("bulk_test", "").name
+    context = SimpleNamespace(state={f"corpus_exists_{corpus_name}": True})
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"doc_{i}.txt"
+        path.write_text(f"document {i}")
+        paths.append(str(path))
+    return corpus_name, context, paths
+
+
+def test_successful_run_clears_its_journal_so_changed_content_is_reimported(
+    fake_backend, monkeypatch, tmp_path
+):
+    corpus_name, context, paths = _local_corpus(fake_backend, monkeypatch, tmp_path, 2)
+    journal_dir = str(tmp_path / "journal")
+    result = bulk_add_data(corpus_name, paths, context, journal_dir=journal_dir)
+    assert result["status"] == "success"
+    assert result["journal"] is None
+    assert os.listdir(journal_dir) == []
+
+    with open(paths[0], "w") as f:
+        f.write("document 0, revised")
+    result = bulk_add_data(corpus_name, paths, context, journal_dir=journal_dir)
+    assert result["status"] == "success"
+    assert result["files_added"] == 1
+    assert result["already_ingested"] == 1
+
+
+def test_only_rejected_imports_are_retried(fake_backend, monkeypatch, tmp_path):
+    corpus_name, context, paths = _local_corpus(fake_backend, monkeypatch, tmp_path, 1)
+    import_files = fake_backend.import_files
+    calls = []
+
+    def failing_import(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise BackendOverloaded("no slot")
+        raise FakeRpcError("deadline")
+
+    monkeypatch.setattr(fake_backend, "import_files", failing_import)
+    monkeypatch.setattr(bulk_add_data_module.time, "sleep", lambda seconds: None)
+    result = bulk_add_data(
+        corpus_name, paths, context, max_retries=3, journal_dir=str(tmp_path / "journal")
+    )
+    # One retry after the rejection, none after the import that may have landed
+    assert len(calls) == 2
+    assert result["status"] == "error"
+    assert result["batches"][0]["attempts"] == 2
+    assert result["journal"] is not None
+
+    monkeypatch.setattr(fake_backend, "import_files", import_files)
+    result = bulk_add_data(corpus_name, paths, context, journal_dir=str(tmp_path / "journal"))
+    assert result["status"] == "success"
+    assert result["files_added"] == 1
+
+
+def test_index_errors_are_returned_not_raised(fake_backend, monkeypatch, tmp_path):
+    corpus_name, context, paths = _local_corpus(fake_backend, monkeypatch, tmp_path, 2)
+
+    def broken(*args, **kwargs):
+        raise OSError("index unavailable")
+
+    monkeypatch.setattr(bulk_add_data_module, "filter_ingested", broken)
+    result = bulk_add_data(corpus_name, paths, context, journal_dir=str(tmp_path / "j"))
+    assert result["status"] == "error"
+    assert "index unavailable" in result["batches"][0]["message"]
+
+    monkeypatch.setattr(bulk_add_data_module, "synced_index", broken)
+    result = bulk_add_data(corpus_name, paths, context, journal_dir=str(tmp_path / "j"))
+    assert result["status"] == "error"
+    assert "index unavailable" in result["message"]
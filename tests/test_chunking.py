@@ -0,0 +1,32 @@
+from data_science_rag_agent.chunking import chunk_text
+
+DOC = """# Guide
+## Training
+```python
+# load data
+x = load()
+# fit model
+model.fit(x)
+```
+## Evaluation
+Score the model on held-out data.
+"""
+
+
+def test_markdown_ignores_comments_in_code_fences():
+    chunks = chunk_text(DOC, "markdown", chunk_size=64, chunk_overlap=0)
+
+    assert [chunk.heading for chunk in chunks] == [
+        "Guide",
+        "Guide > Training",
+        "Guide > Evaluation",
+    ]
+    assert "# load data" in chunks[1].text and "model.fit(x)" in chunks[1].text
+
+
+def test_token_chunks_overlap():
+    text = " ".join(f"w{i}" for i in range(100))
+    chunks = chunk_text(text, "token", chunk_size=40, chunk_overlap=10)
+
+    assert chunks[0].text.split()[-10:] == chunks[1].text.split()[:10]
+    assert chunks[-1].text.split()[-1] == "w99"
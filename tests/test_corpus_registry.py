@@ -0,0 +1,17 @@
+from data_science_rag_agent.tools.corpus_registry import CorpusRegistry
+
+
+def test_registry_lists_once_and_tracks_creates_and_deletes(fake_backend):
+    registry = CorpusRegistry(ttl_seconds=60, miss_refresh_seconds=60)
+    fake_backend.reset_rpc_counts()
+
+    assert registry.exists("seed_corpus_0")
+    assert registry.resolve("missing") is None
+    assert fake_backend.rpc_counts() == {"list_corpora": 1}
+
+    corpus = fake_backend.create_corpus("created", "")
+    registry.add(corpus)
+    assert registry.resolve("created") == corpus.name
+    registry.remove(corpus.name)
+    assert registry.resolve("created") is None
+    assert fake_backend.rpc_counts()["list_corpora"] == 1
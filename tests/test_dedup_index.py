@@ -0,0 +1,110 @@
+from data_science_rag_agent.backends import RagFileRecord
+from data_science_rag_agent.tools.dedup_index import (
+    DedupIndex,
+    filter_ingested,
+    record_ingested,
+)
+
+CORPUS = "projects/bench/locations/local/ragCorpora/dedup"
+
+
+def _import(backend, paths):
+    return backend.import_files(CORPUS, paths, 512, 100, 1000)
+
+
+def _source_uris(backend):
+    return sorted(rag_file.source_uri for rag_file in backend.list_files(CORPUS))
+
+
+def test_unchanged_content_is_skipped_without_relisting(fake_backend, tmp_path):
+    path = str(tmp_path / "notes.txt")
+    with open(path, "w") as f:
+        f.write("first version")
+
+    to_import, _, hashes, _ = filter_ingested(CORPUS, [path])
+    record_ingested(CORPUS, to_import, _import(fake_backend, to_import), hashes)
+
+    fake_backend.reset_rpc_counts()
+    to_import, skipped, _, _ = filter_ingested(CORPUS, [path])
+    assert to_import == []
+    assert len(skipped) == 1
+    assert fake_backend.rpc_counts() == {}
+
+
+def test_changed_content_replaces_the_stale_file_only_after_import(fake_backend, tmp_path):
+    path = str(tmp_path / "notes.txt")
+    with open(path, "w") as f:
+        f.write("first version")
+    to_import, _, hashes, _ = filter_ingested(CORPUS, [path])
+    record_ingested(CORPUS, to_import, _import(fake_backend, to_import), hashes)
+
+    with open(path, "w") as f:
+        f.write("second version")
+    to_import, _, hashes, replaced = filter_ingested(CORPUS, [path])
+    assert to_import == [path]
+    assert list(replaced) == [path]
+
+    # A failed import keeps the old copy
+    assert record_ingested(CORPUS, to_import, None, hashes, replaced=replaced) == ([], [])
+    assert _source_uris(fake_backend) == [path]
+
+    fake_backend.reset_rpc_counts()
+    imported, errors = record_ingested(
+        CORPUS, to_import, _import(fake_backend, to_import), hashes, replaced=replaced
+    )
+    assert imported == [path]
+    assert errors == []
+    assert fake_backend.rpc_counts() == {"import_files": 1, "delete_file": 1}
+    assert _source_uris(fake_backend) == [path]
+
+    to_import, skipped, _, _ = filter_ingested(CORPUS, [path])
+    assert to_import == []
+    assert len(skipped) == 1
+
+
+def _record(rag_file_id, source_uri):
+    return RagFileRecord(
+        name=f"{CORPUS}/ragFiles/{rag_file_id}", display_name=source_uri, source_uri=source_uri
+    )
+
+
+def test_indexes_sharing_a_file_keep_each_others_changes(tmp_path):
+    path = str(tmp_path / "index.json")
+    first, second = DedupIndex(path), DedupIndex(path)
+
+    first.add_files([_record("a", "gs://b/a.txt")], {})
+    second.add_files([_record("b", "gs://b/b.txt")], {})
+    first.remove_file("a")
+
+    # Each write reloaded the other's changes under the file lock
+    assert sorted(first.files) == ["b"]
+    second.refresh()
+    assert sorted(second.files) == ["b"]
+    assert second.by_source_uri("gs://b/a.txt") is None
+
+
+def test_record_ingested_saves_the_index_once_per_batch(fake_backend, tmp_path, monkeypatch):
+    paths = []
+    for i in range(3):
+        path = str(tmp_path / f"notes_{i}.txt")
+        with open(path, "w") as f:
+            f.write(f"first version {i}")
+        paths.append(path)
+    to_import, _, hashes, _ = filter_ingested(CORPUS, paths)
+    record_ingested(CORPUS, to_import, _import(fake_backend, to_import), hashes)
+
+    for i, path in enumerate(paths):
+        with open(path, "w") as f:
+            f.write(f"second version {i}")
+    to_import, _, hashes, replaced = filter_ingested(CORPUS, paths)
+    assert len(replaced) == 3
+
+    saves = []
+    save = DedupIndex._save
+    monkeypatch.setattr(DedupIndex, "_save", lambda index: saves.append(1) or save(index))
+    imported, errors = record_ingested(
+        CORPUS, to_import, _import(fake_backend, to_import), hashes, replaced=replaced
+    )
+    assert len(imported) == 3 and errors == []
+    assert len(saves) == 1
+    assert _source_uris(fake_backend) == sorted(paths)
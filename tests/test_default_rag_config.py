@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+from data_science_rag_agent.backends.base import ImportResult
+from data_science_rag_agent.tools import delete_corpus
+from data_science_rag_agent.tools.default_rag_config import default_rag_config
+
+
+def _context():
+    return SimpleNamespace(state={})
+
+
+def test_failed_corpus_creation_is_reported_and_not_cached(fake_backend, monkeypatch):
+    create_corpus = fake_backend.create_corpus
+    failures = [RuntimeError("quota exceeded")]
+
+    def create_once_failing(display_name, embedding_model):
+        if failures:
+            raise failures.pop()
+        return create_corpus(display_name, embedding_model)
+
+    monkeypatch.setattr(fake_backend, "create_corpus", create_once_failing)
+    result = default_rag_config(_context())
+    assert result["success"] is False
+    assert "quota exceeded" in result["message"]
+
+    assert default_rag_config(_context())["success"] is True
+
+
+def test_failed_import_is_reported(fake_backend, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("import failed")
+
+    monkeypatch.setattr(fake_backend, "import_files", fail)
+    result = default_rag_config(_context())
+    assert result["success"] is False
+    assert "import failed" in result["message"]
+
+
+def test_deleting_the_default_corpus_resets_the_bootstrap(fake_backend):
+    first = default_rag_config(_context())
+    assert first["success"] is True
+
+    deleted = delete_corpus(first["corpus_name"], True, _context())
+    assert deleted["status"] == "success"
+
+    second = default_rag_config(_context())
+    assert second["success"] is True
+    assert second["corpus_name"] != first["corpus_name"]
+    assert second["corpus_name"] in {
+        corpus.name for corpus in fake_backend.list_corpora()
+    }
+
+
+def test_an_import_that_adds_nothing_is_not_cached(fake_backend, monkeypatch):
+    import_files = fake_backend.import_files
+    # The local backend reports Drive URLs as failed files instead of raising
+    monkeypatch.setattr(
+        fake_backend, "import_files", lambda *args, **kwargs: ImportResult(failed_rag_files_count=1)
+    )
+    result = default_rag_config(_context())
+    assert result["success"] is False
+
+    monkeypatch.setattr(fake_backend, "import_files", import_files)
+    assert default_rag_config(_context())["success"] is True
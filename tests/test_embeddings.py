@@ -0,0 +1,128 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from data_science_rag_agent.embeddings import EmbeddingService, EmbeddingStore, HashingEmbedder
+
+
+class CountingModel:
+    """Hashing embedder that records every batch and can be held or made to fail."""
+
+    def __init__(self, error=None):
+        self.embedder = HashingEmbedder(dim=8)
+        self.batches = []
+        self.error = error
+        self.release = threading.Event()
+        self.release.set()
+        self._lock = threading.Lock()
+
+    def embed_batch(self, texts):
+        with self._lock:
+            self.batches.append(list(texts))
+        self.release.wait(timeout=5)
+        if self.error is not None:
+            raise self.error
+        return self.embedder.embed_batch(texts)
+
+
+def _in_threads(fn, args):
+    results, errors = [None] * len(args), [None] * len(args)
+
+    def run(i):
+        try:
+            results[i] = fn(args[i])
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(args))]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def test_concurrent_identical_texts_share_one_model_call():
+    model = CountingModel()
+    model.release.clear()
+    service = EmbeddingService(model, "counting", max_wait_ms=1)
+
+    threads, results, errors = _in_threads(service.embed, ["same text"] * 8)
+    _wait_for(lambda: service.stats()["coalesced"] == 7)
+    model.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == [None] * 8
+    assert model.batches == [["same text"]]
+    assert all(np.array_equal(result, results[0]) for result in results)
+
+
+def test_batches_stay_within_max_batch_size():
+    model = CountingModel()
+    service = EmbeddingService(model, "counting", max_batch_size=4, max_wait_ms=200)
+
+    vectors = service.embed_many([f"text {i}" for i in range(10)])
+    assert vectors.shape == (10, 8)
+    assert sorted(len(batch) for batch in model.batches) == [2, 4, 4]
+    assert service.stats()["embedded"] == 10
+
+
+def test_concurrent_callers_are_micro_batched():
+    model = CountingModel()
+    service = EmbeddingService(model, "counting", max_batch_size=8, max_wait_ms=200)
+
+    threads, results, errors = _in_threads(service.embed, [f"text {i}" for i in range(8)])
+    for thread in threads:
+        thread.join()
+
+    assert errors == [None] * 8
+    assert sum(len(batch) for batch in model.batches) == 8
+    assert len(model.batches) < 8
+    for i, result in enumerate(results):
+        assert np.array_equal(result, model.embedder(f"text {i}"))
+
+
+def test_model_errors_reach_every_waiting_caller():
+    model = CountingModel(error=RuntimeError("quota exceeded"))
+    model.release.clear()
+    service = EmbeddingService(model, "counting", max_batch_size=8, max_wait_ms=50)
+
+    texts = ["same"] * 3 + ["other", "third"]
+    threads, _, errors = _in_threads(service.embed, texts)
+    _wait_for(lambda: service.stats()["coalesced"] == 2)
+    model.release.set()
+    for thread in threads:
+        thread.join()
+    assert all(isinstance(error, RuntimeError) for error in errors)
+
+    # Nothing failed is cached or left in flight, so a later call retries
+    model.error = None
+    assert service.embed("same").shape == (8,)
+    model.error = RuntimeError("down again")
+    with pytest.raises(RuntimeError):
+        service.embed("never embedded")
+
+
+def test_sqlite_store_serves_vectors_to_a_new_service(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite")
+    first = EmbeddingService(CountingModel(), "counting", store=EmbeddingStore(path))
+    expected = first.embed_many(["alpha", "beta"])
+
+    model = CountingModel()
+    second = EmbeddingService(model, "counting", store=EmbeddingStore(path))
+    assert np.array_equal(second.embed_many(["beta", "alpha"]), expected[::-1])
+    assert model.batches == []
+    assert second.stats()["store_hits"] == 2
+
+    # Vectors are keyed by model, so another model does not reuse them
+    other = EmbeddingService(model, "other-model", store=EmbeddingStore(path))
+    other.embed("alpha")
+    assert model.batches == [["alpha"]]
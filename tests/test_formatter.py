@@ -0,0 +1,35 @@
+from data_science_rag_agent.sub_agent.output_agent.formatter import format_response
+
+ANSWER = """## Overfitting
+The model memorizes noise in the training data.
+
+```python
+# load data
+df = load()
+# fit model
+model.fit(df)
+```
+
+## How to avoid it
+Use regularization and cross-validation.
+"""
+
+
+def test_comments_in_code_blocks_are_not_headings():
+    response = format_response(ANSWER)
+
+    assert [section.heading for section in response.sections] == [
+        "Overfitting",
+        "How to avoid it",
+    ]
+    assert response.sections[1].sub_heading == ""
+    assert response.sections[0].code_blocks == [
+        "# load data\ndf = load()\n# fit model\nmodel.fit(df)"
+    ]
+
+
+def test_single_top_level_heading_is_the_title():
+    response = format_response("# Guide\n## Setup\nInstall it.\n## Usage\nRun it.")
+
+    assert response.title == "Guide"
+    assert [section.heading for section in response.sections] == ["Setup", "Usage"]
@@ -0,0 +1,39 @@
+import numpy as np
+
+from data_science_rag_agent.backends.ivf import IVFIndex
+
+
+def _unit_rows(rows, dim=16, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(rows, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_ivf_finds_exact_neighbour_with_all_cells_probed(tmp_path):
+    matrix = _unit_rows(200)
+    index = IVFIndex.train(matrix, nlist=8)
+    index.add(matrix, 0)
+    assert index.size == 200
+
+    rows, distances = index.search(matrix, matrix[42], nprobe=index.nlist)
+    assert rows[np.argmin(distances)] == 42
+
+    path = str(tmp_path / "ivf.npz")
+    index.save(path)
+    loaded = IVFIndex.load(path)
+    assert loaded.size == 200
+    assert np.array_equal(loaded.centroids, index.centroids)
+
+
+def test_ivf_remap_renumbers_surviving_rows():
+    matrix = _unit_rows(50)
+    index = IVFIndex.train(matrix, nlist=4)
+    index.add(matrix, 0)
+    keep = np.ones(50, dtype=bool)
+    keep[:10] = False
+    index.remap(keep)
+
+    remaining = matrix[keep]
+    rows, distances = index.search(remaining, remaining[5], nprobe=index.nlist)
+    assert index.size == 40
+    assert rows.max() < 40
+    assert rows[np.argmin(distances)] == 5
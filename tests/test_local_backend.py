@@ -0,0 +1,158 @@
+import threading
+
+from data_science_rag_agent.backends.bm25 import LexicalIndex
+from data_science_rag_agent.backends import local as local_module
+from data_science_rag_agent.backends.local import LocalRagBackend, _CorpusStore
+from data_science_rag_agent.embeddings import HashingEmbedder
+
+
+def _backend(tmp_path, **kwargs):
+    return LocalRagBackend(
+        root_dir=str(tmp_path / "rag"), embed_fn=HashingEmbedder(64), dim=64, **kwargs
+    )
+
+
+def _write_docs(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"doc_{i}.txt"
+        path.write_text(" ".join(f"term{i} shared word{j}" for j in range(200)))
+        paths.append(str(path))
+    return paths
+
+
+def test_retrieval_during_deletes_sees_consistent_snapshots(tmp_path):
+    backend = _backend(tmp_path, index_kind="ivf", nprobe=4)
+    corpus_name = backend.create_corpus("snapshots", "").name
+    result = backend.import_files(corpus_name, _write_docs(tmp_path, 12), 32, 4, 1000)
+    backend._store(corpus_name).build_index(nlist=4)
+
+    errors = []
+    done = threading.Event()
+
+    def query():
+        while not done.is_set():
+            try:
+                for context in backend.retrieval_query([corpus_name], "shared word3", 5, 2.0):
+                    assert context.text
+            except Exception as e:
+                errors.append(e)
+                return
+
+    readers = [threading.Thread(target=query) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for rag_file in result.rag_files[:-1]:
+        backend.delete_file(rag_file.name)
+    done.set()
+    for reader in readers:
+        reader.join()
+
+    assert errors == []
+    remaining = backend.retrieval_query([corpus_name], "term11", 5, 2.0)
+    assert remaining and all(context.source_name == "doc_11.txt" for context in remaining)
+
+
+def test_import_saves_indexes_once(tmp_path, monkeypatch):
+    backend = _backend(tmp_path)
+    corpus_name = backend.create_corpus("flush", "").name
+    saves = []
+    save = LexicalIndex.save
+    monkeypatch.setattr(
+        LexicalIndex, "save", lambda index, path: saves.append(path) or save(index, path)
+    )
+
+    # Small chunks give each document several append batches
+    result = backend.import_files(corpus_name, _write_docs(tmp_path, 3), 2, 0, 1000)
+    assert result.imported_rag_files_count == 3
+    assert len(saves) == 1
+
+    reloaded = _backend(tmp_path)
+    assert len(list(reloaded.list_files(corpus_name))) == 3
+    assert reloaded.lexical_query([corpus_name], "term2", 3)
+
+
+def test_load_drops_chunks_of_an_unfinished_import(tmp_path, monkeypatch):
+    backend = _backend(tmp_path)
+    corpus_name = backend.create_corpus("recovery", "").name
+    paths = _write_docs(tmp_path, 2)
+    backend.import_files(corpus_name, paths[:1], 32, 4, 1000)
+
+    # The process dies after appending chunks but before the import's flush
+    monkeypatch.setattr(_CorpusStore, "flush", lambda store: None)
+    backend.import_files(corpus_name, paths[1:], 32, 4, 1000)
+    monkeypatch.undo()
+
+    reloaded = _backend(tmp_path)
+    assert [rag_file.display_name for rag_file in reloaded.list_files(corpus_name)] == [
+        "doc_0.txt"
+    ]
+    contexts = reloaded.retrieval_query([corpus_name], "term1 shared", 50, 2.0)
+    assert contexts and all(context.source_name == "doc_0.txt" for context in contexts)
+    assert reloaded.lexical_query([corpus_name], "term1", 5) == []
+
+
+def test_file_pages_cover_every_file_once(tmp_path):
+    backend = _backend(tmp_path)
+    corpus_name = backend.create_corpus("pages", "").name
+    backend.import_files(corpus_name, _write_docs(tmp_path, 5), 32, 4, 1000)
+
+    names, page_token = [], ""
+    while True:
+        page = backend.list_files_page(corpus_name, 2, page_token)
+        names.extend(rag_file.display_name for rag_file in page.files)
+        page_token = page.next_page_token
+        if not page_token:
+            break
+    assert sorted(names) == [f"doc_{i}.txt" for i in range(5)]
+
+
+def test_lexical_queries_do_not_wait_for_writers(tmp_path):
+    backend = _backend(tmp_path)
+    corpus_name = backend.create_corpus("lexical", "").name
+    backend.import_files(corpus_name, _write_docs(tmp_path, 2), 32, 4, 1000)
+
+    results = []
+    with backend._lock:
+        # A writer holds the lock; the search still answers from the snapshot
+        reader = threading.Thread(
+            target=lambda: results.append(backend.lexical_query([corpus_name], "term1", 3))
+        )
+        reader.start()
+        reader.join(timeout=5)
+        assert not reader.is_alive()
+    assert results[0] and results[0][0].source_name == "doc_1.txt"
+
+
+def test_listing_corpora_does_not_load_them(tmp_path):
+    backend = _backend(tmp_path)
+    corpus_name = backend.create_corpus("listed", "").name
+    backend.import_files(corpus_name, _write_docs(tmp_path, 1), 32, 4, 1000)
+
+    reloaded = _backend(tmp_path)
+    assert [corpus.display_name for corpus in reloaded.list_corpora()] == ["listed"]
+    assert reloaded._stores == {}
+
+
+def test_files_are_published_once_their_import_finishes(tmp_path, monkeypatch):
+    backend = _backend(tmp_path)
+    corpus_name = backend.create_corpus("publish", "").name
+    seen = []
+    append = _CorpusStore.append
+
+    def observing_append(store, file_meta, records, vectors):
+        append(store, file_meta, records, vectors)
+        seen.append(
+            (
+                len(list(backend.list_files(corpus_name))),
+                len(backend.retrieval_query([corpus_name], "shared word3", 5, 2.0)),
+            )
+        )
+
+    monkeypatch.setattr(local_module, "_INGEST_BATCH_CHUNKS", 2)
+    monkeypatch.setattr(_CorpusStore, "append", observing_append)
+    backend.import_files(corpus_name, _write_docs(tmp_path, 1), 32, 4, 1000)
+
+    assert len(seen) > 1 and set(seen) == {(0, 0)}
+    assert len(list(backend.list_files(corpus_name))) == 1
+    assert backend.retrieval_query([corpus_name], "shared word3", 5, 2.0)
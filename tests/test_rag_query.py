@@ -0,0 +1,43 @@
+import importlib
+from types import SimpleNamespace
+
+from data_science_rag_agent import telemetry
+from data_science_rag_agent.tools import rag_query
+
+rag_query_module = importlib.import_module("data_science_rag_agent.tools.rag_query")
+
+
+def test_fanout_retrievals_nest_under_the_query_span(fake_backend):
+    exporter = telemetry.InMemoryExporter()
+    telemetry.set_exporter(exporter)
+    corpora = [fake_backend.create_corpus(f"fanout_{i}", "").name for i in range(3)]
+    context = SimpleNamespace(
+        state={f"corpus_exists_{name}": True for name in corpora}
+    )
+
+    try:
+        result = rag_query(corpora[0], "what is overfitting", context, corpora[1:])
+    finally:
+        telemetry.set_exporter(None)
+
+    assert result["status"] == "success"
+    retrievals = [
+        span for span in exporter.finished_spans("rag_query.retrieve")
+        if span.attributes.get("corpus") in corpora
+    ]
+    assert len(retrievals) == 3
+    assert {span.parent for span in retrievals} == {"rag_query"}
+
+
+def test_hybrid_fusion_reports_fused_scores_and_thresholds_keyword_hits():
+    vector = [{"source_uri": "a", "text": "near", "score": 0.2}]
+    lexical = [
+        {"source_uri": "b", "text": "far keyword hit", "score": 0.9},
+        {"source_uri": "a", "text": "near", "score": 0.2},
+    ]
+    fused = rag_query_module._fuse_hybrid(vector, lexical, distance_threshold=0.5)
+
+    assert [result["text"] for result in fused] == ["near"]
+    assert fused[0]["distance"] == 0.2
+    # Found by both rankers at rank one
+    assert fused[0]["score"] == round(2 / 61, 6)
@@ -0,0 +1,40 @@
+import asyncio
+import importlib
+import threading
+
+from data_science_rag_agent.tools import arag_query_batch
+
+rag_query_batch_module = importlib.import_module("data_science_rag_agent.tools.rag_query_batch")
+
+
+def test_async_batches_run_on_their_own_bounded_pool(fake_backend, monkeypatch):
+    corpus_name = fake_backend.create_corpus("batch", "").name
+    threads = set()
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def retrieve(full_corpus_name, query):
+        with lock:
+            threads.add(threading.current_thread().name)
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        threading.Event().wait(0.01)
+        with lock:
+            running[0] -= 1
+        return []
+
+    monkeypatch.setattr(rag_query_batch_module, "_retrieve_cached", retrieve)
+
+    async def collect():
+        queries = [f"question {i}" for i in range(12)] + ["Question 0"]
+        return [
+            response
+            async for response in arag_query_batch(
+                corpus_name, queries, max_concurrency=3, requests_per_second=0
+            )
+        ]
+
+    responses = asyncio.run(collect())
+    assert len(responses) == 13
+    assert threads and all(name.startswith("rag-batch") for name in threads)
+    assert peak[0] <= 3
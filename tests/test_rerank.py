@@ -0,0 +1,44 @@
+import pytest
+
+from data_science_rag_agent.tools.rerank import (
+    CrossEncoderReranker,
+    reciprocal_rank_fusion,
+    rerank,
+    weighted_fusion,
+)
+
+# Closest first by vector distance; only the last one mentions the query terms
+RESULTS = [
+    {"text": "linear regression fits a line", "score": 0.10},
+    {"text": "random forests average many trees", "score": 0.20},
+    {"text": "gradient boosting adds trees to fix residual errors", "score": 0.30},
+]
+
+
+def test_bm25_rerank_promotes_the_lexical_match():
+    reranked, millis = rerank("gradient boosting", RESULTS, top_k=2, fusion="weighted", weight=0.9)
+    assert [result["text"] for result in reranked][0] == RESULTS[2]["text"]
+    assert len(reranked) == 2
+    assert all("rerank_score" in result for result in reranked)
+    assert millis >= 0
+
+
+def test_rrf_keeps_items_ranked_well_by_both():
+    fused = reciprocal_rank_fusion([[0, 1, 2], [2, 0, 1]], k=60)
+    assert max(fused, key=fused.get) == 0
+    assert fused[2] > fused[1]
+
+
+def test_weighted_fusion_normalizes_each_ranker():
+    assert weighted_fusion([0.0, 10.0], [1.0, 0.5], weight=0.0) == [0.0, 1.0]
+    assert weighted_fusion([0.0, 10.0], [1.0, 0.5], weight=1.0) == [1.0, 0.0]
+
+
+def test_custom_reranker_and_unknown_fusion():
+    reranker = CrossEncoderReranker(lambda pairs: [len(text) for _, text in pairs])
+    reranked, _ = rerank("trees", RESULTS, top_k=1, reranker=reranker, fusion="weighted", weight=1.0)
+    assert reranked[0]["text"] == RESULTS[2]["text"]
+
+    with pytest.raises(ValueError):
+        rerank("trees", RESULTS, top_k=1, reranker=reranker, fusion="unknown")
+    assert rerank("trees", [], top_k=3) == ([], 0.0)
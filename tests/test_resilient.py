@@ -0,0 +1,137 @@
+import threading
+import time
+
+import pytest
+
+from benchmarks.fake_backend import FakeProfile, FakeRagBackend, FakeRpcError
+from data_science_rag_agent.backends.resilient import (
+    BackendDeadlineExceeded,
+    BackendOverloaded,
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientBackend,
+    request_deadline,
+)
+
+
+def _backend(**profile):
+    return FakeRagBackend(FakeProfile(name="test", jitter=0.0, corpora=0, **profile))
+
+
+def _resilient(fake, failures=3, reset_seconds=60.0, **kwargs):
+    kwargs.setdefault("max_retries", 0)
+    kwargs.setdefault("retry_base_seconds", 0.0)
+    return ResilientBackend(
+        fake, breaker=CircuitBreaker(failures, reset_seconds), **kwargs
+    )
+
+
+def _query(backend):
+    return backend.retrieval_query(["corpus"], "overfitting", 3, 0.5)
+
+
+def test_breaker_opens_after_consecutive_transient_failures():
+    fake = _backend(error_rate=1.0)
+    backend = _resilient(fake, failures=3)
+
+    for _ in range(3):
+        with pytest.raises(FakeRpcError):
+            _query(backend)
+    assert backend.breaker.state == "open"
+
+    # Open: calls fail immediately without reaching the backend
+    started = time.monotonic()
+    with pytest.raises(CircuitOpenError):
+        _query(backend)
+    assert time.monotonic() - started < 0.1
+    assert fake.rpc_counts() == {"retrieval_query": 3}
+
+
+def test_half_open_lets_a_single_probe_through():
+    fake = _backend(error_rate=1.0, latency_ms={"retrieval_query": 200})
+    backend = _resilient(fake, failures=1, reset_seconds=0.05)
+    with pytest.raises(FakeRpcError):
+        _query(backend)
+    time.sleep(0.1)
+    assert backend.breaker.state == "half_open"
+
+    fake.profile.error_rate = 0.0
+    fake.reset_rpc_counts()
+    probe = threading.Thread(target=_query, args=(backend,))
+    probe.start()
+    time.sleep(0.05)
+    with pytest.raises(CircuitOpenError):
+        _query(backend)
+    probe.join()
+
+    assert fake.rpc_counts() == {"retrieval_query": 1}
+    assert backend.breaker.state == "closed"
+    assert len(_query(backend)) == 3
+
+
+def test_only_reads_are_retried():
+    fake = _backend(error_rate=1.0)
+    backend = _resilient(fake, failures=100, max_retries=2)
+    corpus_name = "projects/bench/locations/local/ragCorpora/c"
+
+    with pytest.raises(FakeRpcError):
+        _query(backend)
+    with pytest.raises(FakeRpcError):
+        list(backend.list_files(corpus_name))
+    with pytest.raises(FakeRpcError):
+        backend.import_files(corpus_name, ["gs://bucket/a.txt"], 512, 100, 1000)
+    with pytest.raises(FakeRpcError):
+        backend.delete_file(f"{corpus_name}/ragFiles/f")
+    with pytest.raises(FakeRpcError):
+        backend.delete_corpus(corpus_name)
+
+    assert fake.rpc_counts() == {
+        "retrieval_query": 3,
+        "list_files": 3,
+        "import_files": 1,
+        "delete_file": 1,
+        "delete_corpus": 1,
+    }
+
+
+def test_hung_call_raises_deadline_exceeded():
+    fake = _backend(slow_rate=1.0, slow_ms=500)
+    backend = _resilient(fake, deadline_seconds=0.05)
+
+    started = time.monotonic()
+    with pytest.raises(BackendDeadlineExceeded):
+        _query(backend)
+    assert time.monotonic() - started < 0.4
+
+
+def test_request_deadline_cuts_calls_short_without_opening_the_breaker():
+    fake = _backend(slow_rate=1.0, slow_ms=500)
+    backend = _resilient(fake, failures=1, deadline_seconds=5.0, max_retries=3)
+
+    started = time.monotonic()
+    with request_deadline(0.05):
+        with pytest.raises(BackendDeadlineExceeded):
+            _query(backend)
+        # Once the deadline has passed, calls fail before reaching the backend
+        with pytest.raises(BackendDeadlineExceeded):
+            _query(backend)
+    assert time.monotonic() - started < 0.4
+    assert fake.rpc_counts() == {"retrieval_query": 1}
+    assert backend.breaker.state == "closed"
+
+
+def test_exhausted_slots_raise_overloaded():
+    fake = _backend(latency_ms={"retrieval_query": 300})
+    backend = _resilient(fake, deadline_seconds=1.0, max_concurrency=1)
+    holder = threading.Thread(target=_query, args=(backend,))
+    holder.start()
+    time.sleep(0.05)
+
+    backend.deadline_seconds = 0.05
+    with pytest.raises(BackendOverloaded):
+        _query(backend)
+    holder.join()
+
+    # Saturation is not a backend failure
+    assert backend.breaker.state == "closed"
+    assert fake.rpc_counts() == {"retrieval_query": 1}
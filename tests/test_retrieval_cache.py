@@ -0,0 +1,59 @@
+import time
+
+from data_science_rag_agent.tools.retrieval_cache import RetrievalCache, SqliteCacheBackend
+
+RESULTS = [{"text": "overfitting is..."}]
+
+
+def test_retrieval_cache_evicts_least_recently_used():
+    cache = RetrievalCache(max_entries=2, ttl_seconds=60)
+    cache.put("c", "first", 3, 0.5, RESULTS)
+    cache.put("c", "second", 3, 0.5, RESULTS)
+    assert cache.get("c", "  FIRST ", 3, 0.5) == RESULTS
+    cache.put("c", "third", 3, 0.5, RESULTS)
+
+    assert cache.get("c", "second", 3, 0.5) is None
+    assert cache.get("c", "first", 3, 0.5) == RESULTS
+    assert cache.stats()["evictions"] == 1
+
+
+def test_retrieval_cache_expires_and_invalidates():
+    cache = RetrievalCache(max_entries=10, ttl_seconds=0.05)
+    cache.put("c", "query", 3, 0.5, RESULTS)
+    time.sleep(0.1)
+    assert cache.get("c", "query", 3, 0.5) is None
+
+    cache.ttl_seconds = 60
+    cache.put("c", "query", 3, 0.5, RESULTS)
+    cache.put("other", "query", 3, 0.5, RESULTS)
+    cache.invalidate_corpus("c")
+    assert cache.get("c", "query", 3, 0.5) is None
+    assert cache.get("other", "query", 3, 0.5) == RESULTS
+
+
+def test_results_of_a_retrieval_overtaken_by_invalidation_are_dropped():
+    cache = RetrievalCache(max_entries=10, ttl_seconds=60)
+    generation = cache.generation("c")
+    # The corpus changes while the retrieval is running
+    cache.invalidate_corpus("c")
+    cache.put("c", "query", 3, 0.5, RESULTS, generation=generation)
+    assert cache.get("c", "query", 3, 0.5) is None
+
+    cache.put("c", "query", 3, 0.5, RESULTS, generation=cache.generation("c"))
+    assert cache.get("c", "query", 3, 0.5) == RESULTS
+
+
+def test_workers_sharing_sqlite_stop_serving_entries_another_invalidated(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    first = RetrievalCache(ttl_seconds=60, backend=SqliteCacheBackend(path))
+    second = RetrievalCache(ttl_seconds=60, backend=SqliteCacheBackend(path))
+
+    first.put("c", "query", 3, 0.5, RESULTS)
+    assert second.get("c", "query", 3, 0.5) == RESULTS
+    stale = second.generation("c")
+
+    first.invalidate_corpus("c")
+    # Neither the in-memory copy nor a late write from before the invalidation is served
+    assert second.get("c", "query", 3, 0.5) is None
+    second.put("c", "query", 3, 0.5, RESULTS, generation=stale)
+    assert first.get("c", "query", 3, 0.5) is None
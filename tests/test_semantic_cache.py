@@ -0,0 +1,50 @@
+import numpy as np
+
+from data_science_rag_agent.tools.semantic_cache import SemanticCache
+
+RESULTS = [{"text": "overfitting is..."}]
+VECTORS = {
+    "what is overfitting": [1.0, 0.0, 0.0],
+    "explain overfitting": [0.99, 0.1, 0.0],
+    "what is a p-value": [0.0, 1.0, 0.0],
+}
+
+
+def _cache(vectors=VECTORS):
+    return SemanticCache(
+        embed_fn=lambda query: np.array(vectors[query]),
+        similarity_threshold=0.95,
+        max_entries=4,
+        ttl_seconds=60,
+    )
+
+
+def test_semantic_cache_serves_similar_queries_only():
+    cache = _cache()
+    cache.add("c", "what is overfitting", 3, 0.5, RESULTS)
+
+    assert cache.lookup("c", "explain overfitting", 3, 0.5) == RESULTS
+    assert cache.lookup("c", "what is a p-value", 3, 0.5) is None
+    assert cache.lookup("c", "explain overfitting", 5, 0.5) is None
+    cache.invalidate_corpus("c")
+    assert cache.lookup("c", "explain overfitting", 3, 0.5) is None
+
+
+def test_results_of_a_retrieval_overtaken_by_invalidation_are_dropped():
+    cache = _cache()
+    generation = cache.generation("c")
+    cache.invalidate_corpus("c")
+    cache.add("c", "what is overfitting", 3, 0.5, RESULTS, generation=generation)
+    assert cache.lookup("c", "what is overfitting", 3, 0.5) is None
+
+    cache.add("c", "what is overfitting", 3, 0.5, RESULTS, generation=cache.generation("c"))
+    assert cache.lookup("c", "what is overfitting", 3, 0.5) == RESULTS
+
+
+def test_embedding_dimension_mismatch_is_a_miss():
+    cache = _cache()
+    cache.add("c", "what is overfitting", 3, 0.5, RESULTS)
+    # The embedding model changed to one with a different dimension
+    cache.embed_fn = lambda query: np.ones(5)
+    assert cache.lookup("c", "what is overfitting", 3, 0.5) is None
+    assert cache.stats()["misses"] == 1
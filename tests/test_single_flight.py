@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from data_science_rag_agent.single_flight import SingleFlight
+
+
+def test_cancelling_the_first_async_caller_does_not_cancel_the_call():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        first = asyncio.create_task(flight.do_async("key", call))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(flight.do_async("key", call))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "result"
+    assert len(calls) == 1
+    assert flight.in_flight() == 0
+
+
+def test_async_callers_share_the_exception():
+    flight = SingleFlight("test")
+
+    async def call():
+        await asyncio.sleep(0.01)
+        raise ValueError("backend down")
+
+    async def main():
+        return await asyncio.gather(
+            flight.do_async("key", call), flight.do_async("key", call), return_exceptions=True
+        )
+
+    errors = asyncio.run(main())
+    assert [str(error) for error in errors] == ["backend down", "backend down"]
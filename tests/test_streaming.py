@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from data_science_rag_agent.sub_agent.output_agent.streaming import (
+    AgentResponseStreamParser,
+    stream_agent_response,
+)
+
+
+def _section(heading, **overrides):
+    section = {
+        "heading": heading,
+        "sub_heading": "Sub {with} [brackets]",
+        "content": 'Closing tokens "}]" and escapes \\" must not end the section',
+        "code_blocks": ["data = {'a': [1, 2]}", "print(data['a'][0])"],
+        "examples": ["]}"],
+        "key_points": ["one", "two"],
+        "notes": "",
+    }
+    section.update(overrides)
+    return section
+
+
+def _feed_by_character(parser, text):
+    events = []
+    for char in text:
+        events.extend(parser.feed(char))
+    return events
+
+
+def test_sections_are_reported_as_they_close_when_fed_character_by_character():
+    document = {"title": "Joins {and} [merges]", "sections": [_section("First"), _section("Second")]}
+    text = "```json\n" + json.dumps(document, indent=2) + "\n```"
+
+    parser = AgentResponseStreamParser()
+    events = _feed_by_character(parser, text)
+
+    assert [event["type"] for event in events] == ["title", "section", "section"]
+    assert events[0]["title"] == "Joins {and} [merges]"
+    assert [event["section"].heading for event in events[1:]] == ["First", "Second"]
+    assert events[1]["section"].content == document["sections"][0]["content"]
+    assert parser.done and parser.errors == []
+    assert parser.result().model_dump() == document
+
+
+def test_invalid_section_is_reported_and_later_sections_still_stream():
+    broken = _section("Broken")
+    del broken["content"]
+    document = {"title": "T", "sections": [broken, _section("Valid")]}
+
+    parser = AgentResponseStreamParser()
+    events = _feed_by_character(parser, json.dumps(document))
+
+    assert [event["section"].heading for event in events if event["type"] == "section"] == ["Valid"]
+    assert len(parser.errors) == 1 and parser.errors[0].startswith("Section 0")
+    with pytest.raises(ValidationError):
+        parser.result()
+
+
+def test_incomplete_document_has_no_result():
+    parser = AgentResponseStreamParser()
+    parser.feed('{"title": "T", "sections": [')
+    with pytest.raises(ValueError):
+        parser.result()
+
+
+def test_stream_agent_response_ends_with_the_validated_response(fake_backend, monkeypatch):
+    from google.adk.runners import InMemoryRunner
+
+    from benchmarks.fake_backend import FakeLlm
+    from data_science_rag_agent.agent import root_agent
+
+    monkeypatch.setattr(root_agent, "model", FakeLlm())
+    runner = InMemoryRunner(agent=root_agent, app_name="test")
+    session = runner.session_service.create_session(app_name="test", user_id="user")
+
+    async def collect():
+        return [
+            item
+            async for item in stream_agent_response(
+                runner, "user", session.id, "explain overfitting"
+            )
+        ]
+
+    items = asyncio.run(collect())
+    assert items[-1]["type"] == "response", items[-1]
+    assert items[-1]["response"].title
@@ -0,0 +1,73 @@
+import os
+from types import SimpleNamespace
+
+from data_science_rag_agent.tools import sync_corpus
+
+
+def _write(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def _source_uris(backend, corpus_name):
+    return sorted(rag_file.source_uri for rag_file in backend.list_files(corpus_name))
+
+
+def test_changed_sources_keep_their_old_file_until_reimported(fake_backend, monkeypatch, tmp_path):
+    monkeypatch.setattr(fake_backend, "supports_local_paths", True)
+    corpus_name = fake_backend.create_corpus("sync_test", "").name
+    context = SimpleNamespace(state={f"corpus_exists_{corpus_name}": True})
+    source = tmp_path / "docs"
+    source.mkdir()
+    kept, removed = str(source / "kept.txt"), str(source / "removed.txt")
+    _write(kept, "first")
+    _write(removed, "removed later")
+
+    result = sync_corpus(corpus_name, str(source), context)
+    assert result["status"] == "success"
+    assert result["files_added"] == 2
+
+    _write(kept, "second version")
+    os.remove(removed)
+    import_files = fake_backend.import_files
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("import failed")
+
+    monkeypatch.setattr(fake_backend, "import_files", fail)
+    result = sync_corpus(corpus_name, str(source), context)
+    assert result["status"] == "partial"
+    assert result["to_update"] == [kept]
+    assert result["failed_paths"] == [kept]
+    assert result["files_deleted"] == 1
+    assert _source_uris(fake_backend, corpus_name) == [kept]
+
+    # The failed version was not recorded, so the next run retries it
+    monkeypatch.setattr(fake_backend, "import_files", import_files)
+    result = sync_corpus(corpus_name, str(source), context)
+    assert result["status"] == "success"
+    assert result["to_update"] == [kept]
+    assert result["files_deleted"] == 1
+    assert _source_uris(fake_backend, corpus_name) == [kept]
+
+    result = sync_corpus(corpus_name, str(source), context, dry_run=True)
+    assert result["unchanged"] == 1
+    assert result["to_add"] == result["to_update"] == result["to_delete"] == []
+
+
+def test_sync_relists_the_corpus_instead_of_trusting_the_index(fake_backend, monkeypatch, tmp_path):
+    monkeypatch.setattr(fake_backend, "supports_local_paths", True)
+    corpus_name = fake_backend.create_corpus("sync_relist", "").name
+    context = SimpleNamespace(state={f"corpus_exists_{corpus_name}": True})
+    source = tmp_path / "docs"
+    source.mkdir()
+    doc = str(source / "doc.txt")
+    _write(doc, "content")
+    assert sync_corpus(corpus_name, str(source), context)["files_added"] == 1
+
+    # Another process deletes the file without touching this process's index
+    for rag_file in fake_backend.list_files(corpus_name):
+        fake_backend.delete_file(rag_file.name)
+    result = sync_corpus(corpus_name, str(source), context)
+    assert result["to_add"] == [doc]
+    assert _source_uris(fake_backend, corpus_name) == [doc]
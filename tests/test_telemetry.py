@@ -0,0 +1,12 @@
+from data_science_rag_agent.telemetry import InMemoryExporter
+
+
+def test_histograms_keep_a_bounded_window_of_recent_samples():
+    exporter = InMemoryExporter(max_spans=10, max_samples=100)
+    for value in range(1000):
+        exporter.record("rag_query.retrieve.duration_ms", value, {})
+
+    summary = exporter.summary("rag_query.retrieve.duration_ms")
+    assert summary["count"] == 100
+    assert summary["p50"] >= 900
+    assert exporter.summary("missing") == {}